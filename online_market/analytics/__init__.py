@@ -0,0 +1 @@
+from analytics.sales_table import Sales_Table, STATUSES, PERIODS
@@ -0,0 +1,469 @@
+from __future__ import annotations
+from array import array
+from datetime import datetime, timezone
+import heapq
+import math
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+from orders import constants as o_constants
+
+try:
+    import numpy as np
+except ImportError:
+    # Sem NumPy as agregações são feitas em Python puro, com os mesmos resultados
+    np = None
+
+if TYPE_CHECKING:
+    from orders import Order
+
+
+# Status conhecidos, cada item guarda o índice do status de seu pedido
+STATUSES = (
+    o_constants.placed,
+    o_constants.sent,
+    o_constants.finished,
+    o_constants.canceled,
+)
+
+# Tipo NumPy de cada tipo do módulo array
+DTYPES = {"q": "int64", "b": "int8", "d": "float64"}
+
+# Formato de cada período, no relógio UTC
+PERIODS = {"day": ("D", "%Y-%m-%d"), "month": ("M", "%Y-%m"), "year": ("Y", "%Y")}
+
+
+class Sales_Table:
+    def __init__(
+        self,
+        order_ids: Sequence[int],
+        customer_ids: Sequence[int],
+        product_ids: Sequence[int],
+        statuses: Sequence[int],
+        placed_at: Sequence[float],
+        quantities: Sequence[int],
+        prices: Sequence[int],
+        product_names: dict[int, str] | None = None,
+        customer_names: dict[int, str] | None = None,
+    ) -> None:
+        """
+        Visão colunar dos itens de todos os pedidos, para relatórios de vendas.
+
+        Cada coluna guarda um campo de todos os itens, então as agregações percorrem
+        arrays contíguos em vez de objetos. Com o NumPy instalado as colunas são arrays
+        NumPy e as agregações são vetorizadas, caso contrário são arrays do módulo
+        array e as agregações são feitas em Python puro. Os preços e as receitas são
+        inteiros em centavos, então as somas são exatas em ambos os casos.
+
+        Os itens de um mesmo pedido devem estar em posições consecutivas.
+
+        Parameters
+        ----------
+        order_ids : Sequence[int]
+            Id do pedido de cada item
+        customer_ids : Sequence[int]
+            Id do cliente de cada item
+        product_ids : Sequence[int]
+            Id do produto de cada item
+        statuses : Sequence[int]
+            Índice em STATUSES do status do pedido de cada item
+        placed_at : Sequence[float]
+            Instante do pedido de cada item, NaN caso seja desconhecido
+        quantities : Sequence[int]
+            Quantidade de cada item
+        prices : Sequence[int]
+            Preço unitário de cada item, em centavos
+        product_names : dict[int, str] | None, optional
+            Nome de cada produto, by default None
+        customer_names : dict[int, str] | None, optional
+            Nome de cada cliente, by default None
+        """
+        self.order_ids = self.__column(order_ids, "q")
+        self.customer_ids = self.__column(customer_ids, "q")
+        self.product_ids = self.__column(product_ids, "q")
+        self.statuses = self.__column(statuses, "b")
+        self.placed_at = self.__column(placed_at, "d")
+        self.quantities = self.__column(quantities, "q")
+        self.prices = self.__column(prices, "q")
+        self.product_names = product_names if product_names is not None else {}
+        self.customer_names = customer_names if customer_names is not None else {}
+
+        if np is not None:
+            self.totals = self.prices * self.quantities
+        else:
+            self.totals = array(
+                "q", (price * quantity for price, quantity in zip(self.prices, self.quantities))
+            )
+
+    @staticmethod
+    def __column(values: Sequence, typecode: str):
+        """
+        Converte uma sequência em uma coluna, sem copiar arrays do mesmo tipo.
+        """
+        if np is not None:
+            if isinstance(values, array) and values.typecode == typecode:
+                return np.frombuffer(values, dtype=DTYPES[typecode])
+            return np.asarray(values, dtype=DTYPES[typecode])
+        if isinstance(values, array) and values.typecode == typecode:
+            return values
+        return array(typecode, values)
+
+    @staticmethod
+    def from_orders(orders: Iterable["Order"]) -> Sales_Table:
+        """
+        Monta a tabela a partir dos pedidos, percorrendo cada pedido uma única vez.
+
+        Parameters
+        ----------
+        orders : Iterable[Order]
+            Pedidos
+
+        Returns
+        -------
+        Sales_Table
+            Tabela com um item por linha
+        """
+        order_ids, customer_ids, product_ids = array("q"), array("q"), array("q")
+        statuses, placed_at = array("b"), array("d")
+        quantities, prices = array("q"), array("q")
+        product_names: dict[int, str] = {}
+        customer_names: dict[int, str] = {}
+        status_codes = {status: i for i, status in enumerate(STATUSES)}
+
+        for order in orders:
+            customer = order.customer
+            customer_names[customer.id] = customer.name
+            status = status_codes[order.status]
+            moment = order.placed_at if order.placed_at is not None else math.nan
+            for item in order.products:
+                order_ids.append(order.id)
+                customer_ids.append(customer.id)
+                product_ids.append(item.product_id)
+                statuses.append(status)
+                placed_at.append(moment)
+                quantities.append(item.quantity)
+                prices.append(item.price)
+                product_names[item.product_id] = item.name
+
+        return Sales_Table(
+            order_ids,
+            customer_ids,
+            product_ids,
+            statuses,
+            placed_at,
+            quantities,
+            prices,
+            product_names,
+            customer_names,
+        )
+
+    # - - - Filtros - - - #
+    def with_status(self, *statuses: str, exclude: bool = False) -> Sales_Table:
+        """
+        Seleciona os itens dos pedidos com algum dos status.
+
+        Parameters
+        ----------
+        *statuses : str
+            Status dos pedidos
+        exclude : bool, optional
+            Se os itens com esses status devem ser descartados em vez de selecionados,
+            by default False
+
+        Returns
+        -------
+        Sales_Table
+            Tabela com os itens selecionados
+        """
+        codes = [STATUSES.index(status) for status in statuses]
+        if np is not None:
+            mask = np.isin(self.statuses, codes, invert=exclude)
+            columns = [column[mask] for column in self.__columns()]
+        else:
+            selected = set(codes)
+            keep = [(code in selected) != exclude for code in self.statuses]
+            columns = [
+                array(column.typecode, (value for value, k in zip(column, keep) if k))
+                for column in self.__columns()
+            ]
+        return Sales_Table(*columns, self.product_names, self.customer_names)
+
+    def sold(self) -> Sales_Table:
+        """
+        Seleciona os itens dos pedidos que não foram cancelados.
+        """
+        return self.with_status(o_constants.canceled, exclude=True)
+
+    def __columns(self) -> list:
+        return [
+            self.order_ids,
+            self.customer_ids,
+            self.product_ids,
+            self.statuses,
+            self.placed_at,
+            self.quantities,
+            self.prices,
+        ]
+
+    # - - - Agregações - - - #
+    @staticmethod
+    def __group(keys, values) -> tuple[list, list[int]]:
+        """
+        Soma os valores inteiros de cada chave.
+
+        Returns
+        -------
+        tuple[list, list[int]]
+            Chaves em ordem crescente e a soma de cada uma
+        """
+        if np is not None:
+            if len(keys) < 1:
+                return [], []
+            # Ids pequenos e não negativos são somados diretamente, sem ordenar as chaves
+            if keys.dtype.kind in "iu" and keys.min() >= 0 and keys.max() <= 4 * len(keys):
+                present = np.bincount(keys) > 0
+                sums = np.bincount(keys, weights=values)[present]
+                unique = np.flatnonzero(present)
+            else:
+                unique, inverse = np.unique(keys, return_inverse=True)
+                sums = np.bincount(inverse, weights=values, minlength=len(unique))
+            # O bincount soma em float64, exato para somas de até 2**53 centavos
+            return unique.tolist(), np.rint(sums).astype(np.int64).tolist()
+
+        sums: dict = {}
+        for key, value in zip(keys, values):
+            sums[key] = sums.get(key, 0) + value
+        ordered = sorted(sums)
+        return ordered, [sums[key] for key in ordered]
+
+    def __first_items(self):
+        """
+        Seleciona o primeiro item de cada pedido, usado para contar pedidos.
+        """
+        if np is not None:
+            first = np.ones(len(self.order_ids), dtype=bool)
+            first[1:] = self.order_ids[1:] != self.order_ids[:-1]
+            return first
+        return [
+            i == 0 or self.order_ids[i] != self.order_ids[i - 1]
+            for i in range(len(self.order_ids))
+        ]
+
+    def __count_orders(self, keys) -> tuple[list, list[int]]:
+        first = self.__first_items()
+        if np is not None:
+            return self.__group(keys[first], np.ones(int(first.sum()), dtype=np.int64))
+        selected = [key for key, is_first in zip(keys, first) if is_first]
+        return self.__group(selected, [1] * len(selected))
+
+    @property
+    def total_revenue(self) -> int:
+        """
+        Soma do preço total de todos os itens, em centavos.
+        """
+        if np is not None:
+            return int(self.totals.sum())
+        return sum(self.totals)
+
+    @property
+    def units(self) -> int:
+        """
+        Quantidade total de unidades vendidas.
+        """
+        if np is not None:
+            return int(self.quantities.sum())
+        return sum(self.quantities)
+
+    @property
+    def order_count(self) -> int:
+        """
+        Quantidade de pedidos com algum item na tabela.
+        """
+        first = self.__first_items()
+        if np is not None:
+            return int(first.sum())
+        return sum(first)
+
+    def revenue_by_product(self) -> dict[int, int]:
+        """
+        Soma do preço total dos itens de cada produto.
+
+        Returns
+        -------
+        dict[int, int]
+            Id do produto -> receita, em centavos
+        """
+        return dict(zip(*self.__group(self.product_ids, self.totals)))
+
+    def revenue_by_customer(self) -> dict[int, int]:
+        """
+        Soma do preço total dos itens de cada cliente.
+
+        Returns
+        -------
+        dict[int, int]
+            Id do cliente -> receita, em centavos
+        """
+        return dict(zip(*self.__group(self.customer_ids, self.totals)))
+
+    def revenue_by_status(self) -> dict[str, int]:
+        """
+        Soma do preço total dos itens dos pedidos de cada status.
+
+        Returns
+        -------
+        dict[str, int]
+            Status -> receita, em centavos
+        """
+        codes, sums = self.__group(self.statuses, self.totals)
+        return {STATUSES[code]: total for code, total in zip(codes, sums)}
+
+    def revenue_by_period(self, period: str = "month") -> dict[str, int]:
+        """
+        Soma do preço total dos itens dos pedidos de cada período, no relógio UTC.
+        Pedidos sem instante conhecido são ignorados.
+
+        Parameters
+        ----------
+        period : str, optional
+            "day", "month" ou "year", by default "month"
+
+        Returns
+        -------
+        dict[str, int]
+            Período -> receita em centavos, em ordem cronológica
+
+        Raises
+        ------
+        ValueError
+            Caso o período seja desconhecido
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Período desconhecido: {period}")
+        unit, format = PERIODS[period]
+
+        if np is not None:
+            known = ~np.isnan(self.placed_at)
+            moments = self.placed_at[known].astype(np.int64).astype("datetime64[s]")
+            buckets, sums = self.__group(moments.astype(f"datetime64[{unit}]"), self.totals[known])
+            labels = np.datetime_as_string(np.array(buckets, dtype=f"datetime64[{unit}]"), unit=unit)
+            return dict(zip(labels.tolist(), sums))
+
+        keys: list[str] = []
+        values: list[int] = []
+        for moment, total in zip(self.placed_at, self.totals):
+            if not math.isnan(moment):
+                keys.append(datetime.fromtimestamp(int(moment), timezone.utc).strftime(format))
+                values.append(total)
+        return dict(zip(*self.__group(keys, values)))
+
+    def units_by_product(self) -> dict[int, int]:
+        """
+        Quantidade de unidades de cada produto.
+
+        Returns
+        -------
+        dict[int, int]
+            Id do produto -> unidades
+        """
+        products, units = self.__group(self.product_ids, self.quantities)
+        return dict(zip(products, units))
+
+    def order_count_by_status(self) -> dict[str, int]:
+        """
+        Quantidade de pedidos de cada status.
+
+        Returns
+        -------
+        dict[str, int]
+            Status -> pedidos
+        """
+        codes, counts = self.__count_orders(self.statuses)
+        return {STATUSES[code]: count for code, count in zip(codes, counts)}
+
+    def order_count_by_customer(self) -> dict[int, int]:
+        """
+        Quantidade de pedidos de cada cliente.
+
+        Returns
+        -------
+        dict[int, int]
+            Id do cliente -> pedidos
+        """
+        customers, counts = self.__count_orders(self.customer_ids)
+        return dict(zip(customers, counts))
+
+    @staticmethod
+    def __top(keys: list, values: list, n: int) -> list[tuple]:
+        """
+        Seleciona as n chaves de maior valor, da maior para a menor.
+        """
+        if n < 1:
+            return []
+        # Empates são desfeitos pela menor chave
+        if np is not None and len(keys) > n:
+            array_values = np.asarray(values)
+            selected = np.argpartition(-array_values, n - 1)[:n]
+            order = np.lexsort((np.asarray(keys)[selected], -array_values[selected]))
+            return [(keys[i], values[i]) for i in selected[order].tolist()]
+        return heapq.nsmallest(n, zip(keys, values), key=lambda pair: (-pair[1], pair[0]))
+
+    def top_products(self, n: int = 10, by: str = "revenue") -> list[tuple[int, str, int]]:
+        """
+        Seleciona os produtos mais vendidos.
+
+        Parameters
+        ----------
+        n : int, optional
+            Quantidade de produtos, by default 10
+        by : str, optional
+            "revenue" para ordenar pela receita ou "units" pelas unidades,
+            by default "revenue"
+
+        Returns
+        -------
+        list[tuple[int, str, int]]
+            Tuplas (id, nome, valor), com a receita em centavos, do maior valor para o menor,
+            empates ordenados pelo Id
+
+        Raises
+        ------
+        ValueError
+            Caso a ordenação seja desconhecida
+        """
+        if by == "revenue":
+            keys, values = self.__group(self.product_ids, self.totals)
+        elif by == "units":
+            keys, values = self.__group(self.product_ids, self.quantities)
+        else:
+            raise ValueError(f"Ordenação desconhecida: {by}")
+        return [
+            (product_id, self.product_names.get(product_id, ""), value)
+            for product_id, value in self.__top(keys, values, n)
+        ]
+
+    def top_customers(self, n: int = 10) -> list[tuple[int, str, int]]:
+        """
+        Seleciona os clientes com maior receita.
+
+        Parameters
+        ----------
+        n : int, optional
+            Quantidade de clientes, by default 10
+
+        Returns
+        -------
+        list[tuple[int, str, int]]
+            Tuplas (id, nome, receita), com a receita em centavos, da maior para a menor
+        """
+        keys, values = self.__group(self.customer_ids, self.totals)
+        return [
+            (customer_id, self.customer_names.get(customer_id, ""), value)
+            for customer_id, value in self.__top(keys, values, n)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.order_ids)
+
+    def __repr__(self) -> str:
+        backend = "NumPy" if np is not None else "Python"
+        return f"Sales_Table(contem {len(self.order_ids)} itens, {backend})"
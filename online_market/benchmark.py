@@ -0,0 +1,623 @@
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from users import Address, Customer, Owner, Password_Hasher
+from products import Product_Manager, import_csv
+from storage import Journal, Flusher, orders_filename
+from orders import Order_Manager, Order
+from analytics import Sales_Table
+from money import format_cents, to_cents
+import orders.constants as o_constants
+
+import constants as C
+import functions as F
+
+
+def create_market(
+    customers: int = 100, products: int = 100, stock: int = 0
+) -> tuple[Owner, dict[Customer.id, Customer], Product_Manager, Order_Manager]:
+    """
+    Cria um mercado em memória para os benchmarks.
+
+    Parameters
+    ----------
+    customers : int, optional
+        Quantidade de clientes, by default 100
+    products : int, optional
+        Quantidade de produtos, by default 100
+    stock : int, optional
+        Estoque inicial de cada produto, by default 0
+
+    Returns
+    -------
+    tuple[Owner, dict[Customer.id, Customer], Product_Manager, Order_Manager]
+        Tupla contendo: owner, customers, products e orders
+    """
+    owner = Owner(0, "admin", "admin")
+    market = Product_Manager(owner)
+    orders = Order_Manager(owner)
+
+    for i in range(products):
+        market.register_product(i, C.produtos[i % len(C.produtos)], C.precos[i % len(C.precos)])
+        if stock > 0:
+            market.add_product(i, stock)
+
+    customers_dict = {}
+    for i in range(1, customers + 1):
+        address = Address("Rua", "Cidade", "Estado", "12345-678", i, "")
+        customers_dict[i] = Customer(i, f"Cliente{i}", "senha", address)
+
+    return owner, customers_dict, market, orders
+
+
+def order_dicts(n: int, customers: int = 100, products: int = 100):
+    """
+    Gera pedidos no formato salvo na database.
+
+    Parameters
+    ----------
+    n : int
+        Quantidade de pedidos
+    customers : int, optional
+        Quantidade de clientes, by default 100
+    products : int, optional
+        Quantidade de produtos, by default 100
+
+    Yields
+    ------
+    dict
+        Dicionário do pedido
+    """
+    for i in range(n):
+        yield {
+            "id": i,
+            "customer_id": i % customers + 1,
+            "status": "Novo",
+            "products": [
+                {
+                    "id": (i + j) % products,
+                    "name": C.produtos[(i + j) % len(C.produtos)],
+                    "price_cents": C.precos[(i + j) % len(C.precos)],
+                    "quantity": j + 1,
+                }
+                for j in range(i % 3 + 1)
+            ],
+        }
+
+
+def bench_memory(n: int = 100_000) -> None:
+    """
+    Mede a memória ocupada por pedido ao carregar o histórico de pedidos.
+
+    Parameters
+    ----------
+    n : int, optional
+        Quantidade de pedidos, by default 100_000
+    """
+    _, customers, _, _ = create_market()
+    lines = [json.dumps(order) for order in order_dicts(n)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    orders = [Order.from_dict(json.loads(line), customers) for line in lines]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    items = sum(len(order.products) for order in orders)
+    print(f"memory: {n} pedidos, {items} itens")
+    print(f"  {(after - before) / n:.1f} bytes por pedido")
+
+
+def bench_contention(threads: int = 16, products: int = 4, stock: int = 20_000) -> None:
+    """
+    Disputa o estoque de poucos produtos entre várias threads,
+    misturando retiradas unitárias e carrinhos com vários produtos.
+    Verifica que o estoque nunca fica negativo e que nada é vendido além do estoque.
+
+    Parameters
+    ----------
+    threads : int, optional
+        Quantidade de threads, by default 16
+    products : int, optional
+        Quantidade de produtos disputados, by default 4
+    stock : int, optional
+        Estoque inicial de cada produto, by default 20_000
+    """
+    _, _, market, _ = create_market(customers=0, products=products, stock=stock)
+    retrieved = [[0] * products for _ in range(threads)]
+    failures = [0] * threads
+    negative = threading.Event()
+
+    def shopper(index: int) -> None:
+        rng = random.Random(index)
+        while failures[index] < 50:
+            try:
+                if rng.random() < 0.5:
+                    product_id = rng.randrange(products)
+                    item = market.retrieve_product(product_id, rng.randint(1, 3))
+                    retrieved[index][item.id] += item.quantity
+                else:
+                    cart = [(rng.randrange(products), rng.randint(1, 3)) for _ in range(3)]
+                    for item in market.retrieve_products(cart):
+                        retrieved[index][item.id] += item.quantity
+            except ValueError:
+                failures[index] += 1
+            if any(product.quantity < 0 for product in market.iter_products()):
+                negative.set()
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        workers = [threading.Thread(target=shopper, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    sold = [sum(counts[id] for counts in retrieved) for id in range(products)]
+    operations = sum(sold)
+    print(f"contention: {threads} threads, {products} produtos, {stock} unidades cada")
+    print(f"  {operations} unidades vendidas")
+    for id in range(products):
+        remaining = market.get_product(id).quantity
+        assert remaining >= 0, f"estoque negativo no produto {id}"
+        assert sold[id] + remaining == stock, f"produto {id} vendido além do estoque"
+    assert not negative.is_set(), "estoque negativo observado durante a disputa"
+    print("  estoque nunca ficou negativo")
+
+
+def bench_batch(n: int = 50_000, customers: int = 1_000, products: int = 100) -> None:
+    """
+    Mede a vazão de pedidos feitos em lote por Order_Manager.place_orders.
+    O estoque não é suficiente para todos os pedidos, então parte deles falha.
+
+    Parameters
+    ----------
+    n : int, optional
+        Quantidade de pedidos, by default 50_000
+    customers : int, optional
+        Quantidade de clientes, by default 1_000
+    products : int, optional
+        Quantidade de produtos, by default 100
+    """
+    _, customers_dict, market, orders = create_market(customers, products, stock=n // 40)
+    rng = random.Random(0)
+    requests = [
+        (
+            rng.randint(1, customers),
+            [(rng.randrange(products), rng.randint(1, 3)) for _ in range(rng.randint(1, 4))],
+        )
+        for _ in range(n)
+    ]
+
+    start = time.perf_counter()
+    results = orders.place_orders(requests, customers_dict)
+    elapsed = time.perf_counter() - start
+
+    placed = sum(result.ok for result in results)
+    print(f"batch: {n} pedidos, {customers} clientes, {products} produtos")
+    print(f"  {placed} realizados, {n - placed} recusados")
+    print(f"  {n / elapsed:,.0f} pedidos por segundo")
+    assert all(product.quantity >= 0 for product in market.iter_products())
+
+
+def bench_catalogue(n: int = 200_000) -> None:
+    """
+    Compara a importação de um catálogo CSV por import_csv com o registro
+    e reabastecimento linha a linha, com e sem um journal anexado.
+    O catálogo é importado duas vezes: registrando e depois reabastecendo.
+
+    Parameters
+    ----------
+    n : int, optional
+        Quantidade de produtos, by default 200_000
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "catalogue.csv")
+        with open(filename, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(("id", "name", "price", "quantity"))
+            for i in range(n):
+                price = format_cents(C.precos[i % len(C.precos)])
+                writer.writerow((i, C.produtos[i % len(C.produtos)], price, 5))
+
+        def per_row(market: Product_Manager) -> None:
+            with open(filename, newline="", encoding="utf-8") as file:
+                for row in csv.DictReader(file):
+                    id = int(row["id"])
+                    if id not in market.products:
+                        market.register_product(id, row["name"], to_cents(row["price"]))
+                    market.add_product(id, int(row["quantity"]))
+
+        def bulk(market: Product_Manager) -> None:
+            import_csv(market, filename)
+
+        print(f"catalogue: {n} produtos, importados duas vezes")
+        for journaled in (False, True):
+            for name, method in (("por linha", per_row), ("import_csv", bulk)):
+                market = create_market(customers=0, products=0)[2]
+                market.ids()  # Listagens mantêm os Ids ordenados durante a importação
+                journal = None
+                if journaled:
+                    journal = Journal(os.path.join(directory, f"{name}.journal"))
+                    market.journal = journal
+
+                start = time.perf_counter()
+                method(market)
+                method(market)
+                elapsed = time.perf_counter() - start
+
+                if journal is not None:
+                    journal.close()
+                assert market.products[n - 1].quantity == 10
+                label = "com journal" if journaled else "sem journal"
+                print(f"  {name:>10} ({label}): {elapsed:.2f}s")
+
+
+def bench_login(n: int = 32) -> None:
+    """
+    Mede a vazão de logins com senhas em hash, usando os custos das constantes:
+    verificações em sequência, em paralelo nas threads do Password_Hasher
+    e verificações repetidas respondidas pelo cache.
+
+    Parameters
+    ----------
+    n : int, optional
+        Quantidade de usuários, by default 32
+    """
+    hasher = Password_Hasher(
+        C.password_algorithm,
+        C.scrypt_n,
+        C.scrypt_r,
+        C.scrypt_p,
+        C.pbkdf2_iterations,
+        C.password_workers,
+        C.password_cache,
+    )
+    passwords = [f"senha{i}" for i in range(n)]
+    stored = list(hasher.executor.map(hasher.hash, passwords))
+    print(f"login: {n} usuários, {hasher}")
+
+    uncached = Password_Hasher(
+        C.password_algorithm, C.scrypt_n, C.scrypt_r, C.scrypt_p, C.pbkdf2_iterations,
+        C.password_workers, cache_size=0,
+    )
+    start = time.perf_counter()
+    assert all(uncached.verify(password, hashed) for password, hashed in zip(passwords, stored))
+    elapsed = time.perf_counter() - start
+    print(f"  {n / elapsed:10,.1f} logins por segundo (sequencial)")
+
+    start = time.perf_counter()
+    futures = [uncached.submit(password, hashed) for password, hashed in zip(passwords, stored)]
+    assert all(future.result() for future in futures)
+    elapsed = time.perf_counter() - start
+    print(f"  {n / elapsed:10,.1f} logins por segundo ({C.password_workers} threads)")
+
+    for password, hashed in zip(passwords, stored):
+        hasher.verify(password, hashed)
+    repeats = 1000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for password, hashed in zip(passwords, stored):
+            hasher.verify(password, hashed)
+    elapsed = time.perf_counter() - start
+    print(f"  {n * repeats / elapsed:10,.1f} logins por segundo (cache)")
+    assert not hasher.verify("errada", stored[0])
+
+    hasher.close()
+    uncached.close()
+
+
+def bench_search(n: int = 100_000, queries: int = 200) -> None:
+    """
+    Compara a busca pelo índice de nomes com a varredura de todos os produtos
+    comparando os nomes por substring, que não aceita erros de digitação.
+
+    Parameters
+    ----------
+    n : int, optional
+        Quantidade de produtos, by default 100_000
+    queries : int, optional
+        Quantidade de buscas de cada tipo, by default 200
+    """
+    market = create_market(customers=0, products=0)[2]
+    for i in range(n):
+        market.register_product(i, f"{C.produtos[i % len(C.produtos)]} Modelo{i}", 1.0)
+
+    start = time.perf_counter()
+    market.search_products("")
+    print(f"search: {n} produtos, índice construído em {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(0)
+    ids = [rng.randrange(n) for _ in range(queries)]
+    searches = {
+        "exata": [f"modelo{i}" for i in ids],
+        "prefixo": [f"modelo{i}"[:-1] for i in ids],
+        "com erro": [f"mdoelo{i}" for i in ids],
+    }
+    for name, terms in searches.items():
+        start = time.perf_counter()
+        for term in terms:
+            market.search_products(term)
+        indexed = (time.perf_counter() - start) / queries
+
+        start = time.perf_counter()
+        for term in terms[: max(queries // 20, 1)]:
+            [product for product in market.iter_products() if term in product.name.casefold()]
+        scanned = (time.perf_counter() - start) / max(queries // 20, 1)
+        print(f"  {name:>8}: índice {indexed * 1000:8.3f}ms, varredura {scanned * 1000:8.3f}ms por busca")
+
+    assert market.search_products(f"mdoelo{ids[0]}")[0].id == ids[0]
+
+
+def bench_analytics(n: int = 1_000_000, items_per_order: int = 4) -> None:
+    """
+    Compara as agregações da Sales_Table com um laço em Python puro sobre os pedidos:
+    receita por produto, cliente e status, unidades por produto e os 10 produtos
+    de maior receita. A montagem da tabela é medida separadamente.
+
+    Parameters
+    ----------
+    n : int, optional
+        Quantidade de itens, by default 1_000_000
+    items_per_order : int, optional
+        Itens em cada pedido, by default 4
+    """
+    owner, customers, market, _ = create_market(customers=1_000, products=1_000)
+    rng = random.Random(0)
+    # Itens imutáveis são compartilhados entre os pedidos para economizar memória
+    items = [market.products[i].line_item(q) for i in range(1_000) for q in range(1, 6)]
+    statuses = (o_constants.placed, o_constants.sent, o_constants.finished, o_constants.canceled)
+    start_time = 1_700_000_000.0
+    orders = []
+    for i in range(n // items_per_order):
+        order = Order(
+            i,
+            customers[rng.randint(1, 1_000)],
+            rng.sample(items, items_per_order),
+            rng.choice(statuses),
+            start_time + i * 60,
+        )
+        orders.append(order)
+    print(f"analytics: {len(orders) * items_per_order} itens, {len(orders)} pedidos")
+
+    start = time.perf_counter()
+    table = Sales_Table.from_orders(orders)
+    print(f"  montagem da tabela: {time.perf_counter() - start:.2f}s, {table}")
+
+    start = time.perf_counter()
+    sold = table.sold()
+    columnar = (
+        sold.revenue_by_product(),
+        sold.revenue_by_customer(),
+        table.revenue_by_status(),
+        sold.units_by_product(),
+        sold.top_products(10),
+    )
+    elapsed = time.perf_counter() - start
+    print(f"  {'Sales_Table':>11}: {elapsed:.2f}s")
+
+    start = time.perf_counter()
+    by_product: dict[int, int] = {}
+    by_customer: dict[int, int] = {}
+    by_status: dict[str, int] = {}
+    units: dict[int, int] = {}
+    for order in orders:
+        for item in order.products:
+            total = item.get_total_price()
+            by_status[order.status] = by_status.get(order.status, 0) + total
+            if order.status == o_constants.canceled:
+                continue
+            by_product[item.product_id] = by_product.get(item.product_id, 0) + total
+            by_customer[order.customer.id] = by_customer.get(order.customer.id, 0) + total
+            units[item.product_id] = units.get(item.product_id, 0) + item.quantity
+    top = sorted(by_product.items(), key=lambda pair: (-pair[1], pair[0]))[:10]
+    elapsed = time.perf_counter() - start
+    print(f"  {'Python':>11}: {elapsed:.2f}s")
+
+    # Os valores em centavos são somados sem arredondamentos, então os resultados são idênticos
+    assert (by_product, by_customer, by_status, units) == columnar[:4]
+    assert [product_id for product_id, _, _ in columnar[4]] == [product_id for product_id, _ in top]
+
+
+def bench_snapshot(sizes: tuple[int, ...] = (10_000, 100_000, 1_000_000)) -> None:
+    """
+    Compara a database JSON com o snapshot binário: tamanho dos arquivos, tempo de
+    carregamento, leitura dos resumos de todos os pedidos e salvamento.
+    O snapshot é criado convertendo a database JSON, como faz o convert.py.
+
+    Parameters
+    ----------
+    sizes : tuple[int, ...], optional
+        Quantidades de pedidos, by default (10_000, 100_000, 1_000_000)
+    """
+    for n in sizes:
+        print(f"snapshot: {n} pedidos")
+        with tempfile.TemporaryDirectory() as directory:
+            json_filename = os.path.join(directory, "database.json")
+            snapshot_filename = os.path.join(directory, "database.snapshot")
+
+            owner, customers, market, orders = create_market(customers=1_000, products=100)
+            F.save_data(owner, customers, market, orders, json_filename)
+            with open(orders_filename(json_filename), "w", encoding="utf-8") as file:
+                for order in order_dicts(n, customers=1_000):
+                    file.write(json.dumps(order, separators=(",", ":")) + "\n")
+
+            F.save_data(*F.load_data(json_filename), snapshot_filename)
+            summaries = []
+
+            for name, filename in (("JSON", json_filename), ("snapshot", snapshot_filename)):
+                size = sum(
+                    os.path.getsize(os.path.join(directory, file))
+                    for file in os.listdir(directory)
+                    if file.startswith(os.path.basename(filename))
+                    or (name == "JSON" and file.endswith((".jsonl", ".catalogue")))
+                )
+
+                start = time.perf_counter()
+                data = F.load_data(filename)
+                load = time.perf_counter() - start
+
+                start = time.perf_counter()
+                summaries.append(list(data[3].orders.summaries()))
+                scan = time.perf_counter() - start
+                items = sum(len(summary[3]) for summary in summaries[-1])
+
+                start = time.perf_counter()
+                F.save_data(*data, filename)
+                save = time.perf_counter() - start
+
+                print(
+                    f"  {name:>8}: {size / 2**20:7.1f} MiB, carregamento {load:.2f}s, "
+                    f"resumos {scan:.2f}s ({items} itens), salvamento {save:.2f}s"
+                )
+
+            # O snapshot salvo novamente, com os pedidos copiados em bloco, continua idêntico
+            assert summaries[0] == summaries[1]
+            assert summaries[1] == list(F.load_data(snapshot_filename)[3].orders.summaries())
+
+
+def bench_mapped_catalogue(n: int = 200_000, lookups: int = 10_000) -> None:
+    """
+    Compara o carregamento dos produtos da database JSON com o catálogo mapeado
+    na memória: tempo e memória alocada pelo carregamento, consultas por Id e a
+    listagem de todos os produtos.
+
+    Parameters
+    ----------
+    n : int, optional
+        Quantidade de produtos, by default 200_000
+    lookups : int, optional
+        Quantidade de consultas por Id, by default 10_000
+    """
+    print(f"mapped_catalogue: {n} produtos")
+    ids = [random.randrange(n) for _ in range(lookups)]
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "database.json")
+        F.save_data(*create_market(customers=0, products=n, stock=1), filename)
+        with open(filename, "r") as file:
+            metadata = json.load(file)
+        products = F.load_data(filename)[2].list_products()
+        legacy = dict(metadata, products=[product.to_dict() for product in products])
+
+        for name in ("catálogo", "JSON"):
+            if name == "JSON":
+                # Database antiga, com os produtos no mesmo arquivo
+                with open(filename, "w") as file:
+                    json.dump(legacy, file)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            market = F.load_data(filename)[2]
+            load = time.perf_counter() - start
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            start = time.perf_counter()
+            for product_id in ids:
+                market.get_product(product_id)
+            lookup = time.perf_counter() - start
+
+            start = time.perf_counter()
+            listed = market.list_products()
+            listing = time.perf_counter() - start
+
+            assert [product.to_dict() for product in listed] == legacy["products"]
+            print(
+                f"  {name:>8}: carregamento {load:.3f}s ({memory / 2**20:.1f} MiB), "
+                f"{lookups} consultas {lookup:.3f}s, listagem {listing:.2f}s"
+            )
+
+
+def bench_flush(products: int = 100_000, n: int = 100_000) -> None:
+    """
+    Mede as gravações do Flusher: uma gravação completa e gravações somente da
+    seção alterada, separando a cópia do estado, feita com a trava do mercado
+    adquirida, da escrita dos temporários, feita sem ela, e do tempo total, que
+    inclui a sincronização com o disco e a substituição dos arquivos.
+
+    Parameters
+    ----------
+    products : int, optional
+        Quantidade de produtos, by default 100_000
+    n : int, optional
+        Quantidade de pedidos, by default 100_000
+    """
+    print(f"flush: {products} produtos, {n} pedidos")
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "database.json")
+        F.save_data(*create_market(customers=1_000, products=products, stock=1), filename)
+        with open(orders_filename(filename), "w", encoding="utf-8") as file:
+            for order in order_dicts(n, customers=1_000, products=products):
+                file.write(json.dumps(order, separators=(",", ":")) + "\n")
+
+        owner, customers, market, orders = F.load_data(filename)
+        held = []
+        written = []
+
+        def prepare(sections, pending):
+            start = time.perf_counter()
+            write = F.prepare_data(
+                owner, customers, market, orders, filename, None, sections, pending
+            )
+            held.append(time.perf_counter() - start)
+
+            def timed_write() -> None:
+                start = time.perf_counter()
+                write()
+                written.append(time.perf_counter() - start)
+
+            return timed_write
+
+        # Sem intervalo e sem limite de mutações, as gravações são feitas somente aqui
+        flusher = Flusher(prepare, interval=0, mutations=2**62)
+        market.journal = flusher
+        orders.journal = flusher
+
+        def measure(name: str, mutate) -> None:
+            with flusher.lock:
+                mutate()
+            start = time.perf_counter()
+            flusher.flush()
+            total = time.perf_counter() - start
+            print(
+                f"  {name:>9}: {total:.3f}s, cópia com a trava {held[-1]:.4f}s, "
+                f"escrita dos temporários {written[-1]:.3f}s"
+            )
+
+        measure("completa", lambda: market.add_product(0, 1))
+        measure("produtos", lambda: market.add_product(1, 1))
+        measure("clientes", lambda: flusher.record("change_password"))
+        measure("pedidos", lambda: orders.send_order(0))
+        flusher.close()
+
+
+BENCHMARKS = {
+    "memory": bench_memory,
+    "contention": bench_contention,
+    "batch": bench_batch,
+    "catalogue": bench_catalogue,
+    "login": bench_login,
+    "search": bench_search,
+    "analytics": bench_analytics,
+    "snapshot": bench_snapshot,
+    "mapped_catalogue": bench_mapped_catalogue,
+    "flush": bench_flush,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] if len(sys.argv) > 1 else list(BENCHMARKS)
+    for name in selected:
+        start = time.perf_counter()
+        BENCHMARKS[name]()
+        print(f"  ({time.perf_counter() - start:.2f}s)\n")
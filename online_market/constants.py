@@ -6,12 +6,48 @@ quit = 3
 
 # - - - Program Data - - - #
 # Database
+# Com a extensão ".snapshot" a database é salva no snapshot binário, mapeado em memória
 database = "data/database.json"
 
+# Armazenamento
+# "json": os dados alterados são salvos periodicamente por uma thread e ao final da execução
+# "journal": cada mutação é anexada ao journal e compactada periodicamente no database
+# "sqlite": os dados são consultados e alterados sob demanda em um banco SQLite
+storage = "json"
+journal = "data/database.journal"
+journal_compaction = 1000
+sqlite_database = "data/database.sqlite3"
+# Modo "json": intervalo entre as gravações, em segundos, e quantidade de mutações que a antecipa
+flush_interval = 5.0
+flush_mutations = 100
+
+# Validade das reservas de produtos nos carrinhos, em segundos
+reservation_ttl = 10 * 60
+
+# Itens mostrados por página nas listagens
+page_size = 20
+
+# Senhas
+# "scrypt" ou "pbkdf2_sha256", senhas com outros parâmetros são refeitas no próximo login
+password_algorithm = "scrypt"
+scrypt_n = 2**14
+scrypt_r = 8
+scrypt_p = 1
+pbkdf2_iterations = 600_000
+# Threads que verificam senhas sem bloquear o servidor
+password_workers = 4
+# Logins bem sucedidos guardados em cache
+password_cache = 10_000
+
+# Servidor
+host = "127.0.0.1"
+port = 8765
+
 # usuarios
 nomes = ["Brugger"]
 
 # produtos
 produtos = ["Notebook", "Monitor", "Headset"]
-precos = [3000.0, 800.0, 249.99]
+# em centavos
+precos = [300_000, 80_000, 24_999]
 quantidades = [3, 5, 10]
@@ -0,0 +1,38 @@
+import os
+import sys
+
+from storage import Journal
+
+import constants as C
+import functions as F
+
+
+def convert(source: str, target: str) -> None:
+    """
+    Converte uma database entre os formatos JSON e snapshot binário, de acordo com
+    a extensão de cada arquivo. Os registros do journal ainda não incorporados são
+    refeitos, e a sequência do journal é mantida, então o mesmo journal continua
+    válido para a nova database.
+
+    Parameters
+    ----------
+    source : str
+        Caminho da database existente
+    target : str
+        Caminho da database a ser criada
+    """
+    journal = Journal(C.journal, C.journal_compaction) if os.path.exists(C.journal) else None
+    owner, customers, products, orders = F.load_data(source, journal)
+    F.save_data(owner, customers, products, orders, target, journal)
+    if journal is not None:
+        journal.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python online_market/convert.py <database atual> <nova database>")
+        print("Exemplo: python online_market/convert.py data/database.json data/database.snapshot")
+        sys.exit(1)
+
+    convert(sys.argv[1], sys.argv[2])
+    print(f"{sys.argv[1]} convertida para {sys.argv[2]} com sucesso!")
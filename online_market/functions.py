@@ -1,11 +1,43 @@
 import json
 import os
-from typing import Type
+from typing import Callable, Collection, Type
 
-from users import Abstract_User, Address, Customer, Owner
-from products import Product_Manager, Product
+from users import Abstract_User, Address, Customer, Owner, Password_Hasher
+import users.helpers as h
+from products import Product_Manager, Product, Line_Item, Catalogue_Row
 from orders import Order_Manager, Order
-
+from storage import (
+    I_Journal,
+    I_Repository,
+    Journal,
+    SQLite_Repository,
+    Repository_Products,
+    Catalogue_Products,
+    Repository_Customers,
+    Repository_Orders,
+    Repository_Auth_Data,
+    Frozen_Records,
+    Lazy_Order_List,
+    Order_File,
+    orders_filename,
+    write_orders,
+    User_File,
+    customers_filename,
+    write_customers,
+    Catalogue_File,
+    catalogue_filename,
+    write_catalogue,
+    Snapshot_File,
+    is_snapshot,
+    write_snapshot,
+    Pending_Files,
+    replace_file,
+    Flusher,
+    SECTIONS,
+)
+
+from id_allocator import Id_Allocator
+from money import read_price
 import constants as C
 
 
@@ -15,9 +47,11 @@ def save_data(
     products: Product_Manager,
     orders: Order_Manager,
     filename: str,
+    journal: Journal | None = None,
 ) -> None:
     """
-    Salva os dados do programa em um arquivo.
+    Salva os dados do programa em um arquivo, informando caso ocorra um erro.
+    Veja write_data.
 
     Parameters
     ----------
@@ -31,33 +65,190 @@ def save_data(
         Pedidos
     filename : str
         Nome do arquivo a ser criado
+    journal : Journal | None, optional
+        Journal cujos registros estão contidos no snapshot, by default None
     """
-    data = {
-        "owner": owner.to_dict(),
-        "customers": [customer.to_dict() for customer in customers.values()],
-        "products": [product.to_dict() for product in products.list_products()],
-        "orders": [order.to_dict() for order in orders.list_orders()],
-    }
-
     try:
-        with open(filename, "w") as file:
-            json.dump(data, file, indent=4)
+        write_data(owner, customers, products, orders, filename, journal)
     except IOError as e:
         print(f"Um erro ocorreu enquanto escrevendo os dados para {filename}: {e}")
     except Exception as e:
         print(f"Um erro inexperado ocorreu: {e}")
 
 
+def write_data(
+    owner: Owner,
+    customers: dict[Customer.id, Customer],
+    products: Product_Manager,
+    orders: Order_Manager,
+    filename: str,
+    journal: Journal | None = None,
+    sections: Collection[str] = SECTIONS,
+    pending: Pending_Files | None = None,
+) -> None:
+    """
+    Salva os dados do programa em um arquivo.
+    Em uma database JSON, os pedidos e os clientes são salvos em arquivos separados,
+    no formato JSON Lines, e somente os clientes novos ou alterados são escritos.
+    Os produtos são salvos no catálogo binário, que é mapeado na memória ao ser carregado.
+    Em um snapshot binário (extensão ".snapshot") todos os dados ficam no mesmo arquivo.
+
+    Cada arquivo é escrito em um temporário, sincronizado com o disco e só então
+    substitui o arquivo anterior, então uma interrupção no meio da gravação mantém
+    a database anterior completa. O arquivo principal, com os metadados, é o último
+    a ser substituído.
+
+    Parameters
+    ----------
+    owner : Owner
+        Dono
+    customers : dict[Customer.id, Customer]
+        Clientes
+    products : Product_Manager
+        Produtos
+    orders : Order_Manager
+        Pedidos
+    filename : str
+        Nome do arquivo a ser criado
+    journal : Journal | None, optional
+        Journal cujos registros estão contidos no snapshot, by default None
+    sections : Collection[str], optional
+        Seções alteradas, "products", "customers" e/ou "orders", as demais não são
+        escritas novamente, by default todas. Os metadados são sempre escritos, e
+        o snapshot binário é sempre escrito por completo
+    pending : Pending_Files | None, optional
+        Caso fornecido, a sincronização e a substituição dos arquivos são adiadas
+        até seu commit, by default None
+
+    Raises
+    ------
+    IOError
+        Caso ocorra um erro na escrita, a database anterior é mantida
+    """
+    files = pending if pending is not None else Pending_Files()
+    try:
+        prepare_data(owner, customers, products, orders, filename, journal, sections, files)()
+
+        if pending is None:
+            files.sync()
+            files.commit()
+    except BaseException:
+        if pending is None:
+            files.discard()
+        raise
+
+
+def prepare_data(
+    owner: Owner,
+    customers: dict[Customer.id, Customer],
+    products: Product_Manager,
+    orders: Order_Manager,
+    filename: str,
+    journal: Journal | None,
+    sections: Collection[str],
+    pending: Pending_Files,
+) -> Callable[[], None]:
+    """
+    Copia os dados a serem salvos e retorna a função que escreve seus arquivos.
+    Veja write_data.
+
+    A cópia deve ser feita sem que o mercado seja alterado: os registros das
+    entidades carregadas são montados nela (veja Frozen_Records), então a escrita
+    salva o mercado como ele estava, mesmo sendo alterado novamente enquanto isso.
+    Os clientes alterados são poucos e são anexados ao arquivo aberto, então são
+    escritos aqui.
+
+    Parameters
+    ----------
+    owner : Owner
+        Dono
+    customers : dict[Customer.id, Customer]
+        Clientes
+    products : Product_Manager
+        Produtos
+    orders : Order_Manager
+        Pedidos
+    filename : str
+        Nome do arquivo a ser criado
+    journal : Journal | None
+        Journal cujos registros estão contidos no snapshot
+    sections : Collection[str]
+        Seções alteradas
+    pending : Pending_Files
+        Arquivos escritos, sincronizados e substituídos por quem chamou a função
+
+    Returns
+    -------
+    Callable[[], None]
+        Escreve os arquivos, adicionando-os em pending
+    """
+    metadata = {
+        "owner": owner.to_dict(),
+        "id_allocators": {
+            "products": products.id_allocator.to_dict(),
+            "orders": orders.id_allocator.to_dict(),
+        },
+        "journal_seq": journal.seq if journal is not None else 0,
+    }
+
+    if is_snapshot(filename):
+        product_copy = Frozen_Records(products.products)
+        customer_copy = Frozen_Records(customers)
+        order_copy = Frozen_Records(orders.orders)
+        return lambda: write_snapshot(
+            filename,
+            metadata,
+            (product_copy[id] for id in sorted(product_copy)),
+            customer_copy,
+            order_copy,
+            pending,
+        )
+
+    # Uma seção sem arquivo ainda está no arquivo principal, em uma database antiga
+    customers_file = customers_filename(filename)
+    if "customers" in sections or not os.path.exists(customers_file):
+        write_customers(customers_file, customers, pending)
+
+    catalogue = catalogue_filename(filename)
+    product_copy = None
+    if "products" in sections or not os.path.exists(catalogue):
+        product_copy = Frozen_Records(products.products)
+    orders_file = orders_filename(filename)
+    order_copy = None
+    if "orders" in sections or not os.path.exists(orders_file):
+        order_copy = Frozen_Records(orders.orders)
+
+    def write() -> None:
+        if product_copy is not None:
+            write_catalogue(catalogue, product_copy, pending)
+        if order_copy is not None:
+            write_orders(orders_file, order_copy, pending)
+
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, "w") as file:
+            json.dump(metadata, file, indent=4)
+        replace_file(temp_filename, filename, pending=pending)
+
+    return write
+
+
 def load_data(
     filename: str,
+    journal: Journal | None = None,
 ) -> tuple[Owner, dict[Customer.id, Customer], Product_Manager, Order_Manager]:
     """
-    Carrega os dados do mercado de um arquivo JSON.
+    Carrega os dados do mercado de um arquivo JSON ou de um snapshot binário.
+    Os clientes e os pedidos não são carregados, somente indexados, sendo lidos
+    de seus arquivos apenas quando acessados, assim como os produtos do catálogo.
+    Caso um journal seja fornecido, os registros posteriores ao snapshot são
+    refeitos e as mutações seguintes passam a ser registradas nele.
 
     Parameters
     ----------
     filename : str
-        Caminho para o arquivo JSON.
+        Caminho para o arquivo JSON ou snapshot.
+    journal : Journal | None, optional
+        Journal com as mutações posteriores ao snapshot, by default None
 
     Returns
     -------
@@ -74,36 +265,419 @@ def load_data(
     if not os.path.exists(filename):
         raise FileNotFoundError("Arquivo {filename} não encontrado.")
 
-    with open(filename, "r") as file:
-        data = json.load(file)
+    order_file: Order_File | Snapshot_File | None = None
+    if is_snapshot(filename):
+        # Os produtos são lidos das colunas do snapshot, sem decodificar JSON
+        order_file = Snapshot_File(filename)
+        data = dict(order_file.metadata, products=order_file.product_records())
+    else:
+        with open(filename, "r") as file:
+            data = json.load(file)
 
     owner = Owner.from_dict(data["owner"])
 
-    customers = {}
-    for customer_data in data["customers"]:
-        customer = Customer.from_dict(customer_data)
-        customers[customer.id] = customer
+    customers: dict[Customer.id, Customer] | Repository_Customers
+    if isinstance(order_file, Snapshot_File):
+        customers = Repository_Customers(order_file, order_file)
+    elif "customers" in data:
+        # Database antiga, com os clientes no mesmo arquivo
+        customers = {}
+        for customer_data in data["customers"]:
+            customer = Customer.from_dict(customer_data)
+            customers[customer.id] = customer
+    else:
+        order_file = Order_File(orders_filename(filename))
+        customers = Repository_Customers(User_File(customers_filename(filename)), order_file)
+
+    products_dict: dict[Product.id, Product] | Catalogue_Products
+    if "products" in data:
+        # Database antiga ou snapshot, com os produtos no mesmo arquivo
+        products_dict = {}
+        for product_data in data["products"]:
+            product = Product.from_dict(product_data, owner)
+            products_dict[product.id] = product
+    else:
+        # O catálogo é mapeado na memória e compartilhado entre os processos,
+        # e cada produto só é lido quando acessado
+        products_dict = Catalogue_Products(
+            Catalogue_File(catalogue_filename(filename)), owner
+        )
+    # Databases antigas não possuem o estado dos alocadores
+    allocators = data.get("id_allocators", {})
+    product_ids = None
+    if "products" in allocators:
+        product_ids = Id_Allocator.from_dict(allocators["products"])
+    order_ids = None
+    if "orders" in allocators:
+        order_ids = Id_Allocator.from_dict(allocators["orders"])
+
+    products = Product_Manager(owner, products_dict, product_ids)
+
+    if "orders" in data:
+        # Database antiga, com os pedidos no mesmo arquivo
+        orders_dict = {}
+        for order_data in data["orders"]:
+            order = Order.from_dict(order_data, customers)
+            orders_dict[order.id] = order
+        orders = Order_Manager(owner, orders_dict, order_ids)
+    else:
+        if order_file is None:
+            order_file = Order_File(orders_filename(filename))
+        lazy_orders = Repository_Orders(order_file, customers)
+        if isinstance(customers, Repository_Customers):
+            customers.orders = lazy_orders
+        else:
+            for customer in customers.values():
+                customer.orders = Lazy_Order_List(
+                    lazy_orders, order_file.order_ids_by_customer(customer.id)
+                )
+        orders = Order_Manager(owner, lazy_orders, order_ids)
+
+    if journal is not None:
+        snapshot_seq = data.get("journal_seq", 0)
+        replay_journal(journal, snapshot_seq, owner, customers, products, orders)
+        journal.resume(snapshot_seq)
+        products.journal = journal
+        orders.journal = journal
+
+    return owner, customers, products, orders
+
+
+def replay_journal(
+    journal: Journal,
+    after: int,
+    owner: Owner,
+    customers: dict[Customer.id, Customer],
+    products: Product_Manager,
+    orders: Order_Manager,
+) -> None:
+    """
+    Refaz as mutações registradas em um journal sobre os dados carregados de um snapshot.
+
+    Parameters
+    ----------
+    journal : Journal
+        Journal
+    after : int
+        Sequência do último registro contido no snapshot
+    owner : Owner
+        Dono
+    customers : dict[Customer.id, Customer]
+        Clientes
+    products : Product_Manager
+        Produtos
+    orders : Order_Manager
+        Pedidos
+
+    Raises
+    ------
+    ValueError
+        Caso um registro seja desconhecido ou inconsistente com o snapshot
+    """
+    for record in journal.replay(after):
+        match record["op"]:
+            case "register_product":
+                products.register_product(record["id"], record["name"], read_price(record))
+            case "add_product":
+                products.add_product(record["id"], record["ammount"])
+            case "remove_product":
+                products.remove_product(record["id"], record["ammount"])
+            case "delete_product":
+                products.delete_product(record["id"])
+            case "import_products":
+                products.import_products(
+                    Catalogue_Row(0, data["id"], data["name"], read_price(data), data["quantity"])
+                    for data in record["products"]
+                )
+            case "place_order":
+                order = orders.place_order(
+                    customers[record["customer_id"]],
+                    [Line_Item.from_dict(data) for data in record["products"]],
+                    record.get("placed_at"),
+                )
+                if order.id != record["id"]:
+                    raise ValueError(
+                        f"Journal inconsistente! Esperado pedido {record['id']}, recebeu {order.id}"
+                    )
+            case "cancel_order":
+                orders.cancel_order(record["id"])
+            case "send_order":
+                orders.send_order(record["id"])
+            case "receive_order":
+                orders.receive_order(record["id"])
+            case "register":
+                customer = Customer.from_dict(record["customer"])
+                customers[customer.id] = customer
+            case "change_password":
+                if record["id"] == owner.id:
+                    owner.password = record["password"]
+                else:
+                    customers[record["id"]].password = record["password"]
+            case _:
+                raise ValueError(f"Operação desconhecida no journal: {record['op']}")
+
+
+def compact(
+    owner: Owner,
+    customers: dict[Customer.id, Customer],
+    products: Product_Manager,
+    orders: Order_Manager,
+    filename: str,
+    journal: Journal,
+) -> None:
+    """
+    Incorpora os registros do journal em um novo snapshot e esvazia o journal.
+    Caso o snapshot não possa ser escrito, o journal é mantido.
+
+    Parameters
+    ----------
+    owner : Owner
+        Dono
+    customers : dict[Customer.id, Customer]
+        Clientes
+    products : Product_Manager
+        Produtos
+    orders : Order_Manager
+        Pedidos
+    filename : str
+        Nome do arquivo do snapshot
+    journal : Journal
+        Journal a ser compactado
+    """
+    try:
+        write_data(owner, customers, products, orders, filename, journal)
+    except IOError as e:
+        print(f"Um erro ocorreu enquanto escrevendo os dados para {filename}: {e}")
+        return
+    journal.clear()
+
 
-    products_dict = {}
-    for product_data in data["products"]:
-        product = Product.from_dict(product_data, owner)
-        products_dict[product.id] = product
-    products = Product_Manager(owner, products_dict)
+def open_repository(filename: str, json_filename: str) -> SQLite_Repository:
+    """
+    Abre o repositório SQLite, importando a database JSON ou o snapshot binário
+    caso o repositório esteja vazio.
 
-    orders_dict = {}
-    for order_data in data["orders"]:
-        order = Order.from_dict(order_data, customers, owner)
-        orders_dict[order.id] = order
-    orders = Order_Manager(owner, orders_dict)
+    Parameters
+    ----------
+    filename : str
+        Caminho do arquivo SQLite
+    json_filename : str
+        Caminho da database JSON ou do snapshot a ser importado
+
+    Returns
+    -------
+    SQLite_Repository
+        Repositório
+
+    Raises
+    ------
+    FileNotFoundError
+        Caso o repositório esteja vazio e a database JSON não exista
+    """
+    repository = SQLite_Repository(filename)
+    if repository.is_empty():
+        if not os.path.exists(json_filename):
+            repository.close()
+            os.remove(filename)
+            raise FileNotFoundError(f"Arquivo {json_filename} não encontrado.")
+
+        if is_snapshot(json_filename):
+            snapshot = Snapshot_File(json_filename)
+            data = dict(
+                snapshot.metadata,
+                products=snapshot.product_records(),
+                customers=snapshot.records(),
+                orders=snapshot.order_records(),
+            )
+        else:
+            with open(json_filename, "r") as file:
+                data = json.load(file)
+        if "products" not in data:
+            catalogue = Catalogue_File(catalogue_filename(json_filename))
+            data["products"] = catalogue.records()
+            catalogue.close()
+        if "customers" not in data:
+            data["customers"] = User_File(customers_filename(json_filename)).records()
+        if "orders" not in data:
+            data["orders"] = Order_File(orders_filename(json_filename)).records()
+        repository.import_data(data)
+
+    return repository
+
+
+def load_repository(
+    repository: I_Repository,
+) -> tuple[Owner, Repository_Customers, Product_Manager, Order_Manager]:
+    """
+    Carrega o mercado a partir de um repositório.
+    Nenhum cliente, produto ou pedido é lido até ser acessado, e as mutações
+    são aplicadas diretamente no repositório.
+
+    Parameters
+    ----------
+    repository : I_Repository
+        Repositório
+
+    Returns
+    -------
+    tuple[Owner, Repository_Customers, Product_Manager, Order_Manager]
+        Tupla contendo: owner, customers, products e orders
+    """
+    owner = Owner.from_dict(repository.load_owner())
+
+    customers = Repository_Customers(repository, repository)
+    customers.orders = Repository_Orders(repository, customers)
+
+    products = Product_Manager(
+        owner,
+        Repository_Products(repository, owner),
+        Id_Allocator(repository.last_product_id() + 1),
+    )
+    orders = Order_Manager(
+        owner, customers.orders, Id_Allocator(repository.last_order_id() + 1)
+    )
+    products.journal = repository
+    orders.journal = repository
 
     return owner, customers, products, orders
 
 
+def configure_passwords() -> None:
+    """
+    Configura o hash das senhas de todos usuários a partir das constantes.
+    """
+    Abstract_User.hasher = Password_Hasher(
+        C.password_algorithm,
+        C.scrypt_n,
+        C.scrypt_r,
+        C.scrypt_p,
+        C.pbkdf2_iterations,
+        C.password_workers,
+        C.password_cache,
+    )
+
+
+def open_market(
+    storage: str,
+) -> tuple[
+    Owner, dict[Customer.id, Customer], Product_Manager, Order_Manager, I_Journal | None
+]:
+    """
+    Carrega o mercado de acordo com o modo de armazenamento.
+
+    No modo "json" as mutações são entregues a um Flusher, que salva a database
+    periodicamente em uma thread separada.
+
+    Parameters
+    ----------
+    storage : str
+        Modo de armazenamento: "json", "journal" ou "sqlite"
+
+    Returns
+    -------
+    tuple[Owner, dict[Customer.id, Customer], Product_Manager, Order_Manager, I_Journal | None]
+        Tupla contendo: owner, customers, products, orders e o journal,
+        o journal é None caso as mutações não sejam registradas
+    """
+    configure_passwords()
+
+    journal: I_Journal | None = None
+    match storage:
+        case "sqlite":
+            journal = open_repository(C.sqlite_database, C.database)
+            owner, customers, products, orders = load_repository(journal)
+        case "journal":
+            journal = Journal(C.journal, C.journal_compaction)
+            owner, customers, products, orders = load_data(C.database, journal)
+        case _:
+            owner, customers, products, orders = load_data(C.database)
+
+            def prepare(sections: set[str], pending: Pending_Files) -> Callable[[], None]:
+                return prepare_data(
+                    owner, customers, products, orders, C.database, None, sections, pending
+                )
+
+            journal = Flusher(prepare, C.flush_interval, C.flush_mutations)
+            products.journal = journal
+            orders.journal = journal
+
+    products.reservation_ttl = C.reservation_ttl
+    Abstract_User.page_size = C.page_size
+    h.input_lock = journal.lock if isinstance(journal, Flusher) else None
+    return owner, customers, products, orders, journal
+
+
+def close_market(
+    owner: Owner,
+    customers: dict[Customer.id, Customer],
+    products: Product_Manager,
+    orders: Order_Manager,
+    journal: I_Journal | None,
+) -> None:
+    """
+    Finaliza o mercado, salvando os dados caso as mutações não tenham sido registradas.
+
+    Parameters
+    ----------
+    owner : Owner
+        Dono
+    customers : dict[Customer.id, Customer]
+        Clientes
+    products : Product_Manager
+        Produtos
+    orders : Order_Manager
+        Pedidos
+    journal : I_Journal | None
+        Journal
+    """
+    if journal is None:
+        save_data(owner, customers, products, orders, C.database)
+    else:
+        journal.close()
+    Abstract_User.hasher.close()
+
+
+def migrate_passwords(
+    owner: Owner,
+    customers: dict[Customer.id, Customer],
+    journal: I_Journal | None = None,
+) -> int:
+    """
+    Converte todas as senhas armazenadas em texto puro em hashes.
+    Os hashes são calculados em paralelo pelas threads do Password_Hasher.
+
+    Parameters
+    ----------
+    owner : Owner
+        Dono
+    customers : dict[Customer.id, Customer]
+        Clientes
+    journal : I_Journal | None, optional
+        Journal onde as alterações devem ser anotadas, by default None
+
+    Returns
+    -------
+    int
+        Quantidade de senhas convertidas
+    """
+    hasher = Abstract_User.hasher
+    users: list[Abstract_User] = [owner, *customers.values()]
+    plaintext = [user for user in users if not hasher.is_hashed(user.password)]
+
+    hashes = hasher.executor.map(hasher.hash, [user.password for user in plaintext])
+    for user, hashed in zip(plaintext, hashes):
+        user.password = hashed
+        if journal is not None:
+            journal.record("change_password", id=user.id, password=hashed)
+    return len(plaintext)
+
+
 def generate_auth_data(
     owner: Owner, customers: dict[Customer.id, Customer]
 ) -> dict[Abstract_User.name, Abstract_User]:
     """
     Cria os dados de autenticação para todos usuários do sistema.
+    Clientes vindos de um repositório são consultados sob demanda.
 
     Parameters
     ----------
@@ -118,6 +692,9 @@ def generate_auth_data(
         Dados de autenticação de todos usuários
     """
 
+    if isinstance(customers, Repository_Customers):
+        return Repository_Auth_Data(owner, customers)
+
     auth_data: dict[Abstract_User.name, Abstract_User] = dict()
 
     for customer in customers.values():
@@ -128,9 +705,13 @@ def generate_auth_data(
     return auth_data
 
 
-def login(auth_data: dict[Abstract_User.name, Abstract_User]) -> Abstract_User | None:
+def login(
+    auth_data: dict[Abstract_User.name, Abstract_User],
+    journal: I_Journal | None = None,
+) -> Abstract_User | None:
     """
     Inicia o processo de login na plataforma.
+    Senhas em texto puro ou com parâmetros antigos são convertidas após o login.
 
     Parameters
     ----------
@@ -138,6 +719,8 @@ def login(auth_data: dict[Abstract_User.name, Abstract_User]) -> Abstract_User |
         Dicionário contendo todos usuários do sistema
         key = Nome do usuário
         value = Objeto do usuário
+    journal : I_Journal | None, optional
+        Journal onde a conversão da senha deve ser anotada, by default None
 
     Returns
     -------
@@ -147,17 +730,22 @@ def login(auth_data: dict[Abstract_User.name, Abstract_User]) -> Abstract_User |
     """
 
     print("Insira seu nome de usuário:")
-    name = input(">> ")
+    name = h.ask()
 
-    if name not in auth_data.keys():
+    if name not in auth_data:
         print("Nome incorreto.")
         return None
     else:
         print("\nInsira sua senha:")
-        password = input(">> ")
-        if password == auth_data[name].password:
+        password = h.ask()
+        user = auth_data[name]
+        if user.check_password(password):
             print("Login bem sucedido!")
-            return auth_data[name]
+            if user.hasher.needs_rehash(user.password):
+                user.set_password(password)
+                if journal is not None:
+                    journal.record("change_password", id=user.id, password=user.password)
+            return user
         else:
             print("Senha incorreta!")
             return None
@@ -174,9 +762,30 @@ def is_zip_code(zip_code: str) -> bool:
     return False
 
 
+def next_customer_id(customers: dict[Customer.id, Customer]) -> int:
+    """
+    Obtem o Id que deve ser usado pelo próximo cliente registrado.
+    Clientes vindos de um repositório não são percorridos.
+
+    Parameters
+    ----------
+    customers : dict[Customer.id, Customer]
+        Clientes
+
+    Returns
+    -------
+    int
+        Id livre
+    """
+    if isinstance(customers, Repository_Customers):
+        return customers.next_id()
+    return max(customers, default=0) + 1
+
+
 def register(
     customers: dict[Customer.id, Customer],
     auth_data: dict[Abstract_User.name, Abstract_User],
+    journal: I_Journal | None = None,
 ) -> None:
     """
     Realiza o registro de um novo cliente e o insere na lista de clientes.
@@ -190,24 +799,29 @@ def register(
         Dicionário contendo todos usuários do sistema
         key = Nome do usuário
         value = Objeto do usuário
+
+    journal : I_Journal | None, optional
+        Journal onde o registro deve ser anotado, by default None
     """
 
     # Recbe o nome
     while True:
         print("Insira seu nome de usuário:")
-        name = input(">> ")
+        name = h.ask()
 
         if len(name) <= 1:
             print("Nome muito curto!\n")
         elif not name.isalpha():
             print("O nome deve ser composto somente de letras!\n")
+        elif name in auth_data:
+            print("Este nome já está cadastrado!\n")
         else:
             break
 
     # Recebe a senha
     while True:
         print("\nInsira sua senha:")
-        password = input(">> ")
+        password = h.ask()
 
         if len(password) <= 1:
             print("Insira uma senha mais comprida!")
@@ -218,7 +832,7 @@ def register(
     # Estado
     while True:
         print("\nInsira o nome do seu estado:")
-        state = input(">> ")
+        state = h.ask()
         if not all(char.isalpha() or char.isspace() for char in state):
             print("O nome deve ser composto somente por letras e espaços!")
         else:
@@ -226,7 +840,7 @@ def register(
     # Cidade
     while True:
         print("\nInsira o nome da sua cidade:")
-        city = input(">> ")
+        city = h.ask()
         if not all(char.isalpha() or char.isspace() for char in city):
             print("O nome deve ser composto somente por letras e espaços!")
         else:
@@ -234,7 +848,7 @@ def register(
     # Rua
     while True:
         print("\nInsira o nome da sua rua:")
-        street = input(">> ")
+        street = h.ask()
         if not all(char.isalpha() or char.isspace() for char in street):
             print("O nome deve ser composto somente por letras e espaços!")
         else:
@@ -242,7 +856,7 @@ def register(
     # Numero da casa
     while True:
         print("\nInsira o número da sua casa:")
-        house_num_str = input(">> ")
+        house_num_str = h.ask()
         if not house_num_str.isnumeric():
             print("O nome deve ser composto somente por letras e espaços!")
         else:
@@ -250,11 +864,11 @@ def register(
             break
     # Complemento
     print("\nInsira o complemento (se houver):")
-    complement = input(">> ")
+    complement = h.ask()
     # CEP
     while True:
         print("\nInsira o seu CEP (xxxxx-xxx):")
-        zip_code = input(">> ")
+        zip_code = h.ask()
 
         if not is_zip_code(zip_code):
             print("CEP inválido!")
@@ -271,16 +885,18 @@ def register(
 
     while True:
         print("Confirmar usuário? [s/n]")
-        yes_no = input(">> ")
+        yes_no = h.ask()
         if yes_no == "s":
             new_user = Customer(
-                len(customers) + 1,
+                next_customer_id(customers),
                 name,
-                password,
+                Abstract_User.hasher.hash(password),
                 Address(street, city, state, zip_code, house_number, complement),
             )
             customers[new_user.id] = new_user
             auth_data[new_user.name] = new_user
+            if journal is not None:
+                journal.record("register", customer=new_user.to_dict())
             print("Cadastro realizado com sucesso!\n")
             break
         elif yes_no == "n":
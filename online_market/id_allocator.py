@@ -0,0 +1,253 @@
+from __future__ import annotations
+import heapq
+from typing import Iterable
+
+
+class Id_Allocator:
+    def __init__(
+        self,
+        next_id: int = 0,
+        free: list[int] | None = None,
+        gaps: list[tuple[int, int]] | None = None,
+    ) -> None:
+        """
+        Alocador de Ids.
+        Mantém um contador crescente, uma pilha de Ids liberados e as lacunas na
+        sequência de Ids, guardadas como intervalos. Ids liberados são reaproveitados
+        primeiro, depois as lacunas, da menor para a maior, e só então novos Ids são
+        criados.
+
+        As lacunas ficam em um dicionário início -> fim e em um heap de inícios, e
+        a menor delas é consumida pelo início sem reordenar o heap. Um Id reservado
+        dentro de uma lacuna é apenas anotado, e descartado quando a alocação chega
+        a ele. Assim alocar, liberar e reservar custam O(1), e somente esgotar uma
+        lacuna custa O(log n) na quantidade de lacunas.
+
+        Parameters
+        ----------
+        next_id : int, optional
+            Próximo Id nunca utilizado, by default 0
+        free : list[int] | None, optional
+            Ids liberados, o último da lista é o próximo a ser reaproveitado, by default None
+        gaps : list[tuple[int, int]] | None, optional
+            Lacunas, como pares (início, fim) com o fim exclusivo, by default None
+        """
+        self._next = next_id
+        self._free_stack: list[int] = list(free) if free is not None else []
+        self._free: set[int] = set(self._free_stack)
+        self._gaps: dict[int, int] = {start: stop for start, stop in gaps or () if start < stop}
+        self._starts: list[int] = list(self._gaps)
+        heapq.heapify(self._starts)
+        # Ids reservados dentro das lacunas
+        self._taken: set[int] = set()
+
+    @staticmethod
+    def from_ids(ids: Iterable[int]) -> Id_Allocator:
+        """
+        Cria um alocador a partir dos Ids já utilizados.
+        Os buracos na sequência são reaproveitados, do menor para o maior.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Ids utilizados
+
+        Returns
+        -------
+        Id_Allocator
+            Alocador
+        """
+        gaps = []
+        next_id = 0
+        for id in sorted(set(ids)):
+            if id > next_id:
+                gaps.append((next_id, id))
+            next_id = id + 1
+        return Id_Allocator(next_id, gaps=gaps)
+
+    @staticmethod
+    def from_dict(data: dict) -> Id_Allocator:
+        return Id_Allocator(data["next"], data["free"], data.get("gaps"))
+
+    def to_dict(self) -> dict:
+        """
+        Transforma o objeto em um dicionário.
+
+        Returns
+        -------
+        dict
+            Dicionário
+        """
+        self.__discard_stale()
+        return {
+            "next": self._next,
+            "free": [id for id in self._free_stack if id in self._free],
+            "gaps": self.__split_gaps(),
+        }
+
+    def __split_gaps(self) -> list[list[int]]:
+        """
+        Lista as lacunas em ordem crescente, divididas nos Ids reservados dentro delas.
+        """
+        taken = sorted(self._taken)
+        gaps = []
+        i = 0
+        for start, stop in sorted(self._gaps.items()):
+            while i < len(taken) and taken[i] < stop:
+                if taken[i] > start:
+                    gaps.append([start, taken[i]])
+                start = max(start, taken[i] + 1)
+                i += 1
+            if start < stop:
+                gaps.append([start, stop])
+        return gaps
+
+    def __discard_stale(self) -> None:
+        # Ids reservados continuam na pilha até chegarem ao topo
+        while len(self._free_stack) > 0 and self._free_stack[-1] not in self._free:
+            self._free_stack.pop()
+
+    def __first_gap(self) -> int | None:
+        """
+        Obtem o primeiro Id da menor lacuna, descartando os Ids reservados no seu início.
+        """
+        while len(self._starts) > 0:
+            first = start = self._starts[0]
+            stop = self._gaps[first]
+            while start < stop and start in self._taken:
+                self._taken.remove(start)
+                start += 1
+            if start < stop:
+                if start != first:
+                    self.__move_first_gap(start)
+                return start
+            del self._gaps[first]
+            heapq.heappop(self._starts)
+        return None
+
+    def __move_first_gap(self, start: int) -> None:
+        """
+        Move o início da menor lacuna, que continua sendo a menor.
+        """
+        stop = self._gaps.pop(self._starts[0])
+        if start < stop:
+            self._gaps[start] = stop
+            # O novo início continua menor que os demais, então o heap segue válido
+            self._starts[0] = start
+        else:
+            heapq.heappop(self._starts)
+
+    def peek(self) -> int:
+        """
+        Obtem o próximo Id a ser alocado, sem alocá-lo.
+
+        Returns
+        -------
+        int
+            Id
+        """
+        self.__discard_stale()
+        if len(self._free_stack) > 0:
+            return self._free_stack[-1]
+        start = self.__first_gap()
+        return start if start is not None else self._next
+
+    def allocate(self) -> int:
+        """
+        Aloca um novo Id.
+
+        Returns
+        -------
+        int
+            Id
+        """
+        id = self.peek()
+        self.reserve(id)
+        return id
+
+    def allocate_many(self, count: int) -> list[int]:
+        """
+        Aloca vários Ids de uma só vez, na mesma ordem em que allocate os alocaria.
+        Lacunas e Ids novos são alocados como faixas inteiras.
+
+        Parameters
+        ----------
+        count : int
+            Quantidade de Ids
+
+        Returns
+        -------
+        list[int]
+            Ids alocados
+        """
+        ids: list[int] = []
+        while len(ids) < count:
+            self.__discard_stale()
+            missing = count - len(ids)
+            if len(self._free_stack) > 0:
+                id = self._free_stack.pop()
+                self._free.remove(id)
+                ids.append(id)
+                continue
+
+            start = self.__first_gap()
+            if start is None:
+                ids.extend(range(self._next, self._next + missing))
+                self._next += missing
+                continue
+            stop = min(self._gaps[start], start + missing)
+            for id in range(start, stop):
+                if id in self._taken:
+                    self._taken.remove(id)
+                else:
+                    ids.append(id)
+            self.__move_first_gap(stop)
+        return ids
+
+    def reserve(self, id: int) -> None:
+        """
+        Marca um Id específico, que não está em uso, como utilizado.
+
+        Parameters
+        ----------
+        id : int
+            Id
+
+        Raises
+        ------
+        ValueError
+            Caso o Id seja negativo
+        """
+        if id < 0:
+            raise ValueError("O Id não pode ser negativo!")
+
+        if id in self._free:
+            self._free.remove(id)
+        elif id >= self._next:
+            # Ids pulados formam uma nova lacuna, maior que todas as outras
+            if id > self._next:
+                self._gaps[self._next] = id
+                heapq.heappush(self._starts, self._next)
+            self._next = id + 1
+        elif self.__first_gap() == id:
+            self.__move_first_gap(id + 1)
+        else:
+            # Um Id abaixo do contador que não foi liberado está em uma lacuna
+            self._taken.add(id)
+
+    def release(self, id: int) -> None:
+        """
+        Libera um Id em uso para ser reaproveitado.
+
+        Parameters
+        ----------
+        id : int
+            Id
+        """
+        if id < self._next and id not in self._free:
+            self._free_stack.append(id)
+            self._free.add(id)
+
+    def __repr__(self) -> str:
+        gaps = sum(stop - start for start, stop in self._gaps.items()) - len(self._taken)
+        return f"Id_Allocator(next={self._next}, contem {len(self._free) + gaps} ids livres)"
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Os valores monetários são guardados em centavos inteiros, então somas de milhões
+# de itens são exatas e não acumulam erros de arredondamento
+CENTS = 100
+
+_CENT = Decimal("0.01")
+
+
+def to_cents(amount: float | int | str | Decimal) -> int:
+    """
+    Converte um valor em reais para centavos, arredondando meio centavo para cima.
+    Floats são convertidos a partir de sua representação mais curta, então 249.99
+    resulta em exatamente 24999 centavos.
+
+    Parameters
+    ----------
+    amount : float | int | str | Decimal
+        Valor em reais
+
+    Returns
+    -------
+    int
+        Valor em centavos
+
+    Raises
+    ------
+    ValueError
+        Caso o valor não seja um número finito
+    """
+    try:
+        value = Decimal(str(amount).strip())
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: {amount}") from None
+    if not value.is_finite():
+        raise ValueError(f"Valor inválido: {amount}")
+    return int(value.quantize(_CENT, rounding=ROUND_HALF_UP) * CENTS)
+
+
+def parse_cents(text: str) -> int:
+    """
+    Converte um valor em reais digitado pelo usuário para centavos,
+    aceitando vírgula como separador decimal.
+
+    Parameters
+    ----------
+    text : str
+        Valor em reais, como "249,99"
+
+    Returns
+    -------
+    int
+        Valor em centavos
+
+    Raises
+    ------
+    ValueError
+        Caso o texto não seja um número
+    """
+    return to_cents(text.strip().replace(",", "."))
+
+
+def format_cents(cents: int) -> str:
+    """
+    Formata um valor em centavos como reais, sempre com duas casas decimais.
+
+    Parameters
+    ----------
+    cents : int
+        Valor em centavos
+
+    Returns
+    -------
+    str
+        Valor em reais, como "3249.99"
+    """
+    sign = "-" if cents < 0 else ""
+    reais, cents = divmod(abs(int(cents)), CENTS)
+    return f"{sign}{reais}.{cents:02d}"
+
+
+def read_price(data: dict) -> int:
+    """
+    Lê o preço de um dicionário persistido.
+    Dados atuais guardam centavos em "price_cents"; dados anteriores guardam reais
+    em ponto flutuante em "price" e são migrados ao serem lidos.
+
+    Parameters
+    ----------
+    data : dict
+        Dicionário de um produto ou item
+
+    Returns
+    -------
+    int
+        Preço em centavos
+
+    Raises
+    ------
+    KeyError
+        Caso o dicionário não possua preço
+    """
+    cents = data.get("price_cents")
+    if cents is not None:
+        return int(cents)
+    return to_cents(data["price"])
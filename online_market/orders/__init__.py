@@ -1,3 +1,5 @@
+from orders.pricing import Priced_Items, line_description
 from orders.order import Order
+from orders.order_result import Order_Result
 from orders.interfaces import I_Order_Service
 from orders.order_manager import Order_Manager
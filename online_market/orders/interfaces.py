@@ -2,14 +2,19 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from products import Product
+    from products import Line_Item, Hold
     from users import Customer
-    from orders import Order
+    from orders import Order, Priced_Items
 
 
 class I_Order_Service(ABC):
     @abstractmethod
-    def place_order(self, customer: "Customer", products: "list[Product]") -> "Order":
+    def place_order(
+        self,
+        customer: "Customer",
+        products: "list[Line_Item | Hold] | Priced_Items",
+        placed_at: float | None = None,
+    ) -> "Order":
         pass
 
     @abstractmethod
@@ -2,19 +2,34 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from orders import constants as c
-from products import Product
+from orders.pricing import Priced_Items, line_description
+from money import format_cents
+from products import Line_Item
 
 if TYPE_CHECKING:
-    from users import Customer, Owner
+    from users import Customer
 
 
 class Order:
+    __slots__ = (
+        "__id",
+        "__customer",
+        "_status",
+        "_products",
+        "_price",
+        "_placed_at",
+        "_lines",
+        "_description",
+    )
+
     def __init__(
         self,
         id: int,
         customer: "Customer",
-        products: list[Product],
+        products: list[Line_Item],
         status: str = c.placed,
+        placed_at: float | None = None,
+        priced: Priced_Items | None = None,
     ) -> None:
         """
         Pedido.
@@ -25,33 +40,46 @@ class Order:
             Identificador
         customer : Customer
             Cliente
-        products : list[Product]
-            Produtos
+        products : list[Line_Item]
+            Itens do pedido
         status : str, optional
             Status do Pedido, by default c.placed
+        placed_at : float | None, optional
+            Instante em que o pedido foi realizado, em segundos desde a época Unix,
+            None para pedidos anteriores ao registro do instante, by default None
+        priced : Priced_Items | None, optional
+            Carrinho com os mesmos itens, cujo subtotal e linhas já calculados são
+            reaproveitados, by default None
         """
         self.__id = id
         self.__customer = customer
         self.__customer.orders.append(self)
 
         self._status = status
-        self._products = products
-
-        self._price = 0.0
-        for product in self._products:
-            self._price += product.get_total_price()
+        self._placed_at = placed_at
+        self._products = tuple(products)
+
+        # Os itens e o preço não mudam, então suas linhas são montadas uma única vez;
+        # a descrição completa depende do status e é refeita quando ele muda
+        self._lines: str | None = None
+        self._description: str | None = None
+
+        if priced is not None:
+            self._price = priced.total
+            self._lines = "".join(line + "\n" for line in priced.lines)
+        else:
+            self._price = 0
+            for product in self._products:
+                self._price += product.get_total_price()
 
     @staticmethod
     def from_dict(
         data: dict,
         customers: dict["Customer".id, "Customer"],
-        owner: "Owner",
     ) -> Order:
         customer = customers[data["customer_id"]]
-        products = [
-            Product.from_dict(product_data, owner) for product_data in data["products"]
-        ]
-        return Order(data["id"], customer, products, data["status"])
+        products = [Line_Item.from_dict(product_data) for product_data in data["products"]]
+        return Order(data["id"], customer, products, data["status"], data.get("placed_at"))
 
     def to_dict(self) -> dict:
         """
@@ -62,12 +90,31 @@ class Order:
         dict
             Dicionário
         """
-        return {
+        data = {
             "id": self.__id,
             "customer_id": self.__customer.id,
             "status": self._status,
             "products": [product.to_dict() for product in self._products],
         }
+        if self._placed_at is not None:
+            data["placed_at"] = self._placed_at
+        return data
+
+    def summary(self) -> tuple[int, int, str, list[int]]:
+        """
+        Resume o pedido para a indexação.
+
+        Returns
+        -------
+        tuple[int, int, str, list[int]]
+            Id, id do cliente, status e ids dos produtos
+        """
+        return (
+            self.__id,
+            self.__customer.id,
+            self._status,
+            [product.id for product in self._products],
+        )
 
     def cancel(self) -> bool:
         """
@@ -80,6 +127,7 @@ class Order:
         """
         if self._status != c.canceled:
             self._status = c.canceled
+            self._description = None
             return True
         return False
 
@@ -94,6 +142,7 @@ class Order:
         """
         if self._status == c.placed:
             self._status = c.sent
+            self._description = None
             return True
         return False
 
@@ -108,6 +157,7 @@ class Order:
         """
         if self._status == c.sent:
             self._status = c.finished
+            self._description = None
             return True
         return False
 
@@ -125,17 +175,25 @@ class Order:
         str
             Descrição
         """
+        own = id < 0 or id == self.__id
+        if own and self._description is not None:
+            return self._description
         if id < 0:
             id = self.__id
 
-        description = f"- Pedido {id} -\n"
-        for product in self._products:
-            description += f"> {product.quantity}x {product.name} = {product.get_total_price():.2f}R$\n"
+        if self._lines is None:
+            self._lines = "".join(
+                line_description(product) + "\n" for product in self._products
+            )
 
-        description += f"\nPreço total: {self._price}"
+        description = f"- Pedido {id} -\n"
+        description += self._lines
+        description += f"\nPreço total: {format_cents(self._price)}"
         description += f"\nCliente: {self.__customer.name}"
         description += f"\nStatus: {self._status}\n"
         description += "- - -"
+        if own:
+            self._description = description
         return description
 
     @property
@@ -151,11 +209,15 @@ class Order:
         return self._status
 
     @property
-    def products(self) -> list[Product]:
+    def placed_at(self) -> float | None:
+        return self._placed_at
+
+    @property
+    def products(self) -> tuple[Line_Item, ...]:
         return self._products
 
     @property
-    def price(self) -> float:
+    def price(self) -> int:
         return self._price
 
     def __repr__(self) -> str:
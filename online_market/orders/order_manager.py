@@ -1,15 +1,27 @@
-from typing import TYPE_CHECKING
+from bisect import insort
+from collections import Counter
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping
 
 from orders.interfaces import I_Order_Service
-from orders import Order
+from orders import Order, Order_Result, Priced_Items
+from products import Hold
+from id_allocator import Id_Allocator
+from pagination import Page, paginate
 
 if TYPE_CHECKING:
     from users import Owner, Customer
-    from products import Product
+    from products import Line_Item
+    from storage import I_Journal
 
 
 class Order_Manager(I_Order_Service):
-    def __init__(self, owner: "Owner", orders: dict[Order.id, Order] = dict()) -> None:
+    def __init__(
+        self,
+        owner: "Owner",
+        orders: dict[Order.id, Order] | None = None,
+        id_allocator: Id_Allocator | None = None,
+    ) -> None:
         """
         Gerenciador de Pedidos.
 
@@ -17,12 +29,86 @@ class Order_Manager(I_Order_Service):
         ----------
         owner : Owner
             Dono
-        orders : dict[Order.id, Order], optional
-            Pedidos, by default dict()
+        orders : dict[Order.id, Order] | None, optional
+            Pedidos, by default None
+        id_allocator : Id_Allocator | None, optional
+            Alocador dos Ids, por padrão é criado a partir dos Ids dos pedidos
         """
         self.__owner = owner
         self.__owner.orders = self
-        self._orders = orders
+        self._orders = orders if orders is not None else dict()
+        self._id_allocator = (
+            id_allocator
+            if id_allocator is not None
+            else Id_Allocator.from_ids(self._orders.keys())
+        )
+        self._journal: "I_Journal | None" = None
+
+        # Ids ordenados e índices secundários, construídos na primeira consulta
+        self._sorted_ids: list[int] | None = None
+        self._indexed = False
+        self._by_status: dict[str, set[int]] = {}
+        self._by_customer: dict[int, list[int]] = {}
+        self._product_refs: Counter[int] = Counter()
+
+    def __summaries(self) -> Iterator[tuple[int, int, str, list[int]]]:
+        """
+        Percorre um resumo de todos os pedidos.
+        Pedidos vindos de um repositório são resumidos sem serem carregados.
+
+        Yields
+        ------
+        tuple[int, int, str, list[int]]
+            Id, id do cliente, status e ids dos produtos do pedido
+        """
+        summaries = getattr(self._orders, "summaries", None)
+        if summaries is not None:
+            yield from summaries()
+        else:
+            for order in self._orders.values():
+                yield order.summary()
+
+    def __build_indexes(self) -> None:
+        """
+        Constrói os índices secundários, caso ainda não tenham sido construídos.
+        Após a construção, os índices são atualizados a cada alteração nos pedidos.
+        """
+        if self._indexed:
+            return
+
+        for order_id, customer_id, status, product_ids in self.__summaries():
+            self._by_status.setdefault(status, set()).add(order_id)
+            self._by_customer.setdefault(customer_id, []).append(order_id)
+            self._product_refs.update(product_ids)
+        self._indexed = True
+
+    def __index_order(self, order: Order) -> None:
+        if not self._indexed:
+            return
+
+        order_id, customer_id, status, product_ids = order.summary()
+        self._by_status.setdefault(status, set()).add(order_id)
+        self._by_customer.setdefault(customer_id, []).append(order_id)
+        self._product_refs.update(product_ids)
+
+    def __move_status(self, order_id: int, old: str, new: str) -> None:
+        if not self._indexed:
+            return
+
+        self._by_status[old].discard(order_id)
+        self._by_status.setdefault(new, set()).add(order_id)
+
+    def _record(self, operation: str, **data) -> None:
+        """
+        Registra uma mutação no journal, caso exista um.
+
+        Parameters
+        ----------
+        operation : str
+            Nome da operação
+        """
+        if self._journal is not None:
+            self._journal.record(operation, **data)
 
     def __generate_id(self) -> int:
         """
@@ -33,27 +119,29 @@ class Order_Manager(I_Order_Service):
         int
             Id
         """
-        sorted_ids = sorted(self._orders.keys())
-        if len(sorted_ids) == 0:
-            return 0
-        elif sorted_ids[-1] < len(sorted_ids):
-            return len(self._orders)
-        else:
-            for i, j in enumerate(sorted_ids):
-                if i < j:
-                    break
-            return i
+        return self._id_allocator.allocate()
 
-    def place_order(self, customer: "Customer", products: list["Product"]) -> Order:
+    def place_order(
+        self,
+        customer: "Customer",
+        products: "list[Line_Item | Hold] | Priced_Items",
+        placed_at: float | None = None,
+    ) -> Order:
         """
         Faz um pedido.
+        Reservas feitas no gerenciador de produtos são convertidas em deduções
+        do estoque, as demais quantidades já devem ter sido obtidas do estoque.
+        O subtotal e as linhas de um carrinho (Priced_Items) são reaproveitados
+        pelo pedido.
 
         Parameters
         ----------
         customer : Customer
             Cliente
-        products : list[&quot;Product&quot;]
-            Produtos
+        products : list[Line_Item | Hold] | Priced_Items
+            Itens ou reservas do pedido
+        placed_at : float | None, optional
+            Instante do pedido, em segundos desde a época Unix, por padrão o instante atual
 
         Returns
         -------
@@ -64,14 +152,124 @@ class Order_Manager(I_Order_Service):
         ------
         ValueError
             A lista deve conter produtos
+            Caso alguma reserva tenha expirado, nesse caso nada é deduzido
         """
         if len(products) < 1:
             raise ValueError("Lista de produtos vazia!")
         else:
+            priced = products if isinstance(products, Priced_Items) else None
+            items = self.__commit_holds(list(products))
             order_id = self.__generate_id()
-            order = Order(order_id, customer, products)
-            self._orders[order_id] = order
-            return order
+            if placed_at is None:
+                placed_at = time.time()
+            return self.__add_order(order_id, customer, items, placed_at, priced)
+
+    def __add_order(
+        self,
+        order_id: int,
+        customer: "Customer",
+        products: list["Line_Item"],
+        placed_at: float,
+        priced: Priced_Items | None = None,
+    ) -> Order:
+        """
+        Cria e indexa um pedido com um Id já alocado e itens já deduzidos do estoque.
+        """
+        order = Order(order_id, customer, products, placed_at=placed_at, priced=priced)
+        self._orders[order_id] = order
+        self.__index_order(order)
+        if self._sorted_ids is not None:
+            insort(self._sorted_ids, order_id)
+        self._record(
+            "place_order",
+            id=order_id,
+            customer_id=customer.id,
+            products=[product.to_dict() for product in products],
+            placed_at=placed_at,
+        )
+        return order
+
+    def place_orders(
+        self,
+        requests: Iterable[tuple[int, list[tuple[int, int]]]],
+        customers: Mapping[int, "Customer"],
+    ) -> list[Order_Result]:
+        """
+        Faz vários pedidos de uma só vez, sem interação com o usuário.
+
+        Os pedidos são processados na ordem recebida, cada um verificado contra o
+        estoque restante após os anteriores. As quantidades de um pedido são
+        deduzidas de forma atômica: um pedido sem estoque suficiente falha por
+        completo, sem afetar os demais.
+
+        Todo o lote é verificado e deduzido do estoque em uma única passada por
+        Product_Manager.retrieve_batch, e os Ids dos pedidos realizados são
+        alocados em um único bloco.
+
+        Parameters
+        ----------
+        requests : Iterable[tuple[int, list[tuple[int, int]]]]
+            Pares (id do cliente, [(id do produto, quantidade), ...])
+        customers : Mapping[int, Customer]
+            Clientes, indexados pelo Id
+
+        Returns
+        -------
+        list[Order_Result]
+            Resultado de cada pedido, na ordem recebida
+        """
+        results: list[Order_Result | None] = []
+        accepted: list[tuple[int, "Customer", list[tuple[int, int]]]] = []
+        for customer_id, items in requests:
+            customer = customers.get(customer_id)
+            if customer is None:
+                results.append(Order_Result(customer_id, None, "Cliente inexistente!"))
+            elif len(items) < 1:
+                results.append(Order_Result(customer_id, None, "Lista de produtos vazia!"))
+            else:
+                accepted.append((len(results), customer, items))
+                results.append(None)
+
+        retrieved = self.__owner.products.retrieve_batch(items for _, _, items in accepted)
+        placed = [
+            (i, customer, products)
+            for (i, customer, _), products in zip(accepted, retrieved)
+            if not isinstance(products, Exception)
+        ]
+        order_ids = iter(self._id_allocator.allocate_many(len(placed)))
+        placed_at = time.time()
+
+        for (i, customer, _), products in zip(accepted, retrieved):
+            if isinstance(products, Exception):
+                results[i] = Order_Result(customer.id, None, products.args[0])
+            else:
+                order = self.__add_order(next(order_ids), customer, products, placed_at)
+                results[i] = Order_Result(customer.id, order)
+        return results  # type: ignore[return-value]
+
+    def __commit_holds(self, products: list["Line_Item | Hold"]) -> list["Line_Item"]:
+        """
+        Substitui as reservas de uma lista de itens pelos itens deduzidos do estoque.
+
+        Parameters
+        ----------
+        products : list[Line_Item | Hold]
+            Itens ou reservas
+
+        Returns
+        -------
+        list[Line_Item]
+            Itens, na mesma ordem
+        """
+        holds = [product for product in products if isinstance(product, Hold)]
+        if len(holds) < 1:
+            return products  # type: ignore[return-value]
+
+        committed = iter(self.__owner.products.commit_holds(holds))
+        return [
+            next(committed) if isinstance(product, Hold) else product
+            for product in products
+        ]
 
     def cancel_order(self, order_id: int) -> bool:
         """
@@ -95,7 +293,13 @@ class Order_Manager(I_Order_Service):
         if order_id not in self._orders.keys():
             raise KeyError("Pedido inexistente!")
         else:
-            return self._orders[order_id].cancel()
+            order = self._orders[order_id]
+            status = order.status
+            canceled = order.cancel()
+            if canceled:
+                self.__move_status(order_id, status, order.status)
+                self._record("cancel_order", id=order_id)
+            return canceled
 
     def send_order(self, order_id: int) -> None:
         """
@@ -114,7 +318,11 @@ class Order_Manager(I_Order_Service):
         if order_id not in self._orders.keys():
             raise KeyError("Pedido inexistente!")
         else:
-            self._orders[order_id].send()
+            order = self._orders[order_id]
+            status = order.status
+            if order.send():
+                self.__move_status(order_id, status, order.status)
+                self._record("send_order", id=order_id)
 
     def receive_order(self, order_id: int) -> None:
         """
@@ -133,7 +341,11 @@ class Order_Manager(I_Order_Service):
         if order_id not in self._orders.keys():
             raise KeyError("Pedido inexistente!")
         else:
-            self._orders[order_id].receive()
+            order = self._orders[order_id]
+            status = order.status
+            if order.receive():
+                self.__move_status(order_id, status, order.status)
+                self._record("receive_order", id=order_id)
 
     def list_orders(self) -> list[Order]:
         """
@@ -144,19 +356,118 @@ class Order_Manager(I_Order_Service):
         list[Order]
             Lista dos pedidos.
         """
-        sorted_keys = self.ids()
-        return [self._orders[key] for key in sorted_keys]
+        return list(self.iter_orders())
+
+    def iter_orders(self) -> Iterator[Order]:
+        """
+        Percorre todos os pedidos, ordenados de acordo com seus Ids.
+
+        Yields
+        ------
+        Order
+            Pedido
+        """
+        for id in self.__ids():
+            yield self._orders[id]
+
+    def page_orders(
+        self, after: int | None = None, before: int | None = None, size: int = 20
+    ) -> Page[Order]:
+        """
+        Obtem uma página dos pedidos, ordenados de acordo com seus Ids.
+        Somente os pedidos da página são carregados.
+
+        Parameters
+        ----------
+        after : int | None, optional
+            Cursor: Id após o qual a página começa, como Page.next, by default None
+        before : int | None, optional
+            Cursor: Id antes do qual a página termina, como Page.previous, by default None
+        size : int, optional
+            Quantidade máxima de pedidos, by default 20
+
+        Returns
+        -------
+        Page[Order]
+            Página de pedidos
+        """
+        page = paginate(self.__ids(), after, before, size)
+        return Page([self._orders[id] for id in page.items], page.previous, page.next)
+
+    def orders_by_status(self, status: str) -> list[Order]:
+        """
+        Lista os pedidos com um status, ordenados de acordo com seus Ids.
+
+        Parameters
+        ----------
+        status : str
+            Status dos pedidos
+
+        Returns
+        -------
+        list[Order]
+            Lista dos pedidos
+        """
+        self.__build_indexes()
+        return [self._orders[id] for id in sorted(self._by_status.get(status, ()))]
+
+    def customer_orders(self, customer_id: int) -> list[Order]:
+        """
+        Lista os pedidos de um cliente, na ordem em que foram realizados.
+
+        Parameters
+        ----------
+        customer_id : int
+            Id do cliente
+
+        Returns
+        -------
+        list[Order]
+            Lista dos pedidos
+        """
+        self.__build_indexes()
+        return [self._orders[id] for id in self._by_customer.get(customer_id, [])]
+
+    def is_product_referenced(self, product_id: int) -> bool:
+        """
+        Verifica se algum pedido contém um produto.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        bool
+            Se o produto está presente em algum pedido
+        """
+        self.__build_indexes()
+        return self._product_refs[product_id] > 0
 
-    def ids(self) -> set[int]:
+    def ids(self) -> list[int]:
         """
-        Retorna um set com todos Ids em ordem crescente.
+        Retorna uma lista com todos Ids em ordem crescente.
 
         Returns
         -------
-        set[int]
+        list[int]
             Ids
         """
-        return set(sorted(self._orders.keys()))
+        return list(self.__ids())
+
+    def __ids(self) -> list[int]:
+        """
+        Obtem a lista ordenada de Ids mantida pelo gerenciador, sem copiá-la.
+
+        Returns
+        -------
+        list[int]
+            Ids em ordem crescente
+        """
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self._orders.keys())
+        return self._sorted_ids
 
     @property
     def owner(self) -> "Owner":
@@ -166,5 +477,17 @@ class Order_Manager(I_Order_Service):
     def orders(self) -> dict[Order.id, Order]:
         return self._orders
 
+    @property
+    def id_allocator(self) -> Id_Allocator:
+        return self._id_allocator
+
+    @property
+    def journal(self) -> "I_Journal | None":
+        return self._journal
+
+    @journal.setter
+    def journal(self, journal: "I_Journal | None") -> None:
+        self._journal = journal
+
     def __repr__(self) -> str:
         return f"Order_Manager(contem {len(self._orders)} pedidos)"
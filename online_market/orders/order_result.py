@@ -0,0 +1,28 @@
+from __future__ import annotations
+from typing import NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from orders import Order
+
+
+class Order_Result(NamedTuple):
+    """
+    Resultado de um pedido feito em lote.
+
+    Parameters
+    ----------
+    customer_id : int
+        Id do cliente
+    order : Order | None
+        Pedido realizado, None caso o pedido tenha falhado
+    error : str | None
+        Motivo da falha, None caso o pedido tenha sido realizado
+    """
+
+    customer_id: int
+    order: "Order | None"
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.order is not None
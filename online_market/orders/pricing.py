@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from money import format_cents
+
+if TYPE_CHECKING:
+    from products import Line_Item, Hold
+
+
+def line_description(item: "Line_Item | Hold") -> str:
+    """
+    Produz a linha de um item em um carrinho ou pedido.
+
+    Parameters
+    ----------
+    item : Line_Item | Hold
+        Item ou reserva
+
+    Returns
+    -------
+    str
+        Linha com a quantidade, o nome e o preço total do item
+    """
+    return f"> {item.quantity}x {item.name} = {format_cents(item.get_total_price())}R$"
+
+
+class Priced_Items:
+    def __init__(self, items: Iterable["Line_Item | Hold"] = ()) -> None:
+        """
+        Itens de um carrinho ou pedido com o subtotal e as linhas de descrição mantidos
+        conforme os itens são adicionados ou removidos, sem refazer as contas nem
+        as linhas dos demais itens.
+
+        Parameters
+        ----------
+        items : Iterable[Line_Item | Hold], optional
+            Itens iniciais, by default ()
+        """
+        self._items: list["Line_Item | Hold"] = []
+        self._lines: list[str] = []
+        self._total = 0
+        self._text: str | None = None
+        for item in items:
+            self.add(item)
+
+    def add(self, item: "Line_Item | Hold") -> None:
+        """
+        Adiciona um item, somando seu preço total ao subtotal.
+
+        Parameters
+        ----------
+        item : Line_Item | Hold
+            Item ou reserva
+        """
+        self._items.append(item)
+        self._lines.append(line_description(item))
+        self._total += item.get_total_price()
+        self._text = None
+
+    def remove(self, index: int) -> "Line_Item | Hold":
+        """
+        Remove um item, subtraindo seu preço total do subtotal.
+
+        Parameters
+        ----------
+        index : int
+            Posição do item
+
+        Returns
+        -------
+        Line_Item | Hold
+            Item removido
+
+        Raises
+        ------
+        IndexError
+            Caso a posição não exista
+        """
+        item = self._items.pop(index)
+        del self._lines[index]
+        self._total -= item.get_total_price()
+        self._text = None
+        return item
+
+    def retain(self, keep: Callable[["Line_Item | Hold"], bool]) -> None:
+        """
+        Mantém somente os itens aceitos, como as reservas ainda ativas.
+
+        Parameters
+        ----------
+        keep : Callable[[Line_Item | Hold], bool]
+            Se um item deve ser mantido
+        """
+        for i in range(len(self._items) - 1, -1, -1):
+            if not keep(self._items[i]):
+                self.remove(i)
+
+    @property
+    def total(self) -> int:
+        """
+        Subtotal dos itens, em centavos.
+        """
+        return self._total
+
+    @property
+    def lines(self) -> list[str]:
+        return self._lines
+
+    @property
+    def text(self) -> str:
+        """
+        Linhas de todos os itens, montadas somente após alguma alteração.
+        """
+        if self._text is None:
+            self._text = "\n".join(self._lines)
+        return self._text
+
+    def __getitem__(self, index: int) -> "Line_Item | Hold":
+        return self._items[index]
+
+    def __iter__(self) -> Iterator["Line_Item | Hold"]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"Priced_Items(contem {len(self._items)} itens, total={format_cents(self._total)})"
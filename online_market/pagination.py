@@ -0,0 +1,108 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import Callable, Generic, NamedTuple, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(NamedTuple, Generic[T]):
+    """
+    Página de uma listagem ordenada por Id.
+
+    Parameters
+    ----------
+    items : list[T]
+        Itens da página
+    previous : int | None
+        Cursor da página anterior, usado como "before", None caso esta seja a primeira
+    next : int | None
+        Cursor da próxima página, usado como "after", None caso esta seja a última
+    """
+
+    items: list[T]
+    previous: int | None
+    next: int | None
+
+
+def paginate(
+    ids: Sequence[int],
+    after: int | None = None,
+    before: int | None = None,
+    size: int = 20,
+    accept: Callable[[int], bool] | None = None,
+) -> Page[int]:
+    """
+    Obtem uma página de uma lista ordenada de Ids.
+    O início da página é encontrado por busca binária, então cada página custa
+    O(log n + size), independente da posição na listagem. Com um filtro, os Ids
+    recusados entre o cursor e o fim da página também são percorridos.
+
+    Parameters
+    ----------
+    ids : Sequence[int]
+        Ids em ordem crescente
+    after : int | None, optional
+        Cursor: a página começa no primeiro Id maior que ele, by default None
+    before : int | None, optional
+        Cursor: a página termina no último Id menor que ele, tem prioridade sobre after,
+        by default None
+    size : int, optional
+        Quantidade máxima de itens, by default 20
+    accept : Callable[[int], bool] | None, optional
+        Filtro dos Ids listados, by default None
+
+    Returns
+    -------
+    Page[int]
+        Página de Ids
+
+    Raises
+    ------
+    ValueError
+        Caso o tamanho seja menor que um
+    """
+    if size < 1:
+        raise ValueError("O tamanho da página deve ser maior que zero!")
+
+    if accept is None:
+        if before is not None:
+            end = bisect_left(ids, before)
+            start = max(end - size, 0)
+        else:
+            start = bisect_right(ids, after) if after is not None else 0
+            end = min(start + size, len(ids))
+        items = list(ids[start:end])
+        previous = items[0] if start > 0 and len(items) > 0 else None
+        next = items[-1] if end < len(ids) and len(items) > 0 else None
+        return Page(items, previous, next)
+
+    # Os cursores só são devolvidos caso exista algum Id aceito além da página
+    if before is not None:
+        end = bisect_left(ids, before)
+        i = end - 1
+        items = []
+        while i >= 0 and len(items) < size:
+            if accept(ids[i]):
+                items.append(ids[i])
+            i -= 1
+        items.reverse()
+        has_previous = any(accept(ids[j]) for j in range(i, -1, -1))
+        has_next = any(accept(ids[j]) for j in range(end, len(ids)))
+    else:
+        start = bisect_right(ids, after) if after is not None else 0
+        i = start
+        items = []
+        while i < len(ids) and len(items) < size:
+            if accept(ids[i]):
+                items.append(ids[i])
+            i += 1
+        has_previous = any(accept(ids[j]) for j in range(start - 1, -1, -1))
+        has_next = any(accept(ids[j]) for j in range(i, len(ids)))
+
+    if len(items) < 1:
+        return Page(items, None, None)
+    return Page(
+        items,
+        items[0] if has_previous else None,
+        items[-1] if has_next else None,
+    )
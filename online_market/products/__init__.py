@@ -1,3 +1,14 @@
 from products.product import Product
+from products.line_item import Line_Item
+from products.hold import Hold
+from products.reservations import Reservations
+from products.catalogue import (
+    Catalogue_Row,
+    Rejected_Row,
+    Import_Report,
+    import_csv,
+    export_csv,
+)
+from products.search_index import Search_Index, tokenize
 from products.interfaces import I_Product_Manager
 from products.product_manager import Product_Manager
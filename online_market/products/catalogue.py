@@ -0,0 +1,219 @@
+from __future__ import annotations
+import csv
+from typing import TYPE_CHECKING, NamedTuple
+
+from money import format_cents, to_cents
+
+if TYPE_CHECKING:
+    from products import Product_Manager
+
+
+# Colunas dos arquivos CSV do catálogo
+FIELDS = ("id", "name", "price", "quantity")
+
+# Maior Id aceito na importação
+MAX_ID = 2**31 - 1
+
+
+class Catalogue_Row(NamedTuple):
+    """
+    Linha do catálogo a ser importada.
+
+    Parameters
+    ----------
+    line : int
+        Linha do arquivo de origem, usada nos relatórios
+    id : int
+        Id do produto
+    name : str | None
+        Nome do produto, None mantém o nome de um produto existente
+    price : int | None
+        Preço do produto, em centavos, None mantém o preço de um produto existente
+    quantity : int
+        Quantidade a ser adicionada ao estoque
+    """
+
+    line: int
+    id: int
+    name: str | None
+    price: int | None
+    quantity: int
+
+
+class Rejected_Row(NamedTuple):
+    """
+    Linha do catálogo recusada na importação.
+
+    Parameters
+    ----------
+    line : int
+        Linha do arquivo de origem
+    reason : str
+        Motivo da recusa
+    """
+
+    line: int
+    reason: str
+
+
+class Import_Report:
+    def __init__(self) -> None:
+        """
+        Relatório de uma importação do catálogo.
+        """
+        self.registered = 0
+        self.restocked = 0
+        self.repriced = 0
+        self.rejected: list[Rejected_Row] = []
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected.append(Rejected_Row(line, reason))
+
+    @property
+    def imported(self) -> int:
+        return self.registered + self.restocked
+
+    def __repr__(self) -> str:
+        return (
+            f"Import_Report(registrados={self.registered}, reabastecidos={self.restocked}, "
+            f"preços alterados={self.repriced}, recusados={len(self.rejected)})"
+        )
+
+
+def parse_row(line: int, id: str, name: str, price: str, quantity: str) -> Catalogue_Row:
+    """
+    Converte uma linha do CSV.
+    Colunas vazias de nome e preço mantêm os valores do produto existente,
+    a quantidade vazia é zero.
+
+    Parameters
+    ----------
+    line : int
+        Linha do arquivo
+    id : str
+        Coluna id
+    name : str
+        Coluna name
+    price : str
+        Coluna price, em reais
+    quantity : str
+        Coluna quantity
+
+    Returns
+    -------
+    Catalogue_Row
+        Linha convertida
+
+    Raises
+    ------
+    ValueError
+        Caso algum valor seja inválido
+    """
+    product_id = int(id)
+    if product_id < 0:
+        raise ValueError("O Id não pode ser negativo!")
+    if product_id > MAX_ID:
+        raise ValueError(f"O Id não pode ser maior que {MAX_ID}!")
+
+    product_price = to_cents(price) if price else None
+    if product_price is not None and product_price <= 0:
+        raise ValueError("O preço não pode ser menor ou igual a zero!")
+
+    product_quantity = int(quantity) if quantity else 0
+    if product_quantity < 0:
+        raise ValueError("A quantidade não pode ser menor que zero!")
+
+    return Catalogue_Row(line, product_id, name.strip() or None, product_price, product_quantity)
+
+
+def import_csv(
+    market: "Product_Manager", filename: str, chunk_size: int = 10_000
+) -> Import_Report:
+    """
+    Importa um catálogo em CSV, com as colunas id, name, price e quantity.
+    Somente a coluna id é obrigatória.
+
+    Ids novos são registrados, Ids existentes são reabastecidos e têm o nome e o
+    preço atualizados quando informados. O arquivo é lido em blocos de chunk_size
+    linhas, então a memória usada pela leitura não depende do tamanho do arquivo.
+    Cada bloco é aplicado de uma só vez por Product_Manager.import_products.
+
+    Parameters
+    ----------
+    market : Product_Manager
+        Mercado
+    filename : str
+        Caminho do arquivo
+    chunk_size : int, optional
+        Quantidade de linhas por bloco, by default 10_000
+
+    Returns
+    -------
+    Import_Report
+        Relatório da importação, incluindo as linhas recusadas
+
+    Raises
+    ------
+    ValueError
+        Caso o arquivo não possua a coluna id
+    """
+    report = Import_Report()
+    with open(filename, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = [column.strip() for column in next(reader, [])]
+        if "id" not in header:
+            raise ValueError("Coluna obrigatória ausente: id")
+
+        # Colunas ausentes são lidas da coluna vazia adicionada ao final de cada linha
+        columns = [header.index(field) if field in header else -1 for field in FIELDS]
+
+        chunk: list[Catalogue_Row] = []
+        for row in reader:
+            if len(row) < 1:
+                continue
+            row.extend([""] * (len(header) + 1 - len(row)))
+            try:
+                chunk.append(parse_row(reader.line_num, *[row[column] for column in columns]))
+            except ValueError as e:
+                report.reject(reader.line_num, str(e))
+                continue
+
+            if len(chunk) >= chunk_size:
+                market.import_products(chunk, report)
+                chunk = []
+
+        if len(chunk) > 0:
+            market.import_products(chunk, report)
+
+    # Linhas recusadas pelo gerenciador são conhecidas somente ao final de cada bloco
+    report.rejected.sort()
+    return report
+
+
+def export_csv(market: "Product_Manager", filename: str) -> int:
+    """
+    Exporta o catálogo em CSV, ordenado pelos Ids, com os preços em reais.
+    Os produtos são escritos um de cada vez, sem montar o arquivo em memória.
+
+    Parameters
+    ----------
+    market : Product_Manager
+        Mercado
+    filename : str
+        Caminho do arquivo
+
+    Returns
+    -------
+    int
+        Quantidade de produtos exportados
+    """
+    exported = 0
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        for product in market.iter_products():
+            writer.writerow(
+                (product.id, product.name, format_cents(product.price), product.quantity)
+            )
+            exported += 1
+    return exported
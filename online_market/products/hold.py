@@ -0,0 +1,63 @@
+from __future__ import annotations
+from typing import NamedTuple
+
+from products.line_item import Line_Item
+
+
+class Hold(NamedTuple):
+    """
+    Reserva temporária de uma quantidade de um produto, imutável.
+    A quantidade reservada não pode ser obtida por outros clientes até que a
+    reserva seja convertida em um pedido, liberada ou expire.
+
+    Parameters
+    ----------
+    id : int
+        Id da reserva
+    item : Line_Item
+        Item reservado, com o nome e o preço do momento da reserva
+    expires_at : float
+        Instante de expiração, no relógio de time.monotonic
+    """
+
+    id: int
+    item: Line_Item
+    expires_at: float
+
+    def description(self) -> str:
+        """
+        Produz uma descrição da reserva.
+
+        Returns
+        -------
+        str
+            Descrição
+        """
+        return self.item.description()
+
+    def get_total_price(self) -> int:
+        """
+        Obtem o preço total do item reservado.
+
+        Returns
+        -------
+        int
+            Preço, em centavos
+        """
+        return self.item.get_total_price()
+
+    @property
+    def product_id(self) -> int:
+        return self.item.product_id
+
+    @property
+    def name(self) -> str:
+        return self.item.name
+
+    @property
+    def price(self) -> int:
+        return self.item.price
+
+    @property
+    def quantity(self) -> int:
+        return self.item.quantity
@@ -2,12 +2,12 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from products import Product
+    from products import Line_Item
 
 
 class I_Product_Manager(ABC):
     @abstractmethod
-    def register_product(self, id: int, name: str, price: float) -> None:
+    def register_product(self, id: int, name: str, price: int) -> None:
         pass
 
     @abstractmethod
@@ -19,9 +19,9 @@ class I_Product_Manager(ABC):
         pass
 
     @abstractmethod
-    def get_product(self, product_id: int) -> "Product":
+    def get_product(self, product_id: int) -> "Line_Item":
         pass
 
     @abstractmethod
-    def retrieve_product(self, product_id: int, ammount: int) -> "Product":
+    def retrieve_product(self, product_id: int, ammount: int) -> "Line_Item":
         pass
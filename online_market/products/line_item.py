@@ -0,0 +1,76 @@
+from __future__ import annotations
+import sys
+from typing import NamedTuple
+
+from money import format_cents, read_price
+
+
+class Line_Item(NamedTuple):
+    """
+    Item de um pedido, imutável.
+    Guarda uma cópia do nome e do preço do produto no momento em que foi obtido.
+
+    Parameters
+    ----------
+    product_id : int
+        Id do produto
+    name : str
+        Nome do produto
+    price : int
+        Preço unitário, em centavos
+    quantity : int
+        Quantidade
+    """
+
+    product_id: int
+    name: str
+    price: int
+    quantity: int
+
+    @staticmethod
+    def from_dict(data: dict) -> Line_Item:
+        # Nomes repetidos em milhares de pedidos compartilham a mesma string
+        name = sys.intern(data["name"])
+        return Line_Item(data["id"], name, read_price(data), data["quantity"])
+
+    def to_dict(self) -> dict:
+        """
+        Transforma o objeto em um dicionário.
+
+        Returns
+        -------
+        dict
+            Dicionário
+        """
+        return {
+            "id": self.product_id,
+            "name": self.name,
+            "price_cents": self.price,
+            "quantity": self.quantity,
+        }
+
+    def description(self) -> str:
+        """
+        Produz uma descrição do item.
+
+        Returns
+        -------
+        str
+            Descrição
+        """
+        return f"{self.quantity}x {self.name} - preço unitário = {format_cents(self.price)}"
+
+    def get_total_price(self) -> int:
+        """
+        Obtem o preço total do item.
+
+        Returns
+        -------
+        int
+            Preço, em centavos
+        """
+        return self.price * self.quantity
+
+    @property
+    def id(self) -> int:
+        return self.product_id
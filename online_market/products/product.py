@@ -1,13 +1,18 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+from products.line_item import Line_Item
+from money import format_cents, read_price
+
 if TYPE_CHECKING:
     from users import Owner
 
 
 class Product:
+    __slots__ = ("__id", "__owner", "_name", "_price", "_quantity")
+
     def __init__(
-        self, id: int, name: str, price: float, quantity: int, owner: "Owner"
+        self, id: int, name: str, price: int, quantity: int, owner: "Owner"
     ) -> None:
         """
         Produto.
@@ -18,8 +23,8 @@ class Product:
             Identificador
         name : str
             Nome
-        price : float
-            Preço
+        price : int
+            Preço, em centavos
         quantity : int
             Quantidade
         owner : Owner
@@ -38,7 +43,7 @@ class Product:
             raise ValueError(
                 f"Dono inválido! Esperado dono com id: {expected_owner}, recebeu id: {owner.id}"
             )
-        return Product(data["id"], data["name"], data["price"], data["quantity"], owner)
+        return Product(data["id"], data["name"], read_price(data), data["quantity"], owner)
 
     def to_dict(self) -> dict:
         """
@@ -53,7 +58,7 @@ class Product:
             "id": self.__id,
             "owner_id": self.__owner.id,
             "name": self._name,
-            "price": self._price,
+            "price_cents": self._price,
             "quantity": self._quantity,
         }
 
@@ -66,16 +71,34 @@ class Product:
         str
             Descrição
         """
-        return f"{self._quantity}x {self._name} - preço unitário = {self._price}"
+        return f"{self._quantity}x {self._name} - preço unitário = {format_cents(self._price)}"
+
+    def line_item(self, quantity: int | None = None) -> Line_Item:
+        """
+        Cria um item de pedido com os dados atuais do produto.
+
+        Parameters
+        ----------
+        quantity : int | None, optional
+            Quantidade do item, por padrão a quantidade do produto
+
+        Returns
+        -------
+        Line_Item
+            Item
+        """
+        if quantity is None:
+            quantity = self._quantity
+        return Line_Item(self.__id, self._name, self._price, quantity)
 
-    def get_total_price(self) -> float:
+    def get_total_price(self) -> int:
         """
         Obtem o preço total dos produtos.
 
         Returns
         -------
-        float
-            Preço
+        int
+            Preço, em centavos
         """
         return self._price * self._quantity
 
@@ -96,15 +119,20 @@ class Product:
         self._name = name
 
     @property
-    def price(self) -> float:
+    def price(self) -> int:
         return self._price
 
     @price.setter
-    def price(self, price: float) -> None:
+    def price(self, price: int) -> None:
         if price <= 0:
             raise ValueError("O preço não pode ser menor ou igual a zero!")
-        else:
+        elif price != self._price:
+            old_price = self._price
             self._price = price
+            # O gerenciador do dono mantém os produtos ordenados pelo preço
+            market = getattr(self.__owner, "products", None)
+            if market is not None:
+                market.price_changed(self, old_price)
 
     @property
     def quantity(self) -> int:
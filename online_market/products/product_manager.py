@@ -1,16 +1,29 @@
-from copy import deepcopy
-from typing import TYPE_CHECKING
+from bisect import bisect_left, bisect_right, insort
+from contextlib import ExitStack
+import math
+import threading
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 from products.interfaces import I_Product_Manager
-from products import Product
+from products import Product, Line_Item
+from products.hold import Hold
+from products.reservations import Reservations
+from products.catalogue import Catalogue_Row, Import_Report
+from products.search_index import Search_Index
+from id_allocator import Id_Allocator
+from pagination import Page, paginate
 
 if TYPE_CHECKING:
     from users import Owner
+    from storage import I_Journal
 
 
 class Product_Manager(I_Product_Manager):
     def __init__(
-        self, owner: "Owner", products: dict[Product.id, Product] = dict()
+        self,
+        owner: "Owner",
+        products: dict[Product.id, Product] | None = None,
+        id_allocator: Id_Allocator | None = None,
     ) -> None:
         """
         Gerenciador de Produtos.
@@ -19,14 +32,83 @@ class Product_Manager(I_Product_Manager):
         ----------
         owner : Owner
             Dono
-        products : dict[Product.id, Product], optional
-            Produtos, by default dict()
+        products : dict[Product.id, Product] | None, optional
+            Produtos, by default None
+        id_allocator : Id_Allocator | None, optional
+            Alocador dos Ids, por padrão é criado a partir dos Ids dos produtos
         """
         self.__owner = owner
         self.__owner.products = self
-        self._products = products
+        self._products = products if products is not None else dict()
+        self._id_allocator = (
+            id_allocator
+            if id_allocator is not None
+            else Id_Allocator.from_ids(self._products.keys())
+        )
+        self._journal: "I_Journal | None" = None
 
-    def register_product(self, id: int, name: str, price: float) -> None:
+        # Produtos que só são lidos são obtidos por peek, caso o dicionário de produtos
+        # o ofereça, como o catálogo mapeado na memória, para não mantê-los em memória
+        self.__peek = getattr(self._products, "peek", self._products.__getitem__)
+
+        # Ids ordenados, construídos na primeira listagem
+        self._sorted_ids: list[int] | None = None
+
+        # Índice dos nomes, construído na primeira busca
+        self._search_index: Search_Index | None = None
+
+        # Ids ordenados dos produtos com estoque, construídos na primeira listagem
+        # de produtos disponíveis e atualizados quando uma quantidade cruza o zero
+        self._in_stock: list[int] | None = None
+
+        # Pares (preço, id) ordenados, construídos na primeira consulta por preço
+        self._by_price: list[tuple[int, int]] | None = None
+
+        # Protege as listas ordenadas alteradas sob as travas dos produtos
+        self._indexes_lock = threading.Lock()
+
+        # Travas do estoque de cada produto, criadas no primeiro acesso
+        self._locks: dict[int, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+        # Quantidades reservadas em carrinhos ainda não fazem parte de pedidos
+        self._reservations = Reservations()
+
+    def __lock(self, product_id: int) -> threading.Lock:
+        """
+        Obtem a trava do estoque de um produto.
+        Toda alteração na quantidade de um produto é feita com sua trava adquirida,
+        então a verificação e a dedução do estoque acontecem de forma atômica.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        threading.Lock
+            Trava do produto
+        """
+        lock = self._locks.get(product_id)
+        if lock is None:
+            with self._locks_lock:
+                lock = self._locks.setdefault(product_id, threading.Lock())
+        return lock
+
+    def _record(self, operation: str, **data) -> None:
+        """
+        Registra uma mutação no journal, caso exista um.
+
+        Parameters
+        ----------
+        operation : str
+            Nome da operação
+        """
+        if self._journal is not None:
+            self._journal.record(operation, **data)
+
+    def register_product(self, id: int, name: str, price: int) -> None:
         """
         Registra um produto no sistema.
 
@@ -36,8 +118,8 @@ class Product_Manager(I_Product_Manager):
             Id único do produto
         name : str
             Nome do produto
-        price : float
-            Preço do produto
+        price : int
+            Preço do produto, em centavos
         owner : Owner
             Dono
 
@@ -50,6 +132,13 @@ class Product_Manager(I_Product_Manager):
             raise ValueError("Id já existe!")
         else:
             self._products[id] = Product(id, name, price, 0, self.__owner)
+            self._id_allocator.reserve(id)
+            if self._sorted_ids is not None:
+                insort(self._sorted_ids, id)
+            if self._search_index is not None:
+                self._search_index.add(id, name)
+            self.__index_price(id, None, price)
+            self._record("register_product", id=id, name=name, price_cents=price)
 
     def add_product(self, product_id: int, ammount: int = 1) -> None:
         """
@@ -75,7 +164,12 @@ class Product_Manager(I_Product_Manager):
         if product_id not in self._products.keys():
             raise KeyError("Id não existe!")
         else:
-            self._products[product_id].quantity += ammount
+            with self.__lock(product_id):
+                product = self._products[product_id]
+                product.quantity += ammount
+                if product.quantity == ammount:
+                    self.__stock_changed(product_id, True)
+                self._record("add_product", id=product_id, ammount=ammount)
 
     def remove_product(self, product_id: int, ammount: int = 1) -> None:
         """
@@ -101,13 +195,180 @@ class Product_Manager(I_Product_Manager):
         if product_id not in self._products.keys():
             raise KeyError("Id não existe!")
         else:
-            self._products[product_id].quantity -= ammount
+            with self.__lock(product_id):
+                self.__deduct(product_id, ammount)
+
+    def __deduct(self, product_id: int, ammount: int) -> None:
+        """
+        Deduz uma quantidade do estoque de um produto.
+        Deve ser chamado com a trava do produto adquirida.
+
+        Raises
+        ------
+        ValueError
+            Caso o estoque se torne negativo
+        """
+        product = self._products[product_id]
+        product.quantity -= ammount
+        if product.quantity == 0:
+            self.__stock_changed(product_id, False)
+        self._record("remove_product", id=product_id, ammount=ammount)
+
+    def __stock_changed(self, product_id: int, in_stock: bool) -> None:
+        """
+        Atualiza os Ids com estoque quando a quantidade de um produto cruza o zero.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+        in_stock : bool
+            Se o produto passou a ter estoque
+        """
+        with self._indexes_lock:
+            if self._in_stock is None:
+                return
+            i = bisect_left(self._in_stock, product_id)
+            present = i < len(self._in_stock) and self._in_stock[i] == product_id
+            if in_stock and not present:
+                self._in_stock.insert(i, product_id)
+            elif not in_stock and present:
+                del self._in_stock[i]
+
+    def price_changed(self, product: Product, old_price: int) -> None:
+        """
+        Atualiza o índice de preços após o preço de um produto ser alterado.
+        Chamado pelo Product.price.
+
+        Parameters
+        ----------
+        product : Product
+            Produto, já com o preço atual
+        old_price : int
+            Preço anterior
+        """
+        if self._products.get(product.id) is product:
+            self.__index_price(product.id, old_price, product.price)
+
+    def __index_price(
+        self, product_id: int, old_price: int | None, new_price: int | None
+    ) -> None:
+        """
+        Move um produto no índice de preços, caso o índice já tenha sido construído.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+        old_price : int | None
+            Preço indexado, None caso o produto seja novo
+        new_price : int | None
+            Preço a ser indexado, None caso o produto tenha sido removido
+        """
+        with self._indexes_lock:
+            if self._by_price is None:
+                return
+            if old_price is not None:
+                key = (old_price, product_id)
+                i = bisect_left(self._by_price, key)
+                if i < len(self._by_price) and self._by_price[i] == key:
+                    del self._by_price[i]
+            if new_price is not None:
+                insort(self._by_price, (new_price, product_id))
+
+    def import_products(
+        self, rows: Iterable[Catalogue_Row], report: Import_Report | None = None
+    ) -> Import_Report:
+        """
+        Importa várias linhas do catálogo de uma só vez.
+        Ids novos são registrados, Ids existentes são reabastecidos e têm o nome
+        e o preço atualizados quando informados.
+
+        Diferente de chamar register_product e add_product por linha, a lista
+        ordenada de Ids é reconstruída uma única vez e todas as alterações são
+        registradas no journal em um único registro.
+
+        Parameters
+        ----------
+        rows : Iterable[Catalogue_Row]
+            Linhas do catálogo, aplicadas em ordem
+        report : Import_Report | None, optional
+            Relatório a ser atualizado, por padrão um novo relatório
+
+        Returns
+        -------
+        Import_Report
+            Relatório da importação
+        """
+        if report is None:
+            report = Import_Report()
+
+        journaled = self._journal is not None
+        applied: list[dict] = []
+        registered = False
+
+        # Enquanto a trava das travas estiver adquirida nenhuma trava nova é criada,
+        # então só os produtos que já possuem uma trava podem estar em uso
+        with self._locks_lock:
+            for row in rows:
+                product = self._products.get(row.id)
+                if product is None:
+                    if row.name is None or row.price is None:
+                        report.reject(row.line, "Produtos novos precisam de nome e preço!")
+                        continue
+                    product = Product(row.id, row.name, row.price, row.quantity, self.__owner)
+                    self._products[row.id] = product
+                    if row.quantity > 0:
+                        self.__stock_changed(row.id, True)
+                    self._id_allocator.reserve(row.id)
+                    if self._search_index is not None:
+                        self._search_index.add(row.id, row.name)
+                    self.__index_price(row.id, None, row.price)
+                    registered = True
+                    report.registered += 1
+                else:
+                    lock = self._locks.get(row.id)
+                    if lock is not None:
+                        lock.acquire()
+                    try:
+                        if row.name is not None and row.name != product.name:
+                            product.name = row.name
+                            if self._search_index is not None:
+                                self._search_index.add(row.id, row.name)
+                        if row.price is not None and row.price != product.price:
+                            product.price = row.price
+                            report.repriced += 1
+                        product.quantity += row.quantity
+                        if row.quantity > 0 and product.quantity == row.quantity:
+                            self.__stock_changed(row.id, True)
+                    finally:
+                        if lock is not None:
+                            lock.release()
+                    report.restocked += 1
+
+                if journaled:
+                    applied.append(
+                        {
+                            "id": row.id,
+                            "name": product.name,
+                            "price_cents": product.price,
+                            "quantity": row.quantity,
+                        }
+                    )
+
+        if registered:
+            self._sorted_ids = None
+        if len(applied) > 0:
+            self._record("import_products", products=applied)
+        return report
 
     def delete_product(self, product_id: int) -> None:
         """
         Deleta completamente um produto e seu Id.
+        As reservas do produto são liberadas, para que não sejam convertidas em
+        deduções de outro produto que venha a reutilizar o Id.
         Este método não verifica se o produto existe em outras partes do sistema,
-        o que pode gerar conflitos de Id.
+        como em pedidos, o que pode gerar conflitos de Id.
 
         Parameters
         ----------
@@ -122,11 +383,34 @@ class Product_Manager(I_Product_Manager):
         if product_id not in self._products.keys():
             raise KeyError("Id não existe!")
         else:
-            self._products.pop(product_id)
+            product = self._products.pop(product_id)
+            self._reservations.release_product(product_id)
+            self._locks.pop(product_id, None)
+            self.__stock_changed(product_id, False)
+            self.__index_price(product_id, product.price, None)
+            self._id_allocator.release(product_id)
+            if self._sorted_ids is not None:
+                del self._sorted_ids[bisect_left(self._sorted_ids, product_id)]
+            if self._search_index is not None:
+                self._search_index.remove(product_id)
+            self._record("delete_product", id=product_id)
+
+    def next_id(self) -> int:
+        """
+        Obtem o Id que deve ser usado pelo próximo produto registrado.
+
+        Returns
+        -------
+        int
+            Id livre
+        """
+        return self._id_allocator.peek()
 
-    def get_product(self, product_id: int) -> Product:
+    def get_product(self, product_id: int) -> Line_Item:
         """
         Obtem um produto.
+        A quantidade do item retornado é a quantidade disponível no estoque,
+        descontadas as reservas.
 
         Parameters
         ----------
@@ -135,7 +419,7 @@ class Product_Manager(I_Product_Manager):
 
         Returns
         -------
-        Product
+        Line_Item
             Produto
 
         Raises
@@ -146,11 +430,36 @@ class Product_Manager(I_Product_Manager):
         if product_id not in self._products.keys():
             raise KeyError("Produto não existe!")
         else:
-            return deepcopy(self._products[product_id])
+            return self.__peek(product_id).line_item(self.available(product_id))
+
+    def available(self, product_id: int) -> int:
+        """
+        Obtem a quantidade de um produto que pode ser obtida ou reservada.
+        Reservas vencidas são liberadas antes da consulta.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        int
+            Quantidade em estoque menos a quantidade reservada
 
-    def retrieve_product(self, product_id: int, ammount: int = 1) -> Product:
+        Raises
+        ------
+        KeyError
+            Caso o id não exista
         """
-        Obtem uma quantidade de produto do sistema, a quantidade é automaticamente deduzida
+        self._reservations.expire()
+        quantity = self.__peek(product_id).quantity
+        return max(quantity - self._reservations.reserved(product_id), 0)
+
+    def retrieve_product(self, product_id: int, ammount: int = 1) -> Line_Item:
+        """
+        Obtem uma quantidade de produto do sistema, a quantidade é automaticamente deduzida.
+        A dedução é registrada no journal como uma remoção.
 
         Parameters
         ----------
@@ -161,8 +470,8 @@ class Product_Manager(I_Product_Manager):
 
         Returns
         -------
-        Product
-            Produto
+        Line_Item
+            Item com a quantidade obtida
 
         Raises
         ------
@@ -177,16 +486,415 @@ class Product_Manager(I_Product_Manager):
         if product_id not in self._products.keys():
             raise KeyError("Produto não existe!")
         else:
+            with self.__lock(product_id):
+                product = self._products[product_id]
+                if ammount > self.available(product_id):
+                    raise ValueError(
+                        "Quantidade requisitada maior que a quantidade disponível!"
+                    )
+                else:
+                    retrieved = product.line_item(ammount)
+                    self.__deduct(product_id, ammount)
+                    return retrieved
+
+    def retrieve_products(self, items: Iterable[tuple[int, int]]) -> list[Line_Item]:
+        """
+        Obtem várias quantidades de produtos de uma só vez, como em um carrinho.
+        Ou todas quantidades são deduzidas, ou nenhuma é.
+        Quantidades de um mesmo produto são somadas em um único item.
 
-            if ammount > self._products[product_id].quantity:
-                raise ValueError(
-                    "Quantidade requisitada maior que a quantidade disponível!"
-                )
+        As travas dos produtos são adquiridas em ordem crescente de Id,
+        o que evita impasses entre reservas concorrentes.
+
+        Parameters
+        ----------
+        items : Iterable[tuple[int, int]]
+            Pares (id do produto, quantidade)
+
+        Returns
+        -------
+        list[Line_Item]
+            Itens obtidos, na ordem em que cada produto aparece pela primeira vez
+
+        Raises
+        ------
+        ValueError
+            Caso alguma quantidade seja inválida ou maior que a disponível
+        KeyError
+            Caso algum id não exista
+        """
+        requested: dict[int, int] = {}
+        for product_id, ammount in items:
+            if ammount <= 0:
+                raise ValueError("A quantidade deve ser maior que zero!")
+            if product_id not in self._products.keys():
+                raise KeyError("Produto não existe!")
+            requested[product_id] = requested.get(product_id, 0) + ammount
+
+        # As travas são obtidas antes de qualquer uma ser adquirida
+        locks = [self.__lock(product_id) for product_id in sorted(requested)]
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+
+            for product_id, ammount in requested.items():
+                if product_id not in self._products.keys():
+                    raise KeyError("Produto não existe!")
+                if ammount > self.available(product_id):
+                    raise ValueError(
+                        "Quantidade requisitada maior que a quantidade disponível!"
+                    )
+
+            retrieved = []
+            for product_id, ammount in requested.items():
+                retrieved.append(self._products[product_id].line_item(ammount))
+                self.__deduct(product_id, ammount)
+            return retrieved
+
+    def retrieve_batch(
+        self, carts: Iterable[Iterable[tuple[int, int]]]
+    ) -> list[list[Line_Item] | Exception]:
+        """
+        Obtem os itens de vários carrinhos em uma única passada.
+
+        A demanda dos carrinhos é somada por produto, e as travas de todos os produtos
+        envolvidos são adquiridas uma única vez, em ordem crescente de Id. Cada carrinho
+        é verificado, na ordem recebida, contra o estoque restante após os anteriores:
+        um carrinho sem estoque suficiente falha por completo, sem afetar os demais.
+        Ao final, o total obtido de cada produto é deduzido de uma só vez e registrado
+        no journal como uma única remoção.
+
+        Parameters
+        ----------
+        carts : Iterable[Iterable[tuple[int, int]]]
+            Carrinhos, cada um com pares (id do produto, quantidade)
+
+        Returns
+        -------
+        list[list[Line_Item] | Exception]
+            Para cada carrinho, os itens obtidos, na ordem em que cada produto aparece
+            pela primeira vez, ou o erro que o impediu (ValueError ou KeyError)
+        """
+        requested: list[dict[int, int] | Exception] = []
+        for items in carts:
+            cart: dict[int, int] = {}
+            try:
+                for product_id, ammount in items:
+                    if ammount <= 0:
+                        raise ValueError("A quantidade deve ser maior que zero!")
+                    if product_id not in self._products.keys():
+                        raise KeyError("Produto não existe!")
+                    cart[product_id] = cart.get(product_id, 0) + ammount
+            except (ValueError, KeyError) as e:
+                requested.append(e)
+                continue
+            requested.append(cart)
+
+        product_ids = sorted(
+            {product_id for cart in requested if isinstance(cart, dict) for product_id in cart}
+        )
+        locks = [self.__lock(product_id) for product_id in product_ids]
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+
+            remaining = {product_id: self.available(product_id) for product_id in product_ids}
+            deducted: dict[int, int] = {}
+            results: list[list[Line_Item] | Exception] = []
+            for cart in requested:
+                if isinstance(cart, Exception):
+                    results.append(cart)
+                    continue
+                if any(ammount > remaining[product_id] for product_id, ammount in cart.items()):
+                    results.append(
+                        ValueError("Quantidade requisitada maior que a quantidade disponível!")
+                    )
+                    continue
+
+                retrieved = []
+                for product_id, ammount in cart.items():
+                    remaining[product_id] -= ammount
+                    deducted[product_id] = deducted.get(product_id, 0) + ammount
+                    retrieved.append(self.__peek(product_id).line_item(ammount))
+                results.append(retrieved)
+
+            for product_id, ammount in deducted.items():
+                self.__deduct(product_id, ammount)
+            return results
+
+    def reserve_product(
+        self, product_id: int, ammount: int = 1, ttl: float | None = None
+    ) -> Hold:
+        """
+        Reserva uma quantidade de produto para um carrinho, sem deduzi-la do estoque.
+        A quantidade deixa de estar disponível até a reserva ser convertida em
+        pedido por commit_holds, liberada por release_hold ou expirar.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+        ammount : int, optional
+            Quantidade, by default 1
+        ttl : float | None, optional
+            Validade da reserva, em segundos, por padrão reservation_ttl
+
+        Returns
+        -------
+        Hold
+            Reserva
+
+        Raises
+        ------
+        ValueError
+            Caso a quantidade de produto seja um número inválido
+        KeyError
+            Caso o id não exista
+        """
+        if ammount <= 0:
+            raise ValueError("A quantidade deve ser maior que zero!")
+
+        if product_id not in self._products.keys():
+            raise KeyError("Produto não existe!")
+        else:
+            with self.__lock(product_id):
+                if ammount > self.available(product_id):
+                    raise ValueError(
+                        "Quantidade requisitada maior que a quantidade disponível!"
+                    )
+                else:
+                    item = self._products[product_id].line_item(ammount)
+                    return self._reservations.add(item, ttl)
+
+    def release_hold(self, hold: Hold) -> bool:
+        """
+        Libera uma reserva, devolvendo a quantidade ao estoque disponível.
+
+        Parameters
+        ----------
+        hold : Hold
+            Reserva
+
+        Returns
+        -------
+        bool
+            Se a reserva ainda estava ativa
+        """
+        return self._reservations.release(hold.id) is not None
+
+    def is_hold_active(self, hold: Hold) -> bool:
+        """
+        Verifica se uma reserva ainda não expirou nem foi liberada.
+
+        Parameters
+        ----------
+        hold : Hold
+            Reserva
+
+        Returns
+        -------
+        bool
+            Se a reserva está ativa
+        """
+        self._reservations.expire()
+        return self._reservations.is_active(hold.id)
+
+    def commit_holds(self, holds: Iterable[Hold]) -> list[Line_Item]:
+        """
+        Converte reservas em deduções do estoque.
+        Ou todas as reservas são convertidas, ou nenhuma é.
+        As deduções são registradas no journal como remoções.
+
+        Parameters
+        ----------
+        holds : Iterable[Hold]
+            Reservas
+
+        Returns
+        -------
+        list[Line_Item]
+            Itens reservados, na mesma ordem das reservas
+
+        Raises
+        ------
+        ValueError
+            Caso alguma reserva tenha expirado ou sido liberada
+        KeyError
+            Caso algum produto não exista mais
+        """
+        holds = list(holds)
+        product_ids = sorted({hold.product_id for hold in holds})
+        locks = [self.__lock(product_id) for product_id in product_ids]
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+
+            self._reservations.expire()
+            for hold in holds:
+                if not self._reservations.is_active(hold.id):
+                    raise ValueError("Reserva expirada!")
+                if hold.product_id not in self._products.keys():
+                    raise KeyError("Produto não existe!")
+
+            for hold in holds:
+                self._reservations.release(hold.id)
+                self.__deduct(hold.product_id, hold.quantity)
+            return [hold.item for hold in holds]
+
+    def search_products(
+        self, query: str, limit: int = 10, only_available: bool = False
+    ) -> list[Product]:
+        """
+        Busca produtos pelo nome, aceitando prefixos e erros de digitação.
+        O índice dos nomes é construído na primeira busca e mantido pelo registro,
+        importação e remoção de produtos.
+
+        Parameters
+        ----------
+        query : str
+            Busca
+        limit : int, optional
+            Quantidade máxima de resultados, by default 10
+        only_available : bool, optional
+            Se somente produtos disponíveis devem ser encontrados, by default False
+
+        Returns
+        -------
+        list[Product]
+            Produtos encontrados, do mais relevante ao menos relevante
+        """
+        if self._search_index is None:
+            self._search_index = Search_Index.from_names(
+                (product.id, product.name) for product in self.iter_products()
+            )
+
+        accept = None
+        if only_available:
+            accept = lambda product_id: self.available(product_id) > 0
+        ids = self._search_index.search(query, limit, accept)
+        return [self.__peek(product_id) for product_id in ids]
+
+    def page_products(
+        self,
+        after: int | None = None,
+        before: int | None = None,
+        size: int = 20,
+        only_available: bool = False,
+    ) -> Page[Product]:
+        """
+        Obtem uma página dos produtos, ordenados por seus Ids.
+        A página é encontrada por busca binária nos Ids ordenados, então seu custo
+        depende somente do tamanho da página.
+
+        Parameters
+        ----------
+        after : int | None, optional
+            Cursor: Id após o qual a página começa, como Page.next, by default None
+        before : int | None, optional
+            Cursor: Id antes do qual a página termina, como Page.previous, by default None
+        size : int, optional
+            Quantidade máxima de produtos, by default 20
+        only_available : bool, optional
+            Se somente produtos disponíveis devem ser listados, by default False
+
+        Returns
+        -------
+        Page[Product]
+            Página de produtos
+        """
+        ids = self.__ids()
+        accept = None
+        if only_available:
+            # Somente produtos com estoque são percorridos, e deles
+            # são descartados os que estão totalmente reservados
+            ids = self.__in_stock()
+            accept = lambda product_id: self.available(product_id) > 0
+        page = paginate(ids, after, before, size, accept)
+        return Page([self.__peek(id) for id in page.items], page.previous, page.next)
+
+    def products_by_price(
+        self,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+        after: tuple[int, int] | None = None,
+        only_available: bool = False,
+    ) -> list[Product]:
+        """
+        Lista os produtos ordenados pelo preço, e pelo Id entre preços iguais.
+        Os limites da faixa são encontrados por busca binária no índice de preços,
+        então a consulta custa O(log n + limit).
+
+        Parameters
+        ----------
+        min_price : int | None, optional
+            Preço mínimo em centavos, inclusivo, by default None
+        max_price : int | None, optional
+            Preço máximo em centavos, inclusivo, by default None
+        descending : bool, optional
+            Se os produtos mais caros devem vir primeiro, by default False
+        limit : int | None, optional
+            Quantidade máxima de produtos, by default None
+        after : tuple[int, int] | None, optional
+            Cursor: par (preço, id) do último produto da página anterior, by default None
+        only_available : bool, optional
+            Se somente produtos disponíveis devem ser listados, by default False
+
+        Returns
+        -------
+        list[Product]
+            Produtos na faixa de preço
+        """
+        index = self.__price_index()
+        start = bisect_left(index, (min_price,)) if min_price is not None else 0
+        end = bisect_right(index, (max_price, math.inf)) if max_price is not None else len(index)
+        if after is not None:
+            if descending:
+                end = min(end, bisect_left(index, after))
             else:
-                retrieved = deepcopy(self._products[product_id])
-                retrieved.quantity = ammount
-                self.remove_product(product_id, ammount)
-                return retrieved
+                start = max(start, bisect_right(index, after))
+
+        positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+        products: list[Product] = []
+        for i in positions:
+            if limit is not None and len(products) >= limit:
+                break
+            product_id = index[i][1]
+            if only_available and self.available(product_id) < 1:
+                continue
+            products.append(self.__peek(product_id))
+        return products
+
+    def cheapest(self, k: int = 10, only_available: bool = False) -> list[Product]:
+        """
+        Lista os k produtos mais baratos, do mais barato ao mais caro.
+        """
+        return self.products_by_price(limit=k, only_available=only_available)
+
+    def most_expensive(self, k: int = 10, only_available: bool = False) -> list[Product]:
+        """
+        Lista os k produtos mais caros, do mais caro ao mais barato.
+        """
+        return self.products_by_price(
+            descending=True, limit=k, only_available=only_available
+        )
+
+    def __price_index(self) -> list[tuple[int, int]]:
+        """
+        Obtem a lista ordenada de pares (preço, id), sem copiá-la.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            Pares em ordem crescente
+        """
+        with self._indexes_lock:
+            if self._by_price is None:
+                self._by_price = sorted(
+                    (product.price, product.id) for product in self.iter_products()
+                )
+            return self._by_price
 
     def list_products(self) -> list[Product]:
         """
@@ -197,19 +905,72 @@ class Product_Manager(I_Product_Manager):
         list[Product]
             Lista de produtos
         """
-        sorted_keys = self.ids()
-        return [self._products[key] for key in sorted_keys]
+        return list(self.iter_products())
+
+    def iter_products(self) -> Iterator[Product]:
+        """
+        Percorre os produtos no sistema, ordenados por seus Ids.
 
-    def ids(self) -> set[int]:
+        Yields
+        ------
+        Product
+            Produto
+        """
+        for id in self.__ids():
+            yield self.__peek(id)
+
+    def iter_in_stock(self) -> Iterator[Product]:
+        """
+        Percorre os produtos com estoque, ordenados por seus Ids,
+        sem percorrer os produtos esgotados.
+
+        Yields
+        ------
+        Product
+            Produto com quantidade maior que zero
+        """
+        for id in list(self.__in_stock()):
+            yield self.__peek(id)
+
+    def __in_stock(self) -> list[int]:
+        """
+        Obtem a lista ordenada de Ids dos produtos com estoque, sem copiá-la.
+
+        Returns
+        -------
+        list[int]
+            Ids em ordem crescente
+        """
+        with self._indexes_lock:
+            if self._in_stock is None:
+                self._in_stock = [
+                    product.id for product in self.iter_products() if product.quantity > 0
+                ]
+            return self._in_stock
+
+    def ids(self) -> list[int]:
         """
         Retorna os Ids de todos produtos em ordem crescente.
 
         Returns
         -------
-        set[int]
-            Set contendo os Ids.
+        list[int]
+            Lista contendo os Ids.
+        """
+        return list(self.__ids())
+
+    def __ids(self) -> list[int]:
         """
-        return set(sorted(self._products.keys()))
+        Obtem a lista ordenada de Ids mantida pelo gerenciador, sem copiá-la.
+
+        Returns
+        -------
+        list[int]
+            Ids em ordem crescente
+        """
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self._products.keys())
+        return self._sorted_ids
 
     @property
     def owner(self) -> "Owner":
@@ -219,5 +980,29 @@ class Product_Manager(I_Product_Manager):
     def products(self) -> dict[Product.id, Product]:
         return self._products
 
+    @property
+    def id_allocator(self) -> Id_Allocator:
+        return self._id_allocator
+
+    @property
+    def reservations(self) -> Reservations:
+        return self._reservations
+
+    @property
+    def reservation_ttl(self) -> float:
+        return self._reservations.ttl
+
+    @reservation_ttl.setter
+    def reservation_ttl(self, ttl: float) -> None:
+        self._reservations.ttl = ttl
+
+    @property
+    def journal(self) -> "I_Journal | None":
+        return self._journal
+
+    @journal.setter
+    def journal(self, journal: "I_Journal | None") -> None:
+        self._journal = journal
+
     def __repr__(self) -> str:
         return f"Product_Manager(contem {len(self._products)} produtos)"
@@ -0,0 +1,161 @@
+from __future__ import annotations
+from collections import Counter
+import heapq
+from itertools import count
+import threading
+import time
+
+from products.hold import Hold
+from products.line_item import Line_Item
+
+
+class Reservations:
+    def __init__(self, ttl: float = 600.0) -> None:
+        """
+        Reservas de estoque com prazo de validade.
+
+        As reservas ativas ficam em um dicionário indexado pelo Id e em um heap
+        ordenado pelo instante de expiração. Reservas liberadas antes de expirar
+        saem apenas do dicionário, e sua entrada no heap é descartada quando
+        chega ao topo. Assim, criar, liberar e expirar uma reserva custa O(log n).
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Validade padrão das reservas, em segundos, by default 600.0
+        """
+        self.ttl = ttl
+        self._holds: dict[int, Hold] = {}
+        self._heap: list[tuple[float, int]] = []
+        self._reserved: Counter[int] = Counter()
+        self.__ids = count()
+        self.__lock = threading.Lock()
+
+    def add(self, item: Line_Item, ttl: float | None = None) -> Hold:
+        """
+        Cria uma reserva.
+        A verificação do estoque disponível é responsabilidade de quem chama.
+
+        Parameters
+        ----------
+        item : Line_Item
+            Item reservado
+        ttl : float | None, optional
+            Validade da reserva, em segundos, por padrão a validade das reservas
+
+        Returns
+        -------
+        Hold
+            Reserva
+        """
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self.__lock:
+            hold = Hold(next(self.__ids), item, expires_at)
+            self._holds[hold.id] = hold
+            self._reserved[item.product_id] += item.quantity
+            heapq.heappush(self._heap, (expires_at, hold.id))
+        return hold
+
+    def release(self, hold_id: int) -> Hold | None:
+        """
+        Libera uma reserva, devolvendo sua quantidade ao estoque disponível.
+
+        Parameters
+        ----------
+        hold_id : int
+            Id da reserva
+
+        Returns
+        -------
+        Hold | None
+            Reserva liberada
+            None caso a reserva já tenha sido liberada ou expirado
+        """
+        with self.__lock:
+            return self.__discard(hold_id)
+
+    def release_product(self, product_id: int) -> list[Hold]:
+        """
+        Libera todas as reservas de um produto, como quando ele é removido.
+        As reservas ativas só são percorridas caso o produto tenha alguma.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        list[Hold]
+            Reservas liberadas
+        """
+        with self.__lock:
+            if product_id not in self._reserved:
+                return []
+            hold_ids = [id for id, hold in self._holds.items() if hold.product_id == product_id]
+            return [hold for hold in map(self.__discard, hold_ids) if hold is not None]
+
+    def __discard(self, hold_id: int) -> Hold | None:
+        hold = self._holds.pop(hold_id, None)
+        if hold is not None:
+            self._reserved[hold.product_id] -= hold.quantity
+            if self._reserved[hold.product_id] <= 0:
+                del self._reserved[hold.product_id]
+        return hold
+
+    def expire(self, now: float | None = None) -> list[Hold]:
+        """
+        Libera todas as reservas vencidas.
+
+        Parameters
+        ----------
+        now : float | None, optional
+            Instante atual, by default time.monotonic()
+
+        Returns
+        -------
+        list[Hold]
+            Reservas expiradas
+        """
+        if now is None:
+            now = time.monotonic()
+
+        expired = []
+        with self.__lock:
+            while len(self._heap) > 0 and self._heap[0][0] <= now:
+                _, hold_id = heapq.heappop(self._heap)
+                hold = self.__discard(hold_id)
+                if hold is not None:
+                    expired.append(hold)
+
+            # Entradas de reservas já liberadas ocupam o heap até chegarem ao topo,
+            # o heap é reconstruído quando elas se tornam a maioria
+            if len(self._heap) > 2 * len(self._holds) + 64:
+                self._heap = [(hold.expires_at, hold.id) for hold in self._holds.values()]
+                heapq.heapify(self._heap)
+        return expired
+
+    def is_active(self, hold_id: int) -> bool:
+        return hold_id in self._holds
+
+    def reserved(self, product_id: int) -> int:
+        """
+        Obtem a quantidade reservada de um produto.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        int
+            Quantidade reservada
+        """
+        return self._reserved.get(product_id, 0)
+
+    def __len__(self) -> int:
+        return len(self._holds)
+
+    def __repr__(self) -> str:
+        return f"Reservations(contem {len(self._holds)} reservas ativas)"
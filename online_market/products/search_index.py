@@ -0,0 +1,262 @@
+from __future__ import annotations
+from bisect import bisect_left, insort
+import heapq
+import re
+import unicodedata
+from typing import Callable, Iterable, Iterator
+
+# Pontuação de cada tipo de correspondência entre um termo da busca e um termo do nome
+EXACT = 3.0
+PREFIX = 2.0
+FUZZY = 1.0
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Separa um texto em termos normalizados: sem acentos e em letras minúsculas.
+
+    Parameters
+    ----------
+    text : str
+        Texto
+
+    Returns
+    -------
+    list[str]
+        Termos, na ordem em que aparecem
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _WORD.findall(stripped.casefold())
+
+
+def _deletions(token: str) -> set[str]:
+    """
+    Obtem o termo e todas as variações com um caractere removido.
+    Dois termos a uma edição de distância sempre compartilham alguma variação.
+    """
+    return {token} | {token[:i] + token[i + 1 :] for i in range(len(token))}
+
+
+def _one_edit(a: str, b: str) -> bool:
+    """
+    Verifica se dois termos estão a exatamente uma edição de distância: uma letra
+    trocada, removida, adicionada ou duas letras vizinhas invertidas.
+    """
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+
+    i = 0
+    while i < len(a) and i < len(b) and a[i] == b[i]:
+        i += 1
+
+    if len(a) == len(b):
+        return a[i + 1 :] == b[i + 1 :] or (
+            a[i + 1 : i + 2] == b[i : i + 1]
+            and a[i : i + 1] == b[i + 1 : i + 2]
+            and a[i + 2 :] == b[i + 2 :]
+        )
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    return a[i + 1 :] == b[i:]
+
+
+class Search_Index:
+    def __init__(self, fuzzy_length: int = 4) -> None:
+        """
+        Índice invertido dos nomes dos produtos.
+
+        Cada termo do nome aponta para os produtos que o contêm. Os termos também são
+        mantidos em uma lista ordenada, usada nas buscas por prefixo, e indexados por
+        suas variações com um caractere removido, usadas nas buscas com erros de
+        digitação: um termo da busca só é comparado com os termos que compartilham
+        alguma variação com ele, sem percorrer o vocabulário.
+
+        Parameters
+        ----------
+        fuzzy_length : int, optional
+            Tamanho mínimo de um termo da busca para aceitar um erro de digitação,
+            by default 4
+        """
+        self.fuzzy_length = fuzzy_length
+
+        self._postings: dict[str, set[int]] = {}
+        self._names: dict[int, tuple[str, ...]] = {}
+        self._vocabulary: list[str] = []
+        self._deletions: dict[str, set[str]] = {}
+
+    @staticmethod
+    def from_names(names: Iterable[tuple[int, str]]) -> Search_Index:
+        """
+        Constrói o índice de uma só vez, ordenando o vocabulário uma única vez.
+
+        Parameters
+        ----------
+        names : Iterable[tuple[int, str]]
+            Pares (id do produto, nome)
+
+        Returns
+        -------
+        Search_Index
+            Índice
+        """
+        index = Search_Index()
+        for product_id, name in names:
+            tokens = tuple(dict.fromkeys(tokenize(name)))
+            index._names[product_id] = tokens
+            for token in tokens:
+                ids = index._postings.get(token)
+                if ids is None:
+                    index._postings[token] = {product_id}
+                    for deletion in _deletions(token):
+                        index._deletions.setdefault(deletion, set()).add(token)
+                else:
+                    ids.add(product_id)
+        index._vocabulary = sorted(index._postings)
+        return index
+
+    def add(self, product_id: int, name: str) -> None:
+        """
+        Indexa o nome de um produto, substituindo o nome indexado anteriormente.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+        name : str
+            Nome do produto
+        """
+        self.remove(product_id)
+        tokens = tuple(dict.fromkeys(tokenize(name)))
+        self._names[product_id] = tokens
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = {product_id}
+                insort(self._vocabulary, token)
+                for deletion in _deletions(token):
+                    self._deletions.setdefault(deletion, set()).add(token)
+            else:
+                ids.add(product_id)
+
+    def remove(self, product_id: int) -> None:
+        """
+        Remove um produto do índice, caso esteja indexado.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+        """
+        for token in self._names.pop(product_id, ()):
+            ids = self._postings[token]
+            ids.discard(product_id)
+            if len(ids) < 1:
+                # O termo deixa de existir no vocabulário
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+                for deletion in _deletions(token):
+                    tokens = self._deletions[deletion]
+                    tokens.discard(token)
+                    if len(tokens) < 1:
+                        del self._deletions[deletion]
+
+    def __prefixed(self, prefix: str) -> Iterator[str]:
+        """
+        Percorre os termos do vocabulário que começam com um prefixo, exceto o próprio prefixo.
+        """
+        i = bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            if self._vocabulary[i] != prefix:
+                yield self._vocabulary[i]
+            i += 1
+
+    def __similar(self, token: str) -> set[str]:
+        """
+        Obtem os termos do vocabulário a exatamente uma edição de distância.
+        Termos que existem no vocabulário não são tratados como erros de digitação.
+        """
+        if len(token) < self.fuzzy_length or token in self._postings:
+            return set()
+
+        candidates: set[str] = set()
+        for deletion in _deletions(token):
+            candidates |= self._deletions.get(deletion, set())
+        candidates.discard(token)
+        return {candidate for candidate in candidates if _one_edit(token, candidate)}
+
+    def __matches(self, token: str) -> dict[int, float]:
+        """
+        Pontua os produtos que correspondem a um termo da busca,
+        mantendo a melhor correspondência de cada produto.
+        """
+        scores: dict[int, float] = {}
+
+        def match(matched: str, score: float) -> None:
+            for product_id in self._postings[matched]:
+                if scores.get(product_id, 0.0) < score:
+                    scores[product_id] = score
+
+        for similar in self.__similar(token):
+            match(similar, FUZZY)
+        for prefixed in self.__prefixed(token):
+            match(prefixed, PREFIX)
+        if token in self._postings:
+            match(token, EXACT)
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        accept: Callable[[int], bool] | None = None,
+    ) -> list[int]:
+        """
+        Busca produtos pelo nome.
+
+        Cada termo da busca corresponde a um termo do nome de forma exata, como prefixo
+        ou com um erro de digitação (uma letra trocada, faltando, sobrando ou duas
+        letras vizinhas invertidas). Os produtos são ordenados pela soma das melhores
+        correspondências de cada termo, então produtos que correspondem a mais termos
+        da busca aparecem primeiro; empates favorecem nomes mais curtos.
+
+        Parameters
+        ----------
+        query : str
+            Busca
+        limit : int, optional
+            Quantidade máxima de resultados, by default 10
+        accept : Callable[[int], bool] | None, optional
+            Filtro aplicado aos Ids encontrados, by default None
+
+        Returns
+        -------
+        list[int]
+            Ids dos produtos encontrados, do mais relevante ao menos relevante
+        """
+        scores: dict[int, float] = {}
+        for token in dict.fromkeys(tokenize(query)):
+            for product_id, score in self.__matches(token).items():
+                scores[product_id] = scores.get(product_id, 0.0) + score
+
+        found = scores.keys() if accept is None else filter(accept, scores.keys())
+        return heapq.nsmallest(
+            limit,
+            found,
+            key=lambda product_id: (
+                -scores[product_id],
+                len(self._names[product_id]),
+                product_id,
+            ),
+        )
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"Search_Index(contem {len(self._names)} produtos e {len(self._vocabulary)} termos)"
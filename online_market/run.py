@@ -1,9 +1,11 @@
+from contextlib import nullcontext
 import json
 import os
 
 from users import Abstract_User, Address, Customer, Owner
 from products import Product_Manager
 from orders import Order_Manager
+from storage import Flusher
 
 import constants as C
 import functions as F
@@ -12,7 +14,7 @@ import functions as F
 def run() -> None:
     # --- Inicialização --- #
     try:
-        owner, customers, market, orders = F.load_data(C.database)
+        owner, customers, market, orders, journal = F.open_market(C.storage)
     except FileNotFoundError:
         print("Database não encontrada! (Execute o setup para cadastrar um dono)")
     except json.JSONDecodeError as e:
@@ -21,6 +23,9 @@ def run() -> None:
         print(f"Um erro inexperado ocorreu enquanto carregando a database: {e}")
 
     auth_data = F.generate_auth_data(owner, customers)
+    # Os comandos acessam o mercado com a trava do Flusher, que o copia para salvá-lo.
+    # A trava é liberada enquanto o usuário digita (veja users.helpers.ask)
+    lock = journal.lock if isinstance(journal, Flusher) else nullcontext()
 
     # --- Tela de início --- #
     logged_in = None
@@ -44,11 +49,13 @@ def run() -> None:
         match int(option):
             case C.login:
                 print("- - - Login - - -")
-                logged_in = F.login(auth_data)
+                with lock:
+                    logged_in = F.login(auth_data, journal)
 
             case C.register:
                 print("- - - Registrar - - -")
-                F.register(customers, auth_data)
+                with lock:
+                    F.register(customers, auth_data, journal)
 
             case C.quit:
                 break
@@ -66,7 +73,11 @@ def run() -> None:
             # Dicionario especificando argumentos para métodos que precisam
             args_dict: dict[str, tuple[tuple, dict]] = {
                 "view_products": ((market,), {}),
+                "search_products": ((market,), {}),
+                "browse_by_price": ((market,), {}),
                 "place_order": ((owner,), {}),
+                "cancel_order": ((owner,), {}),
+                "confirm_arrival": ((owner,), {}),
             }
 
             print("- - - Mercado Online - - -")
@@ -95,7 +106,20 @@ def run() -> None:
             if selected < len(permissions) and selected >= 0:
                 method = getattr(logged_in, permissions[selected])
                 args, kwargs = args_dict.get(permissions[selected], ((), {}))
-                method(*args, **kwargs)
+                password = logged_in.password
+                with lock:
+                    method(*args, **kwargs)
+
+                if journal is not None:
+                    # Somente uma senha realmente alterada precisa ser salva
+                    if logged_in.password != password:
+                        journal.record(
+                            "change_password",
+                            id=logged_in.id,
+                            password=logged_in.password,
+                        )
+                    if journal.needs_compaction():
+                        F.compact(owner, customers, market, orders, C.database, journal)
             elif selected == len(permissions):
                 break
             else:
@@ -103,7 +127,7 @@ def run() -> None:
             print()
 
     # --- Finalização --- #
-    F.save_data(owner, customers, market, orders, C.database)
+    F.close_market(owner, customers, market, orders, journal)
 
 
 if __name__ == "__main__":
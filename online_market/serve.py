@@ -0,0 +1,39 @@
+import asyncio
+
+from server import Market_Server
+
+import constants as C
+import functions as F
+
+
+def serve() -> None:
+    # --- Inicialização --- #
+    owner, customers, market, orders, journal = F.open_market(C.storage)
+    auth_data = F.generate_auth_data(owner, customers)
+
+    def compact() -> None:
+        assert journal is not None
+        F.compact(owner, customers, market, orders, C.database, journal)
+
+    server = Market_Server(owner, auth_data, journal, compact)
+
+    async def main() -> None:
+        await server.start(C.host, C.port)
+        print(f"Servidor aguardando conexões em {C.host}:{C.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    # --- Loop Principal --- #
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nEncerrando o servidor.")
+
+    # --- Finalização --- #
+    F.close_market(owner, customers, market, orders, journal)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,2 @@
+from server.session import Session
+from server.market_server import Market_Server
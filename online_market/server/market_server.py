@@ -0,0 +1,136 @@
+from __future__ import annotations
+import asyncio
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Callable
+
+from server.session import Session
+from storage import Flusher, Market_Lock
+
+if TYPE_CHECKING:
+    from users import Abstract_User, Owner
+    from storage import I_Journal
+
+
+class Market_Server:
+    def __init__(
+        self,
+        owner: "Owner",
+        auth_data: Mapping[str, "Abstract_User"],
+        journal: "I_Journal | None" = None,
+        compact: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Servidor assíncrono do mercado.
+
+        Todas as sessões compartilham os mesmos gerenciadores e rodam em uma única
+        thread: cada comando é executado por completo entre dois pontos de espera,
+        então nenhuma sessão observa o estado de um comando pela metade.
+        As esperas acontecem somente na leitura e escrita das conexões e na
+        verificação de senhas, feita pelas threads do Password_Hasher,
+        o que permite manter milhares de sessões abertas ao mesmo tempo.
+        Quando um Flusher salva a database, ou quando o journal é compactado, um
+        comando que encontra a trava do mercado ocupada espera e é executado em
+        outra thread (veja Session). A compactação também é feita em outra thread.
+
+        Parameters
+        ----------
+        owner : Owner
+            Dono do mercado
+        auth_data : Mapping[str, Abstract_User]
+            Dados de autenticação de todos usuários
+        journal : I_Journal | None, optional
+            Journal das mutações, by default None
+        compact : Callable[[], None] | None, optional
+            Função chamada quando o journal precisa ser compactado, by default None
+        """
+        self.__owner = owner
+        self.__auth_data = auth_data
+        self.__journal = journal
+        self.__compact = compact
+        # Sem um Flusher, a trava só é disputada pela compactação do journal
+        self.__lock = journal.lock if isinstance(journal, Flusher) else Market_Lock()
+        self.__server: asyncio.AbstractServer | None = None
+        self._sessions: dict[Session, asyncio.StreamWriter] = {}
+        self.__tasks: set[asyncio.Task] = set()
+
+    async def start(self, host: str, port: int) -> None:
+        """
+        Começa a aceitar conexões.
+
+        Parameters
+        ----------
+        host : str
+            Endereço
+        port : int
+            Porta
+        """
+        self.__server = await asyncio.start_server(self.__handle_client, host, port)
+
+    async def serve_forever(self) -> None:
+        assert self.__server is not None
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    async def close(self) -> None:
+        if self.__server is not None:
+            self.__server.close()
+            # Encerra as conexões abertas, cada sessão termina ao ler o fim da conexão
+            for writer in list(self._sessions.values()):
+                writer.close()
+            await asyncio.gather(*self.__tasks, return_exceptions=True)
+            await self.__server.wait_closed()
+            self.__server = None
+
+    async def __handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        session = Session(self.__owner, self.__auth_data, self.__journal, self.__lock)
+        self._sessions[session] = writer
+        task = asyncio.current_task()
+        if task is not None:
+            self.__tasks.add(task)
+        try:
+            while not session.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                response = await session.handle(line.decode("utf-8", errors="replace"))
+                writer.write(response.encode("utf-8") + b"\n")
+                await writer.drain()
+
+                await self.__maybe_compact()
+        except ConnectionError:
+            pass
+        finally:
+            self._sessions.pop(session, None)
+            self.__tasks.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __maybe_compact(self) -> None:
+        """
+        Compacta o journal em outra thread, com a trava do mercado adquirida,
+        sem parar o loop de eventos enquanto a database é reescrita.
+        """
+        journal, compact = self.__journal, self.__compact
+        if journal is None or compact is None or not journal.needs_compaction():
+            return
+
+        def run() -> None:
+            with self.__lock:
+                # Outra sessão pode ter compactado o journal enquanto a trava era esperada
+                if journal.needs_compaction():
+                    compact()
+
+        await asyncio.get_running_loop().run_in_executor(None, run)
+
+    @property
+    def sessions(self) -> int:
+        return len(self._sessions)
+
+    def __repr__(self) -> str:
+        return f"Market_Server(contem {len(self._sessions)} sessões)"
@@ -0,0 +1,358 @@
+from __future__ import annotations
+import asyncio
+import json
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+from users import Abstract_User, Customer, Owner
+from orders import constants as order_status
+from money import parse_cents
+from pagination import Page, paginate
+from storage import Flusher
+
+if TYPE_CHECKING:
+    from storage import I_Journal, Market_Lock
+
+T = TypeVar("T")
+
+
+class Session:
+    def __init__(
+        self,
+        owner: Owner,
+        auth_data: Mapping[str, Abstract_User],
+        journal: "I_Journal | None" = None,
+        lock: "Market_Lock | None" = None,
+    ) -> None:
+        """
+        Sessão de um cliente conectado ao servidor.
+
+        Cada linha recebida é um comando, seguido de seus argumentos separados por espaços.
+        Cada resposta é uma linha JSON com as chaves "ok", "message" e "data".
+        Os comandos que alteram o mercado são os mesmos métodos de permissão
+        dos usuários, e só podem ser executados por usuários que os possuam.
+
+        Parameters
+        ----------
+        owner : Owner
+            Dono do mercado
+        auth_data : Mapping[str, Abstract_User]
+            Dados de autenticação de todos usuários
+        journal : I_Journal | None, optional
+            Journal onde a conversão de senhas deve ser anotada, by default None
+        lock : Market_Lock | None, optional
+            Trava adquirida enquanto os comandos acessam o mercado,
+            by default a trava do journal, caso ele seja um Flusher
+        """
+        self.__owner = owner
+        self.__auth_data = auth_data
+        self.__journal = journal
+        # Os comandos acessam o mercado com a trava do Flusher, que o copia para salvá-lo
+        if lock is None and isinstance(journal, Flusher):
+            lock = journal.lock
+        self.__lock = lock
+        self._user: Abstract_User | None = None
+        self._closed = False
+
+        self.__commands: dict[str, Callable[[list[str]], dict]] = {
+            "help": self._help,
+            "logout": self._logout,
+            "quit": self._quit,
+            "view_products": self._view_products,
+            "search_products": self._search_products,
+            "browse_by_price": self._browse_by_price,
+            "view_orders": self._view_orders,
+            "place_order": self._place_order,
+            "cancel_order": self._cancel_order,
+            "confirm_arrival": self._confirm_arrival,
+            "send_order": self._send_order,
+            "add_product": self._add_product,
+        }
+        # Comandos que não dependem das permissões do usuário
+        self.__public = {"help", "login", "logout", "quit"}
+
+    async def handle(self, line: str) -> str:
+        """
+        Executa um comando.
+        Somente o login espera, pela verificação da senha em outra thread,
+        os demais comandos são executados por completo sem ceder o loop de eventos,
+        a não ser que a trava do mercado esteja ocupada (veja __locked).
+
+        Parameters
+        ----------
+        line : str
+            Linha contendo o comando e seus argumentos
+
+        Returns
+        -------
+        str
+            Resposta em JSON, sem quebra de linha
+        """
+        words = line.split()
+        if len(words) < 1:
+            return self.__respond(False, "Comando vazio!")
+
+        name, args = words[0].lower(), words[1:]
+        if name == "login":
+            try:
+                return self.__respond(**await self._login(args))
+            except IndexError as e:
+                return self.__respond(False, f"Argumentos inválidos: {e}")
+
+        command = self.__commands.get(name)
+        if command is None:
+            return self.__respond(False, f"Comando desconhecido: {name}")
+
+        if name not in self.__public:
+            if self._user is None:
+                return self.__respond(False, "Faça login primeiro!")
+            if name not in self._user.get_permissions():
+                return self.__respond(False, "Permissão negada!")
+
+        try:
+            result = await self.__locked(command, args)
+            return self.__respond(**result)
+        except (ValueError, KeyError, IndexError) as e:
+            return self.__respond(False, f"Argumentos inválidos: {e}")
+
+    async def __locked(self, function: Callable[..., T], *args) -> T:
+        """
+        Executa uma função com a trava do mercado adquirida.
+        Caso a trava esteja livre, a função é executada no loop de eventos. Caso
+        contrário, a espera e a execução acontecem em outra thread, então as demais
+        sessões continuam sendo atendidas enquanto a database é copiada, substituída
+        ou compactada.
+        """
+        lock = self.__lock
+        if lock is None:
+            return function(*args)
+        if lock.acquire(blocking=False):
+            try:
+                return function(*args)
+            finally:
+                lock.release()
+
+        def run() -> T:
+            with lock:
+                return function(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+
+    @staticmethod
+    def __cursor(args: list[str]) -> tuple[int | None, int | None]:
+        """
+        Lê os argumentos [after <id> | before <id>] de uma listagem paginada.
+        """
+        if len(args) < 1:
+            return None, None
+        cursor = int(args[1])
+        if args[0].lower() == "after":
+            return cursor, None
+        if args[0].lower() == "before":
+            return None, cursor
+        raise ValueError(f"Cursor desconhecido: {args[0]}")
+
+    @staticmethod
+    def __respond(ok: bool, message: str = "", data: object = None) -> str:
+        return json.dumps({"ok": ok, "message": message, "data": data})
+
+    # - - - Comandos - - - #
+    def _help(self, args: list[str]) -> dict:
+        if self._user is None:
+            commands = sorted(self.__public)
+        else:
+            permissions = set(self._user.get_permissions())
+            commands = sorted(
+                self.__public | {name for name in self.__commands if name in permissions}
+            )
+        return {"ok": True, "message": "Comandos disponíveis", "data": commands}
+
+    async def _login(self, args: list[str]) -> dict:
+        name, password = args[0], args[1]
+        user = await self.__locked(self.__auth_data.get, name)
+        if user is None:
+            return {"ok": False, "message": "Nome incorreto."}
+
+        hasher = user.hasher
+        if not await hasher.verify_async(password, user.password):
+            return {"ok": False, "message": "Senha incorreta!"}
+
+        if hasher.needs_rehash(user.password):
+            stored = user.password
+            hashed = await hasher.hash_async(password)
+            # A senha pode ter sido convertida por outra sessão durante a espera
+            if user.password == stored:
+                await self.__locked(self.__rehash, user, hashed)
+
+        self._user = user
+        return {"ok": True, "message": "Login bem sucedido!"}
+
+    def __rehash(self, user: Abstract_User, hashed: str) -> None:
+        user.password = hashed
+        if self.__journal is not None:
+            self.__journal.record("change_password", id=user.id, password=hashed)
+
+    def _logout(self, args: list[str]) -> dict:
+        self._user = None
+        return {"ok": True, "message": "Logout realizado."}
+
+    def _quit(self, args: list[str]) -> dict:
+        self._closed = True
+        return {"ok": True, "message": "Até logo!"}
+
+    def _view_products(self, args: list[str]) -> dict:
+        """
+        Argumentos: [after <id> | before <id>], cursores de Page.next e Page.previous.
+        Responde uma página de page_size produtos, com os cursores das páginas vizinhas.
+        """
+        after, before = self.__cursor(args)
+        only_available = isinstance(self._user, Customer)
+        page = self.__owner.products.page_products(
+            after, before, Abstract_User.page_size, only_available=only_available
+        )
+        return {
+            "ok": True,
+            "data": {
+                "products": [self.__product_dict(product) for product in page.items],
+                "previous": page.previous,
+                "next": page.next,
+            },
+        }
+
+    def _search_products(self, args: list[str]) -> dict:
+        """
+        Argumentos: termos da busca.
+        """
+        if len(args) < 1:
+            return {"ok": False, "message": "Busca vazia!"}
+        only_available = isinstance(self._user, Customer)
+        market = self.__owner.products
+        products = market.search_products(" ".join(args), only_available=only_available)
+        return {"ok": True, "data": [self.__product_dict(product) for product in products]}
+
+    def _browse_by_price(self, args: list[str]) -> dict:
+        """
+        Argumentos: <preço mínimo> <preço máximo> [desc], em reais,
+        "-" para uma faixa sem limite.
+        """
+        min_price = None if args[0] == "-" else parse_cents(args[0])
+        max_price = None if args[1] == "-" else parse_cents(args[1])
+        descending = len(args) > 2 and args[2].lower() == "desc"
+        products = self.__owner.products.products_by_price(
+            min_price, max_price, descending, only_available=True
+        )
+        return {"ok": True, "data": [self.__product_dict(product) for product in products]}
+
+    def _view_orders(self, args: list[str]) -> dict:
+        """
+        Argumentos: [after <id> | before <id>], cursores de Page.next e Page.previous.
+        Responde uma página de page_size pedidos, com os cursores das páginas vizinhas.
+        """
+        after, before = self.__cursor(args)
+        if isinstance(self._user, Customer):
+            orders = {order.id: order for order in self._user.orders}
+            ids = paginate(sorted(orders), after, before, Abstract_User.page_size)
+            page = Page([orders[id] for id in ids.items], ids.previous, ids.next)
+        else:
+            page = self.__owner.orders.page_orders(after, before, Abstract_User.page_size)
+        return {
+            "ok": True,
+            "data": {
+                "orders": [self.__order_dict(order) for order in page.items],
+                "previous": page.previous,
+                "next": page.next,
+            },
+        }
+
+    def _place_order(self, args: list[str]) -> dict:
+        """
+        Argumentos: <id do produto>:<quantidade> para cada produto do pedido.
+        Todas as quantidades são reservadas de uma só vez, ou nenhuma é.
+        """
+        assert isinstance(self._user, Customer)
+        requested: list[tuple[int, int]] = []
+        for arg in args:
+            product_id, ammount = arg.split(":")
+            requested.append((int(product_id), int(ammount)))
+        if len(requested) < 1:
+            return {"ok": False, "message": "Não há produtos no pedido!"}
+
+        try:
+            items = self.__owner.products.retrieve_products(requested)
+        except ValueError as e:
+            return {"ok": False, "message": str(e)}
+        order = self.__owner.orders.place_order(self._user, items)
+        return {
+            "ok": True,
+            "message": "Pedido realizado com sucesso!",
+            "data": self.__order_dict(order),
+        }
+
+    def _cancel_order(self, args: list[str]) -> dict:
+        order_id = self.__own_order(int(args[0]))
+        if self.__owner.orders.cancel_order(order_id):
+            return {"ok": True, "message": "Pedido cancelado com sucesso!"}
+        return {"ok": False, "message": "Não foi possível cancelar o pedido!"}
+
+    def _confirm_arrival(self, args: list[str]) -> dict:
+        order_id = self.__own_order(int(args[0]))
+        orders = self.__owner.orders
+        orders.receive_order(order_id)
+        if orders.orders[order_id].status == order_status.finished:
+            return {"ok": True, "message": "Pedido recebido com sucesso!"}
+        return {"ok": False, "message": "Falha! Este pedido não foi enviado!"}
+
+    def _send_order(self, args: list[str]) -> dict:
+        order_id = int(args[0])
+        orders = self.__owner.orders
+        orders.send_order(order_id)
+        if orders.orders[order_id].status == order_status.sent:
+            return {"ok": True, "message": "Pedido enviado com sucesso!"}
+        return {"ok": False, "message": "Este pedido não pode ser enviado!"}
+
+    def _add_product(self, args: list[str]) -> dict:
+        """
+        Argumentos: <id do produto> <quantidade>, reabastece um produto existente.
+        """
+        product_id, ammount = int(args[0]), int(args[1])
+        self.__owner.products.add_product(product_id, ammount)
+        return {"ok": True, "message": "Operação realizada com sucesso!"}
+
+    # - - - Auxiliares - - - #
+    def __own_order(self, order_id: int) -> int:
+        """
+        Verifica se um pedido pertence ao cliente da sessão.
+
+        Raises
+        ------
+        KeyError
+            Caso o pedido não exista ou seja de outro cliente
+        """
+        assert self._user is not None
+        order = self.__owner.orders.orders[order_id]
+        if order.customer.id != self._user.id:
+            raise KeyError(order_id)
+        return order_id
+
+    def __product_dict(self, product) -> dict:
+        """
+        Descreve um produto. Clientes veem somente a quantidade disponível,
+        descontadas as reservas dos carrinhos, e o dono vê o estoque.
+        """
+        if isinstance(self._user, Customer):
+            return product.line_item(self.__owner.products.available(product.id)).to_dict()
+        return product.line_item().to_dict()
+
+    @staticmethod
+    def __order_dict(order) -> dict:
+        data = order.to_dict()
+        data["price_cents"] = order.price
+        return data
+
+    @property
+    def user(self) -> Abstract_User | None:
+        return self._user
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
@@ -1,9 +1,10 @@
 import os
 import json
 
-from users import Owner
+from users import Abstract_User, Owner
 from products import Product_Manager
 from orders import Order_Manager
+from storage import catalogue_filename, customers_filename, orders_filename
 
 import constants as C
 import functions as F
@@ -12,8 +13,11 @@ import functions as F
 def setup() -> None:
     if os.path.exists(C.database):
         print("Uma database já existe! Abortando setup.")
+        migrate()
         return
 
+    F.configure_passwords()
+
     # Recbe o nome
     while True:
         print("Insira o nome do admin:")
@@ -48,7 +52,7 @@ def setup() -> None:
             owner = Owner(
                 0,
                 name,
-                password,
+                Abstract_User.hasher.hash(password),
             )
             print("Cadastro realizado com sucesso!\n")
             break
@@ -58,8 +62,42 @@ def setup() -> None:
         else:
             print("Opção inválida.")
 
+    # Arquivos que acompanhavam uma database removida não pertencem à nova
+    customers = customers_filename(C.database)
+    for filename in (
+        customers,
+        customers + ".idx",
+        orders_filename(C.database),
+        catalogue_filename(C.database),
+    ):
+        if os.path.exists(filename):
+            os.remove(filename)
+
     F.save_data(owner, {}, Product_Manager(owner), Order_Manager(owner), C.database)
 
+    # Um journal antigo não pertence à nova database
+    if os.path.exists(C.journal):
+        os.remove(C.journal)
+
+
+def migrate() -> None:
+    """
+    Oferece a conversão das senhas em texto puro de uma database existente.
+    """
+    while True:
+        print("Converter as senhas em texto puro em hashes? [s/n]")
+        yes_no = input(">> ")
+        if yes_no == "s":
+            owner, customers, market, orders, journal = F.open_market(C.storage)
+            migrated = F.migrate_passwords(owner, customers, journal)
+            F.close_market(owner, customers, market, orders, journal)
+            print(f"{migrated} senhas convertidas com sucesso!\n")
+            return
+        elif yes_no == "n":
+            return
+        else:
+            print("Opção inválida.")
+
 
 if __name__ == "__main__":
     setup()
@@ -0,0 +1,24 @@
+from storage.interfaces import (
+    I_Journal,
+    I_Order_Source,
+    I_Customer_Source,
+    I_Repository,
+)
+from storage.journal import Journal
+from storage.atomic_file import Pending_Files, replace_file, sync_directory
+from storage.sqlite_repository import SQLite_Repository
+from storage.mappings import (
+    Repository_Products,
+    Catalogue_Products,
+    Repository_Customers,
+    Repository_Orders,
+    Repository_Auth_Data,
+    Frozen_Records,
+    Lazy_Order_List,
+    to_record,
+)
+from storage.order_file import Order_File, orders_filename, write_orders
+from storage.user_file import User_File, customers_filename, write_customers
+from storage.catalogue_file import Catalogue_File, catalogue_filename, write_catalogue
+from storage.snapshot_file import Snapshot_File, is_snapshot, write_snapshot
+from storage.flusher import Flusher, Market_Lock, SECTIONS
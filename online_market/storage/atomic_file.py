@@ -0,0 +1,133 @@
+from __future__ import annotations
+import os
+from typing import Iterable
+
+
+def sync_directory(directory: str) -> None:
+    """
+    Sincroniza um diretório com o disco, para que a substituição de um arquivo
+    também sobreviva a uma queda do sistema.
+    Diretórios não podem ser sincronizados no Windows, onde a substituição já é durável.
+
+    Parameters
+    ----------
+    directory : str
+        Caminho do diretório
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Pending_Files:
+    def __init__(self) -> None:
+        """
+        Arquivos já escritos que ainda precisam ser sincronizados com o disco e,
+        no caso dos temporários, substituir seus destinos.
+
+        A escrita é dividida em três etapas: os arquivos são escritos, depois
+        sincronizados (fsync), a etapa mais lenta, e por fim os temporários substituem
+        seus destinos com os.replace, de uma vez. Assim a sincronização pode acontecer
+        sem bloquear quem altera os dados, e um destino nunca fica escrito pela metade:
+        uma queda antes da substituição mantém o arquivo anterior completo.
+        """
+        self._files: list[tuple[str, str | None, list]] = []
+
+    def add(self, filename: str, target: str | None = None, sources: Iterable = ()) -> None:
+        """
+        Adiciona um arquivo já escrito e fechado.
+
+        Parameters
+        ----------
+        filename : str
+            Caminho do arquivo
+        target : str | None, optional
+            Destino substituído pelo arquivo, None caso o próprio arquivo seja o destino,
+            como um arquivo de registros anexados, by default None
+        sources : Iterable, optional
+            Arquivos abertos sobre o destino, com close e reload, que são fechados
+            antes da substituição e reabertos depois, by default ()
+        """
+        self._files.append((filename, target, list(sources)))
+
+    def sync(self) -> None:
+        """
+        Sincroniza o conteúdo de todos os arquivos com o disco.
+        """
+        for filename, _, _ in self._files:
+            # No Windows o fsync exige um arquivo aberto para escrita
+            with open(filename, "r+b") as file:
+                os.fsync(file.fileno())
+
+    def commit(self) -> None:
+        """
+        Substitui os destinos pelos temporários, na ordem em que foram adicionados,
+        e sincroniza os diretórios alterados.
+        """
+        directories = []
+        for filename, target, sources in self._files:
+            if target is None:
+                continue
+            # Um arquivo aberto não pode ser substituído em todos os sistemas
+            for source in sources:
+                source.close()
+            os.replace(filename, target)
+            for source in sources:
+                source.reload()
+            directory = os.path.dirname(os.path.abspath(target))
+            if directory not in directories:
+                directories.append(directory)
+        self._files = []
+
+        for directory in directories:
+            sync_directory(directory)
+
+    def discard(self) -> None:
+        """
+        Remove os temporários que não serão mais usados.
+        """
+        for filename, target, _ in self._files:
+            if target is not None and os.path.exists(filename):
+                os.remove(filename)
+        self._files = []
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __repr__(self) -> str:
+        return f"Pending_Files(contem {len(self._files)} arquivos)"
+
+
+def replace_file(
+    temp_filename: str,
+    filename: str,
+    sources: Iterable = (),
+    pending: Pending_Files | None = None,
+) -> None:
+    """
+    Substitui um arquivo por um temporário já escrito, após sincronizá-lo com o disco.
+
+    Parameters
+    ----------
+    temp_filename : str
+        Caminho do temporário
+    filename : str
+        Caminho do destino
+    sources : Iterable, optional
+        Arquivos abertos sobre o destino, reabertos após a substituição, by default ()
+    pending : Pending_Files | None, optional
+        Caso fornecido, a sincronização e a substituição são adiadas até seu commit,
+        by default None
+    """
+    if pending is not None:
+        pending.add(temp_filename, filename, sources)
+        return
+
+    files = Pending_Files()
+    files.add(temp_filename, filename, sources)
+    files.sync()
+    files.commit()
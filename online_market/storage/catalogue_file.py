@@ -0,0 +1,301 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+import mmap
+import os
+import struct
+import sys
+from typing import TYPE_CHECKING, Iterator, Mapping
+
+from storage.mappings import to_record
+from storage.atomic_file import Pending_Files, replace_file
+from money import read_price
+
+if TYPE_CHECKING:
+    from products import Product
+
+
+MAGIC = b"OMCT"
+VERSION = 1
+
+# Cabeçalho: assinatura, versão e quantidade de produtos
+HEADER = struct.Struct("<4sIQ")
+# Registro de um produto: id do dono, preço em centavos, quantidade e tamanho do nome,
+# seguido do nome em UTF-8
+RECORD = struct.Struct("<qqqI")
+
+# Produto em uma linha: id, id do dono, nome, preço em centavos e quantidade
+Product_Row = tuple[int, int, str, int, int]
+
+
+class Catalogue_File:
+    def __init__(self, filename: str) -> None:
+        """
+        Catálogo de produtos somente leitura, mapeado na memória.
+
+        Após o cabeçalho, o arquivo guarda o índice id -> posição, em duas colunas
+        de inteiros de 64 bits ordenadas pelo Id, seguido dos registros dos produtos.
+        Um produto é lido buscando seu Id no índice e desempacotando o registro
+        diretamente das páginas mapeadas: abrir o catálogo não lê nenhum produto, e
+        processos que abrem o mesmo arquivo compartilham as mesmas páginas físicas.
+
+        Parameters
+        ----------
+        filename : str
+            Caminho do arquivo
+
+        Raises
+        ------
+        ValueError
+            Caso o arquivo não seja um catálogo ou tenha uma versão desconhecida
+        """
+        self.__filename = filename
+        self.__file = None
+        self.__map: mmap.mmap | None = None
+        self.__views: list[memoryview] = []
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Mapeia novamente o arquivo, após ele ter sido substituído.
+        """
+        self.close()
+        self.__file = open(self.__filename, "rb")
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"O arquivo {self.__filename} não é um catálogo!")
+        if version != VERSION:
+            raise ValueError(f"Versão de catálogo desconhecida: {version}")
+
+        self._ids = self.__column(HEADER.size, count)
+        self._offsets = self.__column(HEADER.size + 8 * count, count)
+
+    def __column(self, offset: int, rows: int):
+        """
+        Obtem uma coluna do índice, como memoryview sobre o arquivo mapeado.
+        """
+        assert self.__map is not None
+        size = rows * 8
+        if sys.byteorder == "little":
+            view = memoryview(self.__map)[offset : offset + size].cast("q")
+            self.__views.append(view)
+            return view
+        column = array("q", self.__map[offset : offset + size])
+        column.byteswap()
+        return column
+
+    def __find(self, product_id: int) -> int | None:
+        """
+        Busca a posição de um Id no índice.
+        """
+        ids = self._ids
+        # Ids sem lacunas ficam na posição de mesmo número
+        if 0 <= product_id < len(ids) and ids[product_id] == product_id:
+            return product_id
+        i = bisect_left(ids, product_id)
+        return i if i < len(ids) and ids[i] == product_id else None
+
+    def __row(self, i: int) -> Product_Row:
+        """
+        Desempacota o registro do produto em uma posição do índice.
+        """
+        assert self.__map is not None
+        offset = self._offsets[i]
+        owner_id, price, quantity, size = RECORD.unpack_from(self.__map, offset)
+        start = offset + RECORD.size
+        name = self.__map[start : start + size].decode("utf-8")
+        return self._ids[i], owner_id, name, price, quantity
+
+    def __record(self, i: int) -> dict:
+        id, owner_id, name, price, quantity = self.__row(i)
+        return {
+            "id": id,
+            "owner_id": owner_id,
+            "name": name,
+            "price_cents": price,
+            "quantity": quantity,
+        }
+
+    def product_row(self, product_id: int) -> Product_Row | None:
+        """
+        Obtem um produto em uma tupla, sem montar seu dicionário.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        Product_Row | None
+            Id, id do dono, nome, preço em centavos e quantidade, None caso não exista
+        """
+        i = self.__find(product_id)
+        return self.__row(i) if i is not None else None
+
+    def get_product(self, product_id: int) -> dict | None:
+        """
+        Obtem um produto.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        dict | None
+            Dicionário do produto, None caso não exista
+        """
+        i = self.__find(product_id)
+        return self.__record(i) if i is not None else None
+
+    def raw_record(self, product_id: int) -> bytes:
+        """
+        Obtem o registro de um produto sem desempacotá-lo.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        bytes
+            Registro, com o nome
+
+        Raises
+        ------
+        KeyError
+            Caso o produto não exista
+        """
+        assert self.__map is not None
+        i = self.__find(product_id)
+        if i is None:
+            raise KeyError(product_id)
+        offset = self._offsets[i]
+        size = RECORD.unpack_from(self.__map, offset)[3]
+        return self.__map[offset : offset + RECORD.size + size]
+
+    def has_product(self, product_id: int) -> bool:
+        return self.__find(product_id) is not None
+
+    def product_ids(self) -> Iterator[int]:
+        """
+        Percorre os Ids dos produtos em ordem crescente.
+
+        Yields
+        ------
+        int
+            Id do produto
+        """
+        return iter(self._ids.tolist())
+
+    def count_products(self) -> int:
+        return len(self._ids)
+
+    def records(self) -> list[dict]:
+        """
+        Lê todos os produtos, ordenados pelo Id.
+
+        Returns
+        -------
+        list[dict]
+            Dicionários dos produtos
+        """
+        return [self.__record(i) for i in range(len(self._ids))]
+
+    def close(self) -> None:
+        # As views precisam ser liberadas antes do mapeamento ser fechado
+        for view in self.__views:
+            view.release()
+        self.__views = []
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    def __repr__(self) -> str:
+        return f"Catalogue_File(filename={self.__filename}, contem {self.count_products()} produtos)"
+
+
+def catalogue_filename(filename: str) -> str:
+    """
+    Obtem o caminho do catálogo de produtos que acompanha uma database.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho da database
+
+    Returns
+    -------
+    str
+        Caminho do catálogo
+    """
+    return os.path.splitext(filename)[0] + ".catalogue"
+
+
+def write_catalogue(
+    filename: str, products: Mapping[int, "Product"], pending: Pending_Files | None = None
+) -> None:
+    """
+    Escreve o catálogo de produtos em um arquivo temporário e o substitui de uma vez,
+    então processos que já mapearam o catálogo anterior continuam lendo uma versão
+    completa até o reabrirem.
+    Produtos de um Catalogue_Products ou Frozen_Records sobre o mesmo arquivo que
+    não foram carregados são copiados do catálogo atual sem serem montados.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho do catálogo
+    products : Mapping[int, Product]
+        Produtos, ou seus registros
+    pending : Pending_Files | None, optional
+        Caso fornecido, a sincronização e a substituição são adiadas até seu commit,
+        by default None
+    """
+    source = getattr(products, "source", None)
+    if not isinstance(source, Catalogue_File):
+        source = None
+    elif os.path.abspath(source.filename) != os.path.abspath(filename):
+        source = None
+
+    ids = sorted(products)
+    offsets = array("q")
+    records = bytearray()
+    start = HEADER.size + 16 * len(ids)
+    for product_id in ids:
+        offsets.append(start + len(records))
+        if source is not None and not products.is_loaded(product_id):
+            records += source.raw_record(product_id)
+            continue
+        product = to_record(products[product_id])
+        name = product["name"].encode("utf-8")
+        records += RECORD.pack(
+            product["owner_id"], read_price(product), product["quantity"], len(name)
+        )
+        records += name
+
+    columns = array("q", ids)
+    if sys.byteorder != "little":
+        columns.byteswap()
+        offsets.byteswap()
+
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(ids)))
+        columns.tofile(file)
+        offsets.tofile(file)
+        file.write(records)
+
+    replace_file(temp_filename, filename, [source] if source is not None else [], pending)
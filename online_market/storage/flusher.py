@@ -0,0 +1,233 @@
+from __future__ import annotations
+from contextlib import contextmanager
+import threading
+from typing import Callable, Iterator
+
+from storage.interfaces import I_Journal
+from storage.atomic_file import Pending_Files
+
+
+# Seções da database, salvas em arquivos separados
+SECTIONS = ("products", "customers", "orders")
+
+# Seção alterada por cada operação registrada
+OPERATIONS = {
+    "register_product": "products",
+    "add_product": "products",
+    "remove_product": "products",
+    "delete_product": "products",
+    "import_products": "products",
+    "place_order": "orders",
+    "cancel_order": "orders",
+    "send_order": "orders",
+    "receive_order": "orders",
+    "register": "customers",
+    "change_password": "customers",
+}
+
+
+class Market_Lock:
+    def __init__(self) -> None:
+        """
+        Trava reentrante do mercado.
+        Quem a possui pode liberá-la temporariamente, por completo, enquanto espera
+        por algo que não acessa o mercado, como a entrada do usuário.
+        """
+        self.__lock = threading.RLock()
+        self.__owner: int | None = None
+        self.__depth = 0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self.__lock.acquire(blocking, timeout):
+            return False
+        self.__owner = threading.get_ident()
+        self.__depth += 1
+        return True
+
+    def release(self) -> None:
+        self.__depth -= 1
+        if self.__depth == 0:
+            self.__owner = None
+        self.__lock.release()
+
+    def __enter__(self) -> Market_Lock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    @contextmanager
+    def released(self) -> Iterator[None]:
+        """
+        Libera a trava durante o bloco, caso a thread atual a possua,
+        e a adquire novamente ao final, com a mesma profundidade.
+        """
+        if self.__owner != threading.get_ident():
+            yield
+            return
+
+        depth = self.__depth
+        for _ in range(depth):
+            self.release()
+        try:
+            yield
+        finally:
+            for _ in range(depth):
+                self.acquire()
+
+    def __repr__(self) -> str:
+        return f"Market_Lock(adquirida={self.__owner is not None})"
+
+
+class Flusher(I_Journal):
+    def __init__(
+        self,
+        prepare: Callable[[set[str], Pending_Files], Callable[[], None]],
+        interval: float = 5.0,
+        mutations: int = 100,
+    ) -> None:
+        """
+        Salva periodicamente a database em uma thread separada.
+
+        Recebe as mesmas mutações que um journal e marca como alteradas as seções
+        que elas afetam. A thread salva somente as seções alteradas a cada intervalo,
+        ou antes, quando a quantidade de mutações é atingida. A primeira gravação
+        salva todas as seções, pois a database pode estar em um formato antigo.
+
+        Quem acessa o mercado deve adquirir a trava do Flusher, como o loop do run.py
+        e o servidor fazem. Com a trava adquirida, a gravação somente copia o estado
+        a ser salvo e, ao final, substitui os arquivos; a escrita dos temporários e a
+        sincronização com o disco acontecem sem ela, sobre a cópia.
+
+        Parameters
+        ----------
+        prepare : Callable[[set[str], Pending_Files], Callable[[], None]]
+            Copia as seções fornecidas e retorna a função que as escreve,
+            adiando a substituição dos arquivos
+        interval : float, optional
+            Intervalo entre as gravações, em segundos, by default 5.0
+        mutations : int, optional
+            Quantidade de mutações que antecipa a gravação, by default 100
+        """
+        self.__prepare = prepare
+        self._interval = interval
+        self._mutations = mutations
+
+        self._dirty: set[str] = set(SECTIONS)
+        self._count = 0
+        self._flushes = 0
+        # Protege as seções alteradas, registradas por quem altera o mercado
+        self.__dirty_lock = threading.Lock()
+        # Adquirida enquanto o mercado é acessado, copiado ou tem seus arquivos substituídos
+        self.__lock = Market_Lock()
+        # Uma gravação por vez, da thread ou do fechamento
+        self.__flush_lock = threading.Lock()
+
+        self.__wake = threading.Event()
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__run, name="Flusher", daemon=True)
+        self.__thread.start()
+
+    def record(self, operation: str, **data) -> None:
+        """
+        Marca como alterada a seção afetada por uma mutação.
+        Operações desconhecidas marcam todas as seções.
+
+        Parameters
+        ----------
+        operation : str
+            Nome da operação
+        """
+        with self.__dirty_lock:
+            section = OPERATIONS.get(operation)
+            if section is not None:
+                self._dirty.add(section)
+            else:
+                self._dirty.update(SECTIONS)
+            self._count += 1
+            if self._count >= self._mutations:
+                self.__wake.set()
+
+    def needs_compaction(self) -> bool:
+        # As gravações são feitas pela thread, sem depender do loop
+        return False
+
+    def __run(self) -> None:
+        while True:
+            self.__wake.wait(self._interval if self._interval > 0 else None)
+            self.__wake.clear()
+            if self.__closed:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                # As seções continuam marcadas e são salvas na próxima tentativa
+                print(f"Um erro ocorreu enquanto salvando a database: {e}")
+
+    def flush(self, full: bool = False) -> bool:
+        """
+        Salva as seções alteradas desde a última gravação.
+        Os dados são copiados sob a trava e escritos fora dela; mutações feitas
+        durante a escrita marcam suas seções novamente, e são salvas na próxima gravação.
+
+        Parameters
+        ----------
+        full : bool, optional
+            Se todas as seções devem ser salvas, mesmo sem mutações, by default False
+
+        Returns
+        -------
+        bool
+            Se algo foi salvo
+        """
+        with self.__flush_lock:
+            with self.__dirty_lock:
+                if self._count == 0 and not full:
+                    return False
+                sections = set(SECTIONS) if full else self._dirty
+                self._dirty = set()
+                self._count = 0
+
+            pending = Pending_Files()
+            try:
+                with self.__lock:
+                    write = self.__prepare(sections, pending)
+                write()
+                pending.sync()
+                with self.__lock:
+                    pending.commit()
+            except BaseException:
+                pending.discard()
+                with self.__dirty_lock:
+                    self._dirty.update(sections)
+                    self._count += 1
+                raise
+            self._flushes += 1
+            return True
+
+    def close(self) -> None:
+        """
+        Encerra a thread e salva todas as seções uma última vez.
+        """
+        self.__closed = True
+        self.__wake.set()
+        self.__thread.join()
+        try:
+            self.flush(full=True)
+        except Exception as e:
+            print(f"Um erro ocorreu enquanto salvando a database: {e}")
+
+    @property
+    def lock(self) -> Market_Lock:
+        return self.__lock
+
+    @property
+    def flushes(self) -> int:
+        return self._flushes
+
+    def __repr__(self) -> str:
+        return (
+            f"Flusher(intervalo={self._interval}s, mutações={self._mutations}, "
+            f"contem {self._count} mutações não salvas)"
+        )
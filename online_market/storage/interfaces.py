@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+
+class I_Journal(ABC):
+    @abstractmethod
+    def record(self, operation: str, **data) -> None:
+        pass
+
+    @abstractmethod
+    def needs_compaction(self) -> bool:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class I_Order_Source(ABC):
+    @abstractmethod
+    def get_order(self, order_id: int) -> dict | None:
+        pass
+
+    @abstractmethod
+    def has_order(self, order_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def order_ids(self) -> Iterator[int]:
+        pass
+
+    @abstractmethod
+    def order_ids_by_customer(self, customer_id: int) -> list[int]:
+        pass
+
+    @abstractmethod
+    def count_orders(self) -> int:
+        pass
+
+    @abstractmethod
+    def summaries(self) -> Iterator[tuple[int, int, str, list[int]]]:
+        pass
+
+
+class I_Customer_Source(ABC):
+    @abstractmethod
+    def get_customer(self, customer_id: int) -> dict | None:
+        pass
+
+    @abstractmethod
+    def find_customer(self, name: str) -> dict | None:
+        pass
+
+    @abstractmethod
+    def customer_ids(self) -> Iterator[int]:
+        pass
+
+    @abstractmethod
+    def count_customers(self) -> int:
+        pass
+
+    @abstractmethod
+    def last_customer_id(self) -> int:
+        pass
+
+
+class I_Repository(I_Journal, I_Order_Source, I_Customer_Source):
+    @abstractmethod
+    def load_owner(self) -> dict:
+        pass
+
+    @abstractmethod
+    def get_product(self, product_id: int) -> dict | None:
+        pass
+
+    @abstractmethod
+    def find_products(self, name: str) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def product_ids(self) -> Iterator[int]:
+        pass
+
+    @abstractmethod
+    def count_products(self) -> int:
+        pass
+
+    @abstractmethod
+    def last_product_id(self) -> int:
+        pass
+
+    @abstractmethod
+    def order_ids_by_status(self, status: str) -> list[int]:
+        pass
+
+    @abstractmethod
+    def last_order_id(self) -> int:
+        pass
+
+    @abstractmethod
+    def import_data(self, data: dict) -> None:
+        pass
@@ -0,0 +1,160 @@
+from __future__ import annotations
+import json
+import os
+import threading
+from typing import Iterator
+
+from storage.interfaces import I_Journal
+from storage.atomic_file import sync_directory
+
+
+class Journal(I_Journal):
+    def __init__(self, filename: str, compaction_threshold: int = 1000) -> None:
+        """
+        Log de escrita antecipada (write-ahead log) das mutações do mercado.
+
+        Cada mutação é anexada ao final do arquivo como um registro JSON compacto
+        em uma única linha, e sincronizada com o disco antes de record retornar.
+        Os registros possuem um número de sequência crescente, permitindo que
+        registros já incorporados a um snapshot sejam ignorados.
+
+        Parameters
+        ----------
+        filename : str
+            Caminho do arquivo do log
+        compaction_threshold : int, optional
+            Quantidade de registros a partir da qual o log deve ser compactado,
+            by default 1000
+        """
+        self.__filename = filename
+        self._compaction_threshold = compaction_threshold
+        self._seq = 0
+        self._records = 0
+        # Registros de threads diferentes não podem se misturar nem repetir a sequência
+        self.__lock = threading.Lock()
+
+        created = not os.path.exists(self.__filename)
+        self.__recover()
+        self.__file = open(self.__filename, "a", encoding="utf-8")
+        if created:
+            # A entrada do novo arquivo no diretório também precisa sobreviver a uma queda
+            sync_directory(os.path.dirname(os.path.abspath(self.__filename)))
+
+    def __recover(self) -> None:
+        """
+        Lê o log existente para descobrir o último número de sequência.
+        Um registro incompleto no final do arquivo (escrita interrompida) é descartado.
+        """
+        if not os.path.exists(self.__filename):
+            return
+
+        valid_size = 0
+        with open(self.__filename, "rb") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                valid_size += len(line)
+                self._seq = max(self._seq, record["seq"])
+                self._records += 1
+
+        if valid_size < os.path.getsize(self.__filename):
+            with open(self.__filename, "r+b") as file:
+                file.truncate(valid_size)
+                os.fsync(file.fileno())
+
+    def record(self, operation: str, **data) -> None:
+        """
+        Anexa uma mutação ao log.
+
+        Parameters
+        ----------
+        operation : str
+            Nome da operação
+        **data
+            Dados necessários para refazer a operação
+        """
+        with self.__lock:
+            self._seq += 1
+            self._records += 1
+            entry = {"seq": self._seq, "op": operation}
+            entry.update(data)
+            self.__file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self.__sync()
+
+    def __sync(self) -> None:
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def replay(self, after: int = 0) -> Iterator[dict]:
+        """
+        Percorre os registros do log em ordem.
+
+        Parameters
+        ----------
+        after : int, optional
+            Ignora registros com sequência menor ou igual a este valor, by default 0
+
+        Yields
+        ------
+        dict
+            Registro
+        """
+        self.__file.flush()
+        with open(self.__filename, "r", encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                if record["seq"] > after:
+                    yield record
+
+    def resume(self, seq: int) -> None:
+        """
+        Garante que os próximos registros tenham sequência maior que a de um snapshot.
+
+        Parameters
+        ----------
+        seq : int
+            Última sequência incorporada ao snapshot
+        """
+        self._seq = max(self._seq, seq)
+
+    def needs_compaction(self) -> bool:
+        """
+        Verifica se o log cresceu o suficiente para ser compactado em um snapshot.
+
+        Returns
+        -------
+        bool
+            Se o log deve ser compactado
+        """
+        return self._records >= self._compaction_threshold
+
+    def clear(self) -> None:
+        """
+        Descarta todos os registros do log, mantendo o número de sequência.
+        Deve ser chamado somente após os registros serem salvos em um snapshot.
+        """
+        with self.__lock:
+            self.__file.truncate(0)
+            self.__sync()
+            self._records = 0
+
+    def close(self) -> None:
+        self.__file.close()
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def __len__(self) -> int:
+        return self._records
+
+    def __repr__(self) -> str:
+        return f"Journal(filename={self.__filename}, seq={self._seq}, contem {self._records} registros)"
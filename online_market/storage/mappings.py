@@ -0,0 +1,581 @@
+from __future__ import annotations
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import TYPE_CHECKING, Iterator
+
+from storage.interfaces import I_Repository, I_Order_Source, I_Customer_Source
+from users import Abstract_User, Customer, Owner
+from products import Product
+from orders import Order
+
+if TYPE_CHECKING:
+    from storage.catalogue_file import Catalogue_File
+
+
+class Repository_Products(MutableMapping):
+    def __init__(self, repository: I_Repository, owner: Owner) -> None:
+        """
+        Dicionário de produtos consultado sob demanda em um repositório.
+        Produtos consultados são mantidos em memória para que suas alterações
+        sejam vistas pelas consultas seguintes.
+
+        Parameters
+        ----------
+        repository : I_Repository
+            Repositório
+        owner : Owner
+            Dono
+        """
+        self.__repository = repository
+        self.__owner = owner
+        self._cache: dict[int, Product] = {}
+
+    def __getitem__(self, product_id: int) -> Product:
+        if product_id not in self._cache:
+            data = self.__repository.get_product(product_id)
+            if data is None:
+                raise KeyError(product_id)
+            self._cache[product_id] = Product.from_dict(data, self.__owner)
+        return self._cache[product_id]
+
+    def __setitem__(self, product_id: int, product: Product) -> None:
+        self._cache[product_id] = product
+
+    def __delitem__(self, product_id: int) -> None:
+        if product_id not in self:
+            raise KeyError(product_id)
+        self._cache.pop(product_id, None)
+
+    def __contains__(self, product_id: object) -> bool:
+        if product_id in self._cache:
+            return True
+        return isinstance(product_id, int) and (
+            self.__repository.get_product(product_id) is not None
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        return self.__repository.product_ids()
+
+    def __len__(self) -> int:
+        return self.__repository.count_products()
+
+
+class Catalogue_Products(MutableMapping):
+    def __init__(self, catalogue: "Catalogue_File", owner: Owner) -> None:
+        """
+        Dicionário de produtos lidos sob demanda de um catálogo mapeado na memória.
+        Produtos obtidos para serem alterados são mantidos em memória, junto com os
+        produtos novos e os removidos, até o catálogo ser escrito novamente; as
+        leituras dos demais produtos são feitas sobre as páginas compartilhadas.
+
+        Parameters
+        ----------
+        catalogue : Catalogue_File
+            Catálogo
+        owner : Owner
+            Dono
+        """
+        self.__catalogue = catalogue
+        self.__owner = owner
+        self._cache: dict[int, Product] = {}
+        self._deleted: set[int] = set()
+
+    def is_loaded(self, product_id: int) -> bool:
+        """
+        Verifica se um produto já foi carregado para a memória.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        bool
+            Se o produto está em memória
+        """
+        return product_id in self._cache
+
+    def peek(self, product_id: int) -> Product:
+        """
+        Obtem um produto para leitura, sem mantê-lo em memória.
+        Alterações no produto retornado só são vistas caso ele já estivesse carregado.
+
+        Parameters
+        ----------
+        product_id : int
+            Id do produto
+
+        Returns
+        -------
+        Product
+            Produto
+
+        Raises
+        ------
+        KeyError
+            Caso o produto não exista
+        """
+        product = self._cache.get(product_id)
+        if product is not None:
+            return product
+        row = None if product_id in self._deleted else self.__catalogue.product_row(product_id)
+        if row is None:
+            raise KeyError(product_id)
+        id, owner_id, name, price, quantity = row
+        if owner_id != self.__owner.id:
+            raise ValueError(
+                f"Dono inválido! Esperado dono com id: {owner_id}, recebeu id: {self.__owner.id}"
+            )
+        return Product(id, name, price, quantity, self.__owner)
+
+    def __getitem__(self, product_id: int) -> Product:
+        if product_id not in self._cache:
+            self._cache[product_id] = self.peek(product_id)
+        return self._cache[product_id]
+
+    def __setitem__(self, product_id: int, product: Product) -> None:
+        self._deleted.discard(product_id)
+        self._cache[product_id] = product
+
+    def __delitem__(self, product_id: int) -> None:
+        if product_id not in self:
+            raise KeyError(product_id)
+        self._cache.pop(product_id, None)
+        if self.__catalogue.has_product(product_id):
+            self._deleted.add(product_id)
+
+    def __contains__(self, product_id: object) -> bool:
+        if product_id in self._cache:
+            return True
+        return (
+            isinstance(product_id, int)
+            and product_id not in self._deleted
+            and self.__catalogue.has_product(product_id)
+        )
+
+    def __new(self) -> list[int]:
+        return [id for id in self._cache if not self.__catalogue.has_product(id)]
+
+    def __iter__(self) -> Iterator[int]:
+        for id in self.__catalogue.product_ids():
+            if id not in self._deleted:
+                yield id
+        yield from self.__new()
+
+    def __len__(self) -> int:
+        # Ids removidos continuam marcados após o catálogo ser escrito sem eles
+        deleted = [id for id in self._deleted if self.__catalogue.has_product(id)]
+        return self.__catalogue.count_products() - len(deleted) + len(self.__new())
+
+    def copy(self) -> Catalogue_Products:
+        """
+        Copia o dicionário, compartilhando o catálogo e os produtos carregados.
+        Produtos carregados, adicionados ou removidos depois não alteram a cópia.
+
+        Returns
+        -------
+        Catalogue_Products
+            Cópia
+        """
+        products = Catalogue_Products(self.__catalogue, self.__owner)
+        products._cache = dict(self._cache)
+        products._deleted = set(self._deleted)
+        return products
+
+    @property
+    def source(self) -> "Catalogue_File":
+        return self.__catalogue
+
+
+class Repository_Customers(MutableMapping):
+    def __init__(self, source: I_Customer_Source, order_source: I_Order_Source) -> None:
+        """
+        Dicionário de clientes consultado sob demanda em um repositório ou arquivo.
+        Os pedidos de cada cliente só são carregados quando acessados.
+
+        Parameters
+        ----------
+        source : I_Customer_Source
+            Origem dos clientes
+        order_source : I_Order_Source
+            Origem dos pedidos dos clientes
+        """
+        self.__source = source
+        self.__order_source = order_source
+        self._cache: dict[int, Customer] = {}
+        self._by_name: dict[str, Customer] = {}
+        self._new: list[int] = []
+        self.orders: Repository_Orders
+
+    def find(self, name: str) -> Customer | None:
+        """
+        Busca um cliente pelo nome.
+        Somente o cliente encontrado é carregado.
+
+        Parameters
+        ----------
+        name : str
+            Nome do cliente
+
+        Returns
+        -------
+        Customer | None
+            Cliente, None caso não exista
+        """
+        customer = self._by_name.get(name)
+        if customer is not None:
+            return customer
+
+        data = self.__source.find_customer(name)
+        return self[data["id"]] if data is not None else None
+
+    def next_id(self) -> int:
+        """
+        Obtem o Id que deve ser usado pelo próximo cliente registrado.
+
+        Returns
+        -------
+        int
+            Id livre
+        """
+        return max(self.__source.last_customer_id(), max(self._cache, default=0)) + 1
+
+    def loaded(self) -> Iterator[Customer]:
+        """
+        Percorre os clientes já carregados para a memória, incluindo os novos.
+
+        Yields
+        ------
+        Customer
+            Cliente
+        """
+        yield from list(self._cache.values())
+
+    def __cache(self, customer: Customer) -> None:
+        self._cache[customer.id] = customer
+        self._by_name[customer.name] = customer
+
+    def __getitem__(self, customer_id: int) -> Customer:
+        if customer_id not in self._cache:
+            data = self.__source.get_customer(customer_id)
+            if data is None:
+                raise KeyError(customer_id)
+            customer = Customer.from_dict(data)
+            customer.orders = Lazy_Order_List(
+                self.orders, self.__order_source.order_ids_by_customer(customer_id)
+            )
+            self.__cache(customer)
+        return self._cache[customer_id]
+
+    def __setitem__(self, customer_id: int, customer: Customer) -> None:
+        other = self.find(customer.name)
+        if other is not None and other.id != customer_id:
+            raise ValueError(f"Nome já cadastrado: {customer.name}")
+
+        if customer_id not in self._cache and self.__source.get_customer(customer_id) is None:
+            self._new.append(customer_id)
+        customer.orders = Lazy_Order_List(self.orders, [])
+        self.__cache(customer)
+
+    def __delitem__(self, customer_id: int) -> None:
+        raise TypeError("Clientes não podem ser removidos!")
+
+    def __contains__(self, customer_id: object) -> bool:
+        if customer_id in self._cache:
+            return True
+        return isinstance(customer_id, int) and (
+            self.__source.get_customer(customer_id) is not None
+        )
+
+    def __unsaved(self) -> list[int]:
+        # Clientes novos que a origem ainda não contém
+        return [id for id in self._new if self.__source.get_customer(id) is None]
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self.__source.customer_ids()
+        yield from self.__unsaved()
+
+    def __len__(self) -> int:
+        return self.__source.count_customers() + len(self.__unsaved())
+
+    def copy(self) -> Repository_Customers:
+        """
+        Copia o dicionário, compartilhando a origem e os clientes carregados.
+        Clientes carregados ou registrados depois não alteram a cópia.
+
+        Returns
+        -------
+        Repository_Customers
+            Cópia
+        """
+        customers = Repository_Customers(self.__source, self.__order_source)
+        customers._cache = dict(self._cache)
+        customers._by_name = dict(self._by_name)
+        customers._new = list(self._new)
+        customers.orders = self.orders
+        return customers
+
+    @property
+    def source(self) -> I_Customer_Source:
+        return self.__source
+
+
+class Repository_Orders(MutableMapping):
+    def __init__(self, source: I_Order_Source, customers: MutableMapping) -> None:
+        """
+        Dicionário de pedidos consultado sob demanda em um repositório ou arquivo.
+
+        Parameters
+        ----------
+        source : I_Order_Source
+            Origem dos pedidos
+        customers : MutableMapping
+            Clientes, indexados pelo id
+        """
+        self.__source = source
+        self.__customers = customers
+        self._cache: dict[int, Order] = {}
+        self._new: list[int] = []
+
+    def is_loaded(self, order_id: int) -> bool:
+        """
+        Verifica se um pedido já foi carregado para a memória.
+
+        Parameters
+        ----------
+        order_id : int
+            Id do pedido
+
+        Returns
+        -------
+        bool
+            Se o pedido está em memória
+        """
+        return order_id in self._cache
+
+    def __getitem__(self, order_id: int) -> Order:
+        if order_id not in self._cache:
+            data = self.__source.get_order(order_id)
+            if data is None:
+                raise KeyError(order_id)
+            self._cache[order_id] = Order.from_dict(data, self.__customers)
+        return self._cache[order_id]
+
+    def __setitem__(self, order_id: int, order: Order) -> None:
+        if order_id not in self._cache and not self.__source.has_order(order_id):
+            self._new.append(order_id)
+        self._cache[order_id] = order
+
+    def __delitem__(self, order_id: int) -> None:
+        raise TypeError("Pedidos não podem ser removidos!")
+
+    def __contains__(self, order_id: object) -> bool:
+        if order_id in self._cache:
+            return True
+        return isinstance(order_id, int) and self.__source.has_order(order_id)
+
+    def __unsaved(self) -> list[int]:
+        # Pedidos novos que a origem ainda não contém
+        return [id for id in self._new if not self.__source.has_order(id)]
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self.__source.order_ids()
+        yield from self.__unsaved()
+
+    def __len__(self) -> int:
+        return self.__source.count_orders() + len(self.__unsaved())
+
+    def summaries(self) -> Iterator[tuple[int, int, str, list[int]]]:
+        """
+        Percorre um resumo de todos os pedidos, sem carregar os que ainda não estão em memória.
+
+        Yields
+        ------
+        tuple[int, int, str, list[int]]
+            Id, id do cliente, status e ids dos produtos do pedido
+        """
+        for summary in self.__source.summaries():
+            order = self._cache.get(summary[0])
+            yield summary if order is None else order.summary()
+        for order_id in self.__unsaved():
+            yield self._cache[order_id].summary()
+
+    def copy(self) -> Repository_Orders:
+        """
+        Copia o dicionário, compartilhando a origem e os pedidos carregados.
+        Pedidos carregados ou feitos depois não alteram a cópia.
+
+        Returns
+        -------
+        Repository_Orders
+            Cópia
+        """
+        orders = Repository_Orders(self.__source, self.__customers)
+        orders._cache = dict(self._cache)
+        orders._new = list(self._new)
+        return orders
+
+    @property
+    def source(self) -> I_Order_Source:
+        return self.__source
+
+
+class Frozen_Records(Mapping):
+    def __init__(self, mapping: Mapping) -> None:
+        """
+        Cópia somente leitura de um dicionário de entidades, escrita enquanto o
+        mercado continua sendo alterado.
+
+        Os registros das entidades carregadas são montados na criação da cópia, que
+        deve ser feita sem que o mercado seja alterado. As entidades ainda não
+        carregadas não podem ter sido alteradas, e continuam sendo lidas da origem.
+
+        Parameters
+        ----------
+        mapping : Mapping
+            Produtos, clientes ou pedidos, indexados pelo id
+        """
+        self.__mapping: Mapping
+        if isinstance(mapping, (Catalogue_Products, Repository_Customers, Repository_Orders)):
+            self.__mapping = mapping.copy()
+            loaded = self.__mapping._cache
+        else:
+            loaded = mapping
+        self._records = {id: entity.to_dict() for id, entity in loaded.items()}
+        if loaded is mapping:
+            self.__mapping = self._records
+
+    def is_loaded(self, entity_id: int) -> bool:
+        """
+        Verifica se o registro de uma entidade foi montado na cópia.
+
+        Parameters
+        ----------
+        entity_id : int
+            Id da entidade
+
+        Returns
+        -------
+        bool
+            Se a entidade estava carregada
+        """
+        return entity_id in self._records
+
+    def loaded(self) -> Iterator[dict]:
+        """
+        Percorre os registros montados na cópia.
+
+        Yields
+        ------
+        dict
+            Registro da entidade
+        """
+        yield from self._records.values()
+
+    def __getitem__(self, entity_id: int) -> dict:
+        record = self._records.get(entity_id)
+        if record is None:
+            record = self.__mapping[entity_id].to_dict()
+        return record
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self.__mapping
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.__mapping)
+
+    def __len__(self) -> int:
+        return len(self.__mapping)
+
+    @property
+    def source(self) -> object:
+        return getattr(self.__mapping, "source", None)
+
+
+def to_record(entity: object) -> dict:
+    """
+    Obtem o registro de uma entidade, que já pode ser um registro de Frozen_Records.
+
+    Parameters
+    ----------
+    entity : object
+        Produto, cliente, pedido ou seu dicionário
+
+    Returns
+    -------
+    dict
+        Dicionário
+    """
+    return entity if isinstance(entity, dict) else entity.to_dict()
+
+
+class Lazy_Order_List(Sequence):
+    def __init__(self, orders: MutableMapping, ids: list[int]) -> None:
+        """
+        Lista dos pedidos de um cliente, os pedidos só são obtidos quando acessados.
+
+        Parameters
+        ----------
+        orders : MutableMapping
+            Todos os pedidos, indexados pelo id
+        ids : list[int]
+            Ids dos pedidos do cliente
+        """
+        self.__orders = orders
+        self._ids = ids
+
+    def append(self, order: Order) -> None:
+        # Pedidos carregados do repositório já fazem parte da lista
+        if order.id not in self._ids:
+            self._ids.append(order.id)
+
+    def __getitem__(self, index: int) -> Order:
+        return self.__orders[self._ids[index]]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class Repository_Auth_Data(MutableMapping):
+    def __init__(self, owner: Owner, customers: Repository_Customers) -> None:
+        """
+        Dados de autenticação consultados sob demanda.
+
+        Parameters
+        ----------
+        owner : Owner
+            Dono
+        customers : Repository_Customers
+            Clientes
+        """
+        self.__owner = owner
+        self.__customers = customers
+
+    def __getitem__(self, name: str) -> Abstract_User:
+        if name == self.__owner.name:
+            return self.__owner
+
+        customer = self.__customers.find(name)
+        if customer is None:
+            raise KeyError(name)
+        return customer
+
+    def __setitem__(self, name: str, user: Abstract_User) -> None:
+        # O usuário é persistido pelo registro de cadastro
+        pass
+
+    def __delitem__(self, name: str) -> None:
+        raise TypeError("Usuários não podem ser removidos!")
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        return name == self.__owner.name or self.__customers.find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        yield self.__owner.name
+        for customer_id in self.__customers:
+            yield self.__customers[customer_id].name
+
+    def __len__(self) -> int:
+        return len(self.__customers) + 1
@@ -0,0 +1,220 @@
+from __future__ import annotations
+from collections.abc import Mapping
+import json
+import os
+import re
+import threading
+from typing import Iterator
+
+from storage.interfaces import I_Order_Source
+from storage.mappings import to_record
+from storage.atomic_file import Pending_Files, replace_file
+from orders import Order
+
+
+# Início de cada linha escrita por write_orders, permite indexar sem decodificar os produtos
+HEADER = re.compile(rb'\{"id":(\d+),"customer_id":(\d+),')
+STATUS = re.compile(rb'"status":"((?:[^"\\]|\\.)*)"')
+PRODUCT_ID = re.compile(rb'\{"id":(\d+),')
+
+
+class Order_File(I_Order_Source):
+    def __init__(self, filename: str) -> None:
+        """
+        Arquivo de pedidos no formato JSON Lines (um pedido por linha).
+
+        O arquivo é percorrido linha a linha somente para montar um índice
+        id -> posição no arquivo, os pedidos são decodificados apenas quando pedidos.
+
+        Parameters
+        ----------
+        filename : str
+            Caminho do arquivo
+        """
+        self.__filename = filename
+        self.__file = None
+        self._offsets: dict[int, int] = {}
+        self._by_customer: dict[int, list[int]] = {}
+        # As linhas são lidas também pela thread que salva a database
+        self.__read_lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Reconstrói o índice a partir do conteúdo atual do arquivo.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        self._offsets = {}
+        self._by_customer = {}
+
+        if not os.path.exists(self.__filename):
+            return
+
+        self.__file = open(self.__filename, "rb")
+        offset = 0
+        for line in self.__file:
+            match = HEADER.match(line)
+            if match is not None:
+                order_id, customer_id = int(match[1]), int(match[2])
+            elif line.strip():
+                data = json.loads(line)
+                order_id, customer_id = data["id"], data["customer_id"]
+            else:
+                offset += len(line)
+                continue
+
+            self._offsets[order_id] = offset
+            self._by_customer.setdefault(customer_id, []).append(order_id)
+            offset += len(line)
+
+    def raw(self, order_id: int) -> bytes:
+        """
+        Obtem a linha de um pedido sem decodificá-la.
+
+        Parameters
+        ----------
+        order_id : int
+            Id do pedido
+
+        Returns
+        -------
+        bytes
+            Linha do pedido, incluindo a quebra de linha
+
+        Raises
+        ------
+        KeyError
+            Caso o pedido não exista
+        """
+        offset = self._offsets[order_id]
+        assert self.__file is not None
+        with self.__read_lock:
+            self.__file.seek(offset)
+            return self.__file.readline()
+
+    def get_order(self, order_id: int) -> dict | None:
+        if order_id not in self._offsets:
+            return None
+        return json.loads(self.raw(order_id))
+
+    def has_order(self, order_id: int) -> bool:
+        return order_id in self._offsets
+
+    def order_ids(self) -> Iterator[int]:
+        return iter(list(self._offsets))
+
+    def order_ids_by_customer(self, customer_id: int) -> list[int]:
+        return list(self._by_customer.get(customer_id, []))
+
+    def count_orders(self) -> int:
+        return len(self._offsets)
+
+    def summaries(self) -> Iterator[tuple[int, int, str, list[int]]]:
+        """
+        Percorre um resumo de todos os pedidos, sem decodificá-los por completo.
+
+        Yields
+        ------
+        tuple[int, int, str, list[int]]
+            Id, id do cliente, status e ids dos produtos do pedido
+        """
+        for order_id in self.order_ids():
+            line = self.raw(order_id)
+            header = HEADER.match(line)
+            status = STATUS.search(line) if header is not None else None
+            if header is None or status is None:
+                data = json.loads(line)
+                yield (
+                    data["id"],
+                    data["customer_id"],
+                    data["status"],
+                    [product["id"] for product in data["products"]],
+                )
+            else:
+                products = line[status.end() :]
+                yield (
+                    int(header[1]),
+                    int(header[2]),
+                    json.loads(b'"' + status[1] + b'"'),
+                    [int(id) for id in PRODUCT_ID.findall(products)],
+                )
+
+    def records(self) -> Iterator[dict]:
+        """
+        Percorre todos os pedidos do arquivo, decodificando um de cada vez.
+
+        Yields
+        ------
+        dict
+            Dicionário do pedido
+        """
+        for order_id in self.order_ids():
+            yield json.loads(self.raw(order_id))
+
+    def close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    def __repr__(self) -> str:
+        return f"Order_File(filename={self.__filename}, contem {len(self._offsets)} pedidos)"
+
+
+def orders_filename(filename: str) -> str:
+    """
+    Obtem o caminho do arquivo de pedidos que acompanha uma database.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho da database
+
+    Returns
+    -------
+    str
+        Caminho do arquivo de pedidos
+    """
+    return os.path.splitext(filename)[0] + ".orders.jsonl"
+
+
+def write_orders(
+    filename: str, orders: Mapping[int, Order], pending: Pending_Files | None = None
+) -> None:
+    """
+    Escreve os pedidos em um arquivo JSON Lines, ordenados pelo id.
+    Pedidos de um Repository_Orders ou Frozen_Records que ainda não foram carregados
+    de um Order_File são copiados sem serem decodificados. O arquivo é substituído somente após ser escrito por completo
+    e sincronizado com o disco.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho do arquivo
+    orders : Mapping[int, Order]
+        Pedidos, ou seus registros, indexados pelo id
+    pending : Pending_Files | None, optional
+        Caso fornecido, a substituição é adiada até seu commit, by default None
+    """
+    source = getattr(orders, "source", None)
+    if not isinstance(source, Order_File):
+        source = None
+
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb") as file:
+        for order_id in sorted(orders):
+            if source is not None and not orders.is_loaded(order_id):
+                file.write(source.raw(order_id))
+            else:
+                line = json.dumps(to_record(orders[order_id]), separators=(",", ":"))
+                file.write(line.encode("utf-8") + b"\n")
+
+    sources = []
+    if source is not None and os.path.abspath(source.filename) == os.path.abspath(filename):
+        sources.append(source)
+    replace_file(temp_filename, filename, sources, pending)
@@ -0,0 +1,696 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from storage.interfaces import I_Order_Source, I_Customer_Source
+from storage.mappings import Repository_Customers, Frozen_Records, to_record
+from storage.atomic_file import Pending_Files, replace_file
+from money import read_price
+
+if TYPE_CHECKING:
+    from users import Customer
+    from products import Product
+    from orders import Order
+
+
+# Extensão das databases no formato binário, as demais são JSON
+EXTENSION = ".snapshot"
+
+MAGIC = b"OMSN"
+VERSION = 1
+
+# Cabeçalho: assinatura, versão e quantidade de seções
+HEADER = struct.Struct("<4sII")
+# Tabela de seções: nome, posição no arquivo e quantidade de linhas
+SECTION = struct.Struct("<4sQQ")
+
+# Colunas de cada seção, na ordem em que são escritas: "q" int64 e "d" float64.
+# Colunas "name" e "status" guardam o índice de um texto na seção de textos, e
+# colunas "end" a posição final de cada linha em um bloco de bytes ou na seção de itens
+COLUMNS = {
+    b"STRS": (("end", "q"),),
+    b"PROD": (
+        ("id", "q"),
+        ("owner_id", "q"),
+        ("name", "q"),
+        ("price_cents", "q"),
+        ("quantity", "q"),
+    ),
+    b"CUST": (("id", "q"), ("name", "q"), ("end", "q")),
+    b"ORDR": (
+        ("id", "q"),
+        ("customer_id", "q"),
+        ("status", "q"),
+        ("placed_at", "d"),
+        ("end", "q"),
+    ),
+    b"ITEM": (("product_id", "q"), ("name", "q"), ("price_cents", "q"), ("quantity", "q")),
+}
+
+# Item de um pedido em uma linha: id do produto, nome, preço em centavos e quantidade
+Item_Row = tuple[int, str, int, int]
+# Pedido em uma linha: id, id do cliente, status, instante e itens
+Order_Row = tuple[int, int, str, "float | None", list[Item_Row]]
+
+
+def is_snapshot(filename: str) -> bool:
+    """
+    Verifica se uma database está no formato binário, pela extensão do arquivo.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho da database
+
+    Returns
+    -------
+    bool
+        Se a database é um snapshot binário
+    """
+    return os.path.splitext(filename)[1] == EXTENSION
+
+
+class Snapshot_File(I_Order_Source, I_Customer_Source):
+    def __init__(self, filename: str) -> None:
+        """
+        Database em um snapshot binário, mapeado na memória.
+
+        O arquivo é dividido em seções de colunas de inteiros de 64 bits, uma coluna
+        por campo, seguidas dos blocos de bytes de tamanho variável. As colunas são
+        lidas diretamente das páginas mapeadas, sem decodificar o arquivo: abrir o
+        snapshot custa o mesmo para qualquer quantidade de pedidos, e os clientes e
+        pedidos só são montados quando acessados, como no Order_File.
+
+        Somente o dono, os alocadores de Ids e a sequência do journal são guardados
+        em JSON, no bloco de metadados. Os clientes são registros JSON de tamanho
+        prefixado pela coluna "end", e os textos repetidos, como os nomes dos itens
+        e os status, são guardados uma única vez na seção de textos.
+
+        Parameters
+        ----------
+        filename : str
+            Caminho do arquivo
+
+        Raises
+        ------
+        ValueError
+            Caso o arquivo não seja um snapshot ou tenha uma versão desconhecida
+        """
+        self.__filename = filename
+        self.__file = None
+        self.__map: mmap.mmap | None = None
+        self.__views: list[memoryview] = []
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Mapeia novamente o arquivo, após ele ter sido substituído.
+        """
+        self.close()
+        self.__file = open(self.__filename, "rb")
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"O arquivo {self.__filename} não é um snapshot!")
+        if version != VERSION:
+            raise ValueError(f"Versão de snapshot desconhecida: {version}")
+
+        sections: dict[bytes, tuple[int, int]] = {}
+        for i in range(count):
+            tag, offset, rows = SECTION.unpack_from(self.__map, HEADER.size + i * SECTION.size)
+            sections[tag] = (offset, rows)
+
+        offset, size = sections[b"META"]
+        self._metadata = json.loads(self.__map[offset : offset + size])
+
+        self._strings = self.__section(sections, b"STRS")
+        self._products = self.__section(sections, b"PROD")
+        self._customers = self.__section(sections, b"CUST")
+        self._orders = self.__section(sections, b"ORDR")
+        self._items = self.__section(sections, b"ITEM")
+
+        self.__decoded: list[str | None] = [None] * len(self._strings["end"])
+        # Índices montados somente na primeira consulta que precisa deles
+        self._customer_names: dict[str, int] | None = None
+        self._by_customer: dict[int, list[int]] | None = None
+
+    def __section(self, sections: dict[bytes, tuple[int, int]], tag: bytes) -> dict:
+        """
+        Obtem as colunas de uma seção, como memoryviews sobre o arquivo mapeado.
+        A posição do bloco de bytes que segue as colunas é guardada em "blob".
+        """
+        assert self.__map is not None
+        offset, rows = sections[tag]
+        columns: dict = {}
+        for name, typecode in COLUMNS[tag]:
+            size = rows * 8
+            if sys.byteorder == "little":
+                view = memoryview(self.__map)[offset : offset + size].cast(typecode)
+                self.__views.append(view)
+                columns[name] = view
+            else:
+                column = array(typecode, self.__map[offset : offset + size])
+                column.byteswap()
+                columns[name] = column
+            offset += size
+        columns["blob"] = offset
+        return columns
+
+    def __string(self, index: int) -> str:
+        """
+        Obtem um texto da seção de textos, decodificando cada texto uma única vez.
+        """
+        text = self.__decoded[index]
+        if text is None:
+            assert self.__map is not None
+            ends = self._strings["end"]
+            start = self._strings["blob"] + (ends[index - 1] if index > 0 else 0)
+            end = self._strings["blob"] + ends[index]
+            text = sys.intern(self.__map[start:end].decode("utf-8"))
+            self.__decoded[index] = text
+        return text
+
+    def strings(self) -> Iterator[str]:
+        """
+        Percorre os textos da seção de textos, na ordem de seus índices.
+
+        Yields
+        ------
+        str
+            Texto
+        """
+        for index in range(len(self._strings["end"])):
+            yield self.__string(index)
+
+    @staticmethod
+    def __find(ids, id: int) -> int | None:
+        """
+        Busca a posição de um Id em uma coluna ordenada de Ids.
+        """
+        # Ids sem lacunas ficam na posição de mesmo número
+        if 0 <= id < len(ids) and ids[id] == id:
+            return id
+        i = bisect_left(ids, id)
+        return i if i < len(ids) and ids[i] == id else None
+
+    # - - - Metadados e produtos - - - #
+    @property
+    def metadata(self) -> dict:
+        """
+        Dicionário com as chaves "owner", "id_allocators" e "journal_seq".
+        """
+        return self._metadata
+
+    def product_records(self) -> Iterator[dict]:
+        """
+        Percorre os produtos, ordenados pelo Id.
+
+        Yields
+        ------
+        dict
+            Dicionário do produto
+        """
+        columns = self._products
+        for i in range(len(columns["id"])):
+            yield {
+                "id": columns["id"][i],
+                "owner_id": columns["owner_id"][i],
+                "name": self.__string(columns["name"][i]),
+                "price_cents": columns["price_cents"][i],
+                "quantity": columns["quantity"][i],
+            }
+
+    # - - - Clientes - - - #
+    def raw_customer(self, customer_id: int) -> bytes | None:
+        """
+        Obtem o registro JSON de um cliente sem decodificá-lo.
+
+        Parameters
+        ----------
+        customer_id : int
+            Id do cliente
+
+        Returns
+        -------
+        bytes | None
+            Registro do cliente, None caso não exista
+        """
+        i = self.__find(self._customers["id"], customer_id)
+        if i is None:
+            return None
+        assert self.__map is not None
+        ends = self._customers["end"]
+        start = self._customers["blob"] + (ends[i - 1] if i > 0 else 0)
+        return self.__map[start : self._customers["blob"] + ends[i]]
+
+    def get_customer(self, customer_id: int) -> dict | None:
+        raw = self.raw_customer(customer_id)
+        return json.loads(raw) if raw is not None else None
+
+    def find_customer(self, name: str) -> dict | None:
+        if self._customer_names is None:
+            # Os nomes estão na seção de textos, então nenhum registro é decodificado
+            self._customer_names = {
+                self.__string(index): id
+                for id, index in zip(self._customers["id"], self._customers["name"])
+            }
+        customer_id = self._customer_names.get(name)
+        return self.get_customer(customer_id) if customer_id is not None else None
+
+    def customer_name(self, customer_id: int) -> str:
+        """
+        Obtem o nome de um cliente sem decodificar seu registro.
+
+        Raises
+        ------
+        KeyError
+            Caso o cliente não exista
+        """
+        i = self.__find(self._customers["id"], customer_id)
+        if i is None:
+            raise KeyError(customer_id)
+        return self.__string(self._customers["name"][i])
+
+    def customer_ids(self) -> Iterator[int]:
+        return iter(self._customers["id"].tolist())
+
+    def records(self) -> Iterator[dict]:
+        """
+        Percorre os clientes, ordenados pelo Id.
+
+        Yields
+        ------
+        dict
+            Dicionário do cliente
+        """
+        for customer_id in self.customer_ids():
+            customer = self.get_customer(customer_id)
+            assert customer is not None
+            yield customer
+
+    def count_customers(self) -> int:
+        return len(self._customers["id"])
+
+    def last_customer_id(self) -> int:
+        ids = self._customers["id"]
+        return ids[len(ids) - 1] if len(ids) > 0 else 0
+
+    # - - - Pedidos - - - #
+    def order_row(self, order_id: int) -> Order_Row | None:
+        """
+        Obtem um pedido lido diretamente das colunas.
+
+        Parameters
+        ----------
+        order_id : int
+            Id do pedido
+
+        Returns
+        -------
+        Order_Row | None
+            Id, id do cliente, status, instante e itens do pedido,
+            None caso o pedido não exista
+        """
+        orders = self._orders
+        i = self.__find(orders["id"], order_id)
+        if i is None:
+            return None
+
+        items = self._items
+        start = orders["end"][i - 1] if i > 0 else 0
+        rows = [
+            (
+                items["product_id"][j],
+                self.__string(items["name"][j]),
+                items["price_cents"][j],
+                items["quantity"][j],
+            )
+            for j in range(start, orders["end"][i])
+        ]
+        placed_at = orders["placed_at"][i]
+        return (
+            order_id,
+            orders["customer_id"][i],
+            self.__string(orders["status"][i]),
+            None if math.isnan(placed_at) else placed_at,
+            rows,
+        )
+
+    def order_position(self, order_id: int) -> int | None:
+        """
+        Obtem a posição de um pedido nas colunas de pedidos.
+
+        Parameters
+        ----------
+        order_id : int
+            Id do pedido
+
+        Returns
+        -------
+        int | None
+            Posição, None caso o pedido não exista
+        """
+        return self.__find(self._orders["id"], order_id)
+
+    def copy_orders(
+        self, positions: range, orders: dict[str, array], items: dict[str, array]
+    ) -> None:
+        """
+        Copia pedidos em posições consecutivas para as colunas de um novo snapshot,
+        fatia a fatia, sem ler cada pedido. Os índices dos textos só continuam
+        válidos se a seção de textos do novo snapshot começar com a deste.
+
+        Parameters
+        ----------
+        positions : range
+            Posições consecutivas dos pedidos
+        orders : dict[str, array]
+            Colunas de pedidos do novo snapshot
+        items : dict[str, array]
+            Colunas de itens do novo snapshot
+        """
+        start, end = positions.start, positions.stop
+        ends = self._orders["end"]
+        first = ends[start - 1] if start > 0 else 0
+        last = ends[end - 1]
+
+        for name in ("id", "customer_id", "status", "placed_at"):
+            orders[name].frombytes(self._orders[name][start:end].cast("B"))
+        shift = len(items["product_id"]) - first
+        orders["end"].extend(item_end + shift for item_end in ends[start:end].tolist())
+        for name, column in items.items():
+            column.frombytes(self._items[name][first:last].cast("B"))
+
+    def get_order(self, order_id: int) -> dict | None:
+        row = self.order_row(order_id)
+        if row is None:
+            return None
+        order = {
+            "id": row[0],
+            "customer_id": row[1],
+            "status": row[2],
+            "products": [
+                {"id": id, "name": name, "price_cents": price, "quantity": quantity}
+                for id, name, price, quantity in row[4]
+            ],
+        }
+        if row[3] is not None:
+            order["placed_at"] = row[3]
+        return order
+
+    def has_order(self, order_id: int) -> bool:
+        return self.__find(self._orders["id"], order_id) is not None
+
+    def order_ids(self) -> Iterator[int]:
+        return iter(self._orders["id"].tolist())
+
+    def order_ids_by_customer(self, customer_id: int) -> list[int]:
+        if self._by_customer is None:
+            self._by_customer = {}
+            for order_id, owner_id in zip(
+                self._orders["id"].tolist(), self._orders["customer_id"].tolist()
+            ):
+                self._by_customer.setdefault(owner_id, []).append(order_id)
+        return list(self._by_customer.get(customer_id, []))
+
+    def count_orders(self) -> int:
+        return len(self._orders["id"])
+
+    def order_records(self) -> Iterator[dict]:
+        """
+        Percorre os pedidos, ordenados pelo Id.
+
+        Yields
+        ------
+        dict
+            Dicionário do pedido
+        """
+        for order_id in self.order_ids():
+            order = self.get_order(order_id)
+            assert order is not None
+            yield order
+
+    def summaries(self) -> Iterator[tuple[int, int, str, list[int]]]:
+        """
+        Percorre um resumo de todos os pedidos, lendo somente as colunas necessárias.
+
+        Yields
+        ------
+        tuple[int, int, str, list[int]]
+            Id, id do cliente, status e ids dos produtos do pedido
+        """
+        orders = self._orders
+        product_ids = self._items["product_id"]
+        start = 0
+        for order_id, customer_id, status, end in zip(
+            orders["id"].tolist(),
+            orders["customer_id"].tolist(),
+            orders["status"].tolist(),
+            orders["end"].tolist(),
+        ):
+            yield order_id, customer_id, self.__string(status), product_ids[start:end].tolist()
+            start = end
+
+    def close(self) -> None:
+        # As views precisam ser liberadas antes do mapeamento ser fechado
+        for view in self.__views:
+            view.release()
+        self.__views = []
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    def __repr__(self) -> str:
+        return (
+            f"Snapshot_File(filename={self.__filename}, contem {self.count_customers()} "
+            f"clientes e {self.count_orders()} pedidos)"
+        )
+
+
+class _Strings:
+    def __init__(self, texts: Iterable[str] = ()) -> None:
+        """
+        Seção de textos em construção, cada texto é guardado uma única vez.
+
+        Parameters
+        ----------
+        texts : Iterable[str], optional
+            Textos iniciais, mantendo seus índices, by default ()
+        """
+        self._indexes: dict[str, int] = {}
+        self.ends = array("q")
+        self.blob = bytearray()
+        for text in texts:
+            self.add(text)
+
+    def add(self, text: str) -> int:
+        index = self._indexes.get(text)
+        if index is None:
+            index = len(self.ends)
+            self._indexes[text] = index
+            self.blob += text.encode("utf-8")
+            self.ends.append(len(self.blob))
+        return index
+
+
+def _customer_rows(
+    customers: Mapping[int, "Customer"],
+) -> Iterator[tuple[int, str, bytes]]:
+    """
+    Percorre os clientes a serem escritos, em ordem de Id.
+    Clientes que ainda não foram carregados de uma origem são copiados dela.
+    """
+    source = None
+    loaded: Mapping[int, "Customer | dict"] = customers
+    if isinstance(customers, (Repository_Customers, Frozen_Records)):
+        source = customers.source
+        records = map(to_record, customers.loaded())
+        loaded = {data["id"]: data for data in records}
+
+    for customer_id in sorted(customers):
+        customer = loaded.get(customer_id)
+        if customer is not None:
+            data = to_record(customer)
+        elif isinstance(source, Snapshot_File):
+            raw = source.raw_customer(customer_id)
+            assert raw is not None
+            yield customer_id, source.customer_name(customer_id), raw
+            continue
+        else:
+            data = to_record(customers[customer_id])
+        yield customer_id, data["name"], json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _order_rows(orders: Mapping[int, "Order"]) -> Iterator[Order_Row | range]:
+    """
+    Percorre os pedidos a serem escritos, em ordem de Id.
+    Pedidos que ainda não foram carregados de uma origem são lidos dela sem
+    serem montados, e sequências de pedidos de um snapshot ainda não carregados
+    são devolvidas como as faixas de suas posições, para serem copiadas de uma vez.
+    """
+    source = getattr(orders, "source", None)
+    snapshot = source if isinstance(source, Snapshot_File) else None
+    run = range(0)
+
+    for order_id in sorted(orders):
+        if snapshot is not None and not orders.is_loaded(order_id):
+            position = snapshot.order_position(order_id)
+            assert position is not None
+            if len(run) > 0 and position == run.stop:
+                run = range(run.start, position + 1)
+                continue
+            if len(run) > 0:
+                yield run
+            run = range(position, position + 1)
+            continue
+        if len(run) > 0:
+            yield run
+            run = range(0)
+
+        if source is not None and not orders.is_loaded(order_id):
+            data = source.get_order(order_id)
+            assert data is not None
+        else:
+            data = to_record(orders[order_id])
+        yield (
+            data["id"],
+            data["customer_id"],
+            data["status"],
+            data.get("placed_at"),
+            [
+                (item["id"], item["name"], read_price(item), item["quantity"])
+                for item in data["products"]
+            ],
+        )
+    if len(run) > 0:
+        yield run
+
+
+def write_snapshot(
+    filename: str,
+    metadata: dict,
+    products: Iterable["Product | dict"],
+    customers: Mapping[int, "Customer"],
+    orders: Mapping[int, "Order"],
+    pending: Pending_Files | None = None,
+) -> None:
+    """
+    Escreve a database em um snapshot binário.
+    O arquivo é substituído somente após ser escrito por completo e sincronizado
+    com o disco, e os snapshots abertos sobre o mesmo arquivo são mapeados novamente.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho do arquivo
+    metadata : dict
+        Dono, alocadores de Ids e sequência do journal
+    products : Iterable[Product | dict]
+        Produtos, ou seus registros, ordenados pelo Id
+    customers : Mapping[int, Customer]
+        Clientes, ou seus registros, indexados pelo id
+    orders : Mapping[int, Order]
+        Pedidos, ou seus registros, indexados pelo id
+    pending : Pending_Files | None, optional
+        Caso fornecido, a sincronização e a substituição são adiadas até seu commit,
+        by default None
+    """
+    # Os textos de um snapshot de origem mantêm seus índices, então seus pedidos
+    # podem ser copiados sem traduzir as colunas de nomes e status
+    source = getattr(orders, "source", None)
+    strings = _Strings(source.strings() if isinstance(source, Snapshot_File) else ())
+    sections: dict[bytes, dict[str, array]] = {
+        tag: {name: array(typecode) for name, typecode in columns}
+        for tag, columns in COLUMNS.items()
+        if tag != b"STRS"
+    }
+
+    columns = sections[b"PROD"]
+    for product in map(to_record, products):
+        columns["id"].append(product["id"])
+        columns["owner_id"].append(product["owner_id"])
+        columns["name"].append(strings.add(product["name"]))
+        columns["price_cents"].append(read_price(product))
+        columns["quantity"].append(product["quantity"])
+
+    columns = sections[b"CUST"]
+    records = bytearray()
+    for customer_id, name, raw in _customer_rows(customers):
+        columns["id"].append(customer_id)
+        columns["name"].append(strings.add(name))
+        records += raw
+        columns["end"].append(len(records))
+
+    columns = sections[b"ORDR"]
+    items = sections[b"ITEM"]
+    for row in _order_rows(orders):
+        if isinstance(row, range):
+            assert isinstance(source, Snapshot_File)
+            source.copy_orders(row, columns, items)
+            continue
+        order_id, customer_id, status, placed_at, rows = row
+        columns["id"].append(order_id)
+        columns["customer_id"].append(customer_id)
+        columns["status"].append(strings.add(status))
+        columns["placed_at"].append(placed_at if placed_at is not None else math.nan)
+        for product_id, name, price, quantity in rows:
+            items["product_id"].append(product_id)
+            items["name"].append(strings.add(name))
+            items["price_cents"].append(price)
+            items["quantity"].append(quantity)
+        columns["end"].append(len(items["product_id"]))
+
+    # Seções na ordem em que são escritas, com seus blocos de bytes
+    layout: list[tuple[bytes, list[array], int, bytes]] = [
+        (b"META", [], 0, json.dumps(metadata, separators=(",", ":")).encode("utf-8")),
+        (b"STRS", [strings.ends], len(strings.ends), bytes(strings.blob)),
+    ]
+    for tag, columns in sections.items():
+        blob = bytes(records) if tag == b"CUST" else b""
+        layout.append((tag, list(columns.values()), len(next(iter(columns.values()))), blob))
+
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb") as file:
+        offset = HEADER.size + SECTION.size * len(layout)
+        offset += -offset % 8
+        table = []
+        for tag, section_columns, rows, blob in layout:
+            table.append(SECTION.pack(tag, offset, rows if tag != b"META" else len(blob)))
+            offset += 8 * rows * len(section_columns) + len(blob)
+            # As colunas de cada seção começam alinhadas em 8 bytes
+            offset += -offset % 8
+
+        file.write(HEADER.pack(MAGIC, VERSION, len(layout)))
+        file.write(b"".join(table))
+        file.write(b"\0" * (-file.tell() % 8))
+        for tag, section_columns, rows, blob in layout:
+            for column in section_columns:
+                if sys.byteorder != "little":
+                    column.byteswap()
+                column.tofile(file)
+            file.write(blob)
+            file.write(b"\0" * (-file.tell() % 8))
+
+    sources = []
+    for mapping in (customers, orders):
+        source = getattr(mapping, "source", None)
+        if isinstance(source, Snapshot_File) and source not in sources:
+            if os.path.abspath(source.filename) == os.path.abspath(filename):
+                sources.append(source)
+    replace_file(temp_filename, filename, sources, pending)
@@ -0,0 +1,408 @@
+from __future__ import annotations
+import json
+import sqlite3
+from typing import Iterator
+
+from storage.interfaces import I_Repository
+from orders import constants as o_constants
+from money import read_price
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS owners (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    address TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS customers_name ON customers (name);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    owner_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    quantity INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_name ON products (name);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    placed_at REAL
+);
+CREATE INDEX IF NOT EXISTS orders_customer_id ON orders (customer_id);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status);
+CREATE TABLE IF NOT EXISTS order_products (
+    order_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (order_id, position)
+) WITHOUT ROWID;
+"""
+
+# Status resultante de cada operação de pedido
+STATUS_BY_OPERATION = {
+    "cancel_order": o_constants.canceled,
+    "send_order": o_constants.sent,
+    "receive_order": o_constants.finished,
+}
+
+
+class SQLite_Repository(I_Repository):
+    def __init__(self, filename: str) -> None:
+        """
+        Repositório dos dados do mercado em um arquivo SQLite.
+
+        As consultas são feitas sob demanda, e as mutações são recebidas no mesmo
+        formato de registro do journal, sendo aplicadas imediatamente ao banco.
+
+        Parameters
+        ----------
+        filename : str
+            Caminho do arquivo SQLite
+        """
+        self.__filename = filename
+        self.__connection = sqlite3.connect(filename)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.executescript(SCHEMA)
+        self.__migrate()
+
+    def __migrate(self) -> None:
+        """
+        Atualiza tabelas criadas por versões anteriores do esquema.
+        """
+        columns = {row[1] for row in self.__connection.execute("PRAGMA table_info(orders)")}
+        if "placed_at" not in columns:
+            with self.__connection:
+                self.__connection.execute("ALTER TABLE orders ADD COLUMN placed_at REAL")
+
+        # Preços em reais, em ponto flutuante, passam a ser guardados em centavos
+        columns = {row[1] for row in self.__connection.execute("PRAGMA table_info(products)")}
+        if "price_cents" not in columns:
+            with self.__connection:
+                for table in ("products", "order_products"):
+                    self.__connection.execute(
+                        f"ALTER TABLE {table} RENAME COLUMN price TO price_cents"
+                    )
+                    self.__connection.execute(
+                        f"UPDATE {table} SET price_cents = CAST(ROUND(price_cents * 100) AS INTEGER)"
+                    )
+
+    # - - - Consultas - - - #
+    def load_owner(self) -> dict:
+        """
+        Obtem o dono do mercado.
+
+        Returns
+        -------
+        dict
+            Dicionário do dono
+
+        Raises
+        ------
+        KeyError
+            Caso a database não possua um dono
+        """
+        row = self.__connection.execute(
+            "SELECT id, name, password FROM owners LIMIT 1"
+        ).fetchone()
+        if row is None:
+            raise KeyError("Database sem dono!")
+        return {"id": row[0], "name": row[1], "password": row[2]}
+
+    def get_customer(self, customer_id: int) -> dict | None:
+        row = self.__connection.execute(
+            "SELECT id, name, password, address FROM customers WHERE id = ?",
+            (customer_id,),
+        ).fetchone()
+        return self.__customer_dict(row) if row is not None else None
+
+    def find_customer(self, name: str) -> dict | None:
+        row = self.__connection.execute(
+            "SELECT id, name, password, address FROM customers WHERE name = ? ORDER BY id LIMIT 1",
+            (name,),
+        ).fetchone()
+        return self.__customer_dict(row) if row is not None else None
+
+    def customer_ids(self) -> Iterator[int]:
+        for (id,) in self.__connection.execute("SELECT id FROM customers ORDER BY id"):
+            yield id
+
+    def count_customers(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def last_customer_id(self) -> int:
+        row = self.__connection.execute("SELECT MAX(id) FROM customers").fetchone()
+        return row[0] if row[0] is not None else 0
+
+    def get_product(self, product_id: int) -> dict | None:
+        row = self.__connection.execute(
+            "SELECT id, owner_id, name, price_cents, quantity FROM products WHERE id = ?",
+            (product_id,),
+        ).fetchone()
+        return self.__product_dict(row) if row is not None else None
+
+    def find_products(self, name: str) -> list[dict]:
+        rows = self.__connection.execute(
+            "SELECT id, owner_id, name, price_cents, quantity FROM products WHERE name = ? ORDER BY id",
+            (name,),
+        )
+        return [self.__product_dict(row) for row in rows]
+
+    def product_ids(self) -> Iterator[int]:
+        for (id,) in self.__connection.execute("SELECT id FROM products ORDER BY id"):
+            yield id
+
+    def count_products(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def last_product_id(self) -> int:
+        row = self.__connection.execute("SELECT MAX(id) FROM products").fetchone()
+        return row[0] if row[0] is not None else -1
+
+    def get_order(self, order_id: int) -> dict | None:
+        row = self.__connection.execute(
+            "SELECT id, customer_id, status, placed_at FROM orders WHERE id = ?", (order_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        rows = self.__connection.execute(
+            "SELECT product_id, name, price_cents, quantity FROM order_products "
+            "WHERE order_id = ? ORDER BY position",
+            (order_id,),
+        )
+        order = {
+            "id": row[0],
+            "customer_id": row[1],
+            "status": row[2],
+            "products": [
+                # Tabelas migradas mantêm o tipo REAL, então os centavos voltam como float
+                {"id": item[0], "name": item[1], "price_cents": int(item[2]), "quantity": item[3]}
+                for item in rows
+            ],
+        }
+        if row[3] is not None:
+            order["placed_at"] = row[3]
+        return order
+
+    def has_order(self, order_id: int) -> bool:
+        row = self.__connection.execute(
+            "SELECT 1 FROM orders WHERE id = ?", (order_id,)
+        ).fetchone()
+        return row is not None
+
+    def order_ids(self) -> Iterator[int]:
+        for (id,) in self.__connection.execute("SELECT id FROM orders ORDER BY id"):
+            yield id
+
+    def order_ids_by_customer(self, customer_id: int) -> list[int]:
+        rows = self.__connection.execute(
+            "SELECT id FROM orders WHERE customer_id = ? ORDER BY id", (customer_id,)
+        )
+        return [id for (id,) in rows]
+
+    def order_ids_by_status(self, status: str) -> list[int]:
+        rows = self.__connection.execute(
+            "SELECT id FROM orders WHERE status = ? ORDER BY id", (status,)
+        )
+        return [id for (id,) in rows]
+
+    def summaries(self) -> Iterator[tuple[int, int, str, list[int]]]:
+        product_ids: dict[int, list[int]] = {}
+        rows = self.__connection.execute(
+            "SELECT order_id, product_id FROM order_products ORDER BY order_id, position"
+        )
+        for order_id, product_id in rows:
+            product_ids.setdefault(order_id, []).append(product_id)
+
+        rows = self.__connection.execute(
+            "SELECT id, customer_id, status FROM orders ORDER BY id"
+        )
+        for id, customer_id, status in rows:
+            yield id, customer_id, status, product_ids.get(id, [])
+
+    def last_order_id(self) -> int:
+        row = self.__connection.execute("SELECT MAX(id) FROM orders").fetchone()
+        return row[0] if row[0] is not None else -1
+
+    def count_orders(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def is_empty(self) -> bool:
+        """
+        Verifica se a database ainda não possui um dono cadastrado.
+
+        Returns
+        -------
+        bool
+            Se a database está vazia
+        """
+        return self.__connection.execute("SELECT COUNT(*) FROM owners").fetchone()[0] == 0
+
+    # - - - Mutações - - - #
+    def record(self, operation: str, **data) -> None:
+        """
+        Aplica uma mutação, no formato de registro do journal, ao banco.
+
+        Parameters
+        ----------
+        operation : str
+            Nome da operação
+        **data
+            Dados da operação
+
+        Raises
+        ------
+        ValueError
+            Caso a operação seja desconhecida
+        """
+        with self.__connection as connection:
+            match operation:
+                case "register_product":
+                    owner_id = self.load_owner()["id"]
+                    connection.execute(
+                        "INSERT INTO products VALUES (?, ?, ?, ?, 0)",
+                        (data["id"], owner_id, data["name"], data["price_cents"]),
+                    )
+                case "add_product":
+                    connection.execute(
+                        "UPDATE products SET quantity = quantity + ? WHERE id = ?",
+                        (data["ammount"], data["id"]),
+                    )
+                case "remove_product":
+                    connection.execute(
+                        "UPDATE products SET quantity = quantity - ? WHERE id = ?",
+                        (data["ammount"], data["id"]),
+                    )
+                case "delete_product":
+                    connection.execute("DELETE FROM products WHERE id = ?", (data["id"],))
+                case "import_products":
+                    owner_id = self.load_owner()["id"]
+                    connection.executemany(
+                        "INSERT INTO products VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET name = excluded.name, "
+                        "price_cents = excluded.price_cents, quantity = quantity + excluded.quantity",
+                        (
+                            (p["id"], owner_id, p["name"], p["price_cents"], p["quantity"])
+                            for p in data["products"]
+                        ),
+                    )
+                case "place_order":
+                    self.__insert_order(connection, data)
+                case "cancel_order" | "send_order" | "receive_order":
+                    connection.execute(
+                        "UPDATE orders SET status = ? WHERE id = ?",
+                        (STATUS_BY_OPERATION[operation], data["id"]),
+                    )
+                case "register":
+                    self.__insert_customer(connection, data["customer"])
+                case "change_password":
+                    table = "owners" if data["id"] == self.load_owner()["id"] else "customers"
+                    connection.execute(
+                        f"UPDATE {table} SET password = ? WHERE id = ?",
+                        (data["password"], data["id"]),
+                    )
+                case _:
+                    raise ValueError(f"Operação desconhecida: {operation}")
+
+    def import_data(self, data: dict) -> None:
+        """
+        Importa os dados no formato do arquivo JSON da database.
+        Preços em reais de databases anteriores são convertidos para centavos.
+
+        Parameters
+        ----------
+        data : dict
+            Dicionário com as chaves "owner", "customers", "products" e "orders"
+        """
+        with self.__connection as connection:
+            owner = data["owner"]
+            connection.execute(
+                "INSERT OR REPLACE INTO owners VALUES (?, ?, ?)",
+                (owner["id"], owner["name"], owner["password"]),
+            )
+            for customer in data["customers"]:
+                self.__insert_customer(connection, customer)
+            connection.executemany(
+                "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?)",
+                (
+                    (p["id"], p["owner_id"], p["name"], read_price(p), p["quantity"])
+                    for p in data["products"]
+                ),
+            )
+            for order in data["orders"]:
+                self.__insert_order(connection, order)
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    # - - - Auxiliares - - - #
+    @staticmethod
+    def __insert_customer(connection: sqlite3.Connection, customer: dict) -> None:
+        connection.execute(
+            "INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?)",
+            (
+                customer["id"],
+                customer["name"],
+                customer["password"],
+                json.dumps(customer["address"]),
+            ),
+        )
+
+    @staticmethod
+    def __insert_order(connection: sqlite3.Connection, order: dict) -> None:
+        connection.execute(
+            "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?)",
+            (
+                order["id"],
+                order["customer_id"],
+                order.get("status", o_constants.placed),
+                order.get("placed_at"),
+            ),
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO order_products VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (order["id"], i, p["id"], p["name"], read_price(p), p["quantity"])
+                for i, p in enumerate(order["products"])
+            ),
+        )
+
+    @staticmethod
+    def __customer_dict(row: tuple) -> dict:
+        return {
+            "id": row[0],
+            "name": row[1],
+            "password": row[2],
+            "address": json.loads(row[3]),
+        }
+
+    @staticmethod
+    def __product_dict(row: tuple) -> dict:
+        return {
+            "id": row[0],
+            "owner_id": row[1],
+            "name": row[2],
+            "price_cents": int(row[3]),
+            "quantity": row[4],
+        }
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    def __repr__(self) -> str:
+        return f"SQLite_Repository(filename={self.__filename})"
@@ -0,0 +1,316 @@
+from __future__ import annotations
+from collections.abc import Mapping
+import json
+import os
+from typing import Iterator
+
+from storage.interfaces import I_Customer_Source
+from storage.mappings import Repository_Customers
+from storage.atomic_file import Pending_Files, replace_file
+from users import Customer
+
+
+class User_File(I_Customer_Source):
+    def __init__(self, filename: str) -> None:
+        """
+        Arquivo de clientes no formato JSON Lines, acompanhado de um índice persistente.
+
+        Os registros são somente anexados ao arquivo: um cliente alterado ganha um novo
+        registro, e o índice id -> posição passa a apontar para ele. O índice, junto
+        com o índice nome -> id, é salvo em um arquivo ".idx" e carregado sem percorrer
+        os registros. Caso o índice esteja ausente ou desatualizado (o tamanho do
+        arquivo de registros não confere), ele é reconstruído a partir dos registros.
+
+        Parameters
+        ----------
+        filename : str
+            Caminho do arquivo de registros
+        """
+        self.__filename = filename
+        self.__index_filename = filename + ".idx"
+        self._offsets: dict[int, int] = {}
+        self._names: dict[str, int] = {}
+        self._garbage = 0
+
+        self.__file = open(self.__filename, "a+b")
+        if not self.__load_index():
+            self.__rebuild_index()
+
+    def __size(self) -> int:
+        self.__file.seek(0, os.SEEK_END)
+        return self.__file.tell()
+
+    def __load_index(self) -> bool:
+        """
+        Carrega o índice persistido.
+
+        Returns
+        -------
+        bool
+            Se o índice existe e corresponde ao arquivo de registros
+        """
+        if not os.path.exists(self.__index_filename):
+            return False
+
+        try:
+            with open(self.__index_filename, "r", encoding="utf-8") as file:
+                index = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        if index.get("size") != self.__size():
+            return False
+
+        self._offsets = {int(id): offset for id, offset in index["offsets"].items()}
+        self._names = index["names"]
+        self._garbage = index.get("garbage", 0)
+        return True
+
+    def __rebuild_index(self) -> None:
+        """
+        Reconstrói o índice percorrendo todos os registros.
+        O último registro de cada cliente é o válido.
+        """
+        self._offsets = {}
+        self._names = {}
+        self._garbage = 0
+
+        names_by_id: dict[int, str] = {}
+        self.__file.seek(0)
+        offset = 0
+        for line in self.__file:
+            if line.strip():
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self.__index(data["id"], data["name"], offset, names_by_id.get(data["id"]))
+                names_by_id[data["id"]] = data["name"]
+            offset += len(line)
+
+        # Um registro incompleto no final do arquivo (escrita interrompida) é descartado
+        if offset < self.__size():
+            self.__file.truncate(offset)
+
+    def __index(
+        self, customer_id: int, name: str, offset: int, old_name: str | None
+    ) -> None:
+        if customer_id in self._offsets:
+            self._garbage += 1
+        # O nome antigo deixa de apontar para o cliente
+        if old_name is not None and old_name != name:
+            self._names.pop(old_name, None)
+        self._offsets[customer_id] = offset
+        self._names[name] = customer_id
+
+    def get_customer(self, customer_id: int) -> dict | None:
+        offset = self._offsets.get(customer_id)
+        if offset is None:
+            return None
+        self.__file.seek(offset)
+        return json.loads(self.__file.readline())
+
+    def find_customer(self, name: str) -> dict | None:
+        customer_id = self._names.get(name)
+        return self.get_customer(customer_id) if customer_id is not None else None
+
+    def find_id(self, name: str) -> int | None:
+        """
+        Busca o Id de um cliente pelo nome, sem ler seu registro.
+
+        Parameters
+        ----------
+        name : str
+            Nome do cliente
+
+        Returns
+        -------
+        int | None
+            Id do cliente, None caso não exista
+        """
+        return self._names.get(name)
+
+    def customer_ids(self) -> Iterator[int]:
+        return iter(sorted(self._offsets))
+
+    def count_customers(self) -> int:
+        return len(self._offsets)
+
+    def last_customer_id(self) -> int:
+        return max(self._offsets, default=0)
+
+    def put(self, customer: dict) -> None:
+        """
+        Anexa o registro de um cliente novo ou alterado e atualiza o índice.
+
+        Parameters
+        ----------
+        customer : dict
+            Dicionário do cliente
+
+        Raises
+        ------
+        ValueError
+            Caso o nome já pertença a outro cliente
+        """
+        owner_id = self._names.get(customer["name"])
+        if owner_id is not None and owner_id != customer["id"]:
+            raise ValueError(f"Nome já cadastrado: {customer['name']}")
+
+        old = self.get_customer(customer["id"])
+        line = json.dumps(customer, separators=(",", ":")).encode("utf-8") + b"\n"
+        offset = self.__size()
+        self.__file.write(line)
+        self.__file.flush()
+        self.__index(
+            customer["id"], customer["name"], offset, old["name"] if old else None
+        )
+
+    def records(self) -> Iterator[dict]:
+        """
+        Percorre o registro atual de cada cliente, ordenados pelo Id.
+
+        Yields
+        ------
+        dict
+            Dicionário do cliente
+        """
+        for customer_id in self.customer_ids():
+            customer = self.get_customer(customer_id)
+            assert customer is not None
+            yield customer
+
+    def save_index(self, pending: Pending_Files | None = None) -> None:
+        """
+        Salva o índice, compactando antes o arquivo de registros caso a maior parte
+        dos registros esteja desatualizada.
+        O índice é substituído somente após ser escrito por completo, e depois dos
+        registros anexados serem sincronizados com o disco.
+
+        Parameters
+        ----------
+        pending : Pending_Files | None, optional
+            Caso fornecido, a sincronização e a substituição são adiadas até seu commit,
+            by default None
+        """
+        if self._garbage > max(len(self._offsets), 1000):
+            self.__compact()
+
+        index = {
+            "size": self.__size(),
+            "garbage": self._garbage,
+            "names": self._names,
+            "offsets": self._offsets,
+        }
+        temp_filename = self.__index_filename + ".tmp"
+        with open(temp_filename, "w", encoding="utf-8") as file:
+            json.dump(index, file, separators=(",", ":"))
+
+        files = pending if pending is not None else Pending_Files()
+        files.add(self.__filename)
+        files.add(temp_filename, self.__index_filename)
+        if pending is None:
+            files.sync()
+            files.commit()
+
+    def __compact(self) -> None:
+        """
+        Reescreve o arquivo de registros mantendo somente o registro atual de cada cliente.
+        """
+        temp_filename = self.__filename + ".tmp"
+        offsets: dict[int, int] = {}
+        with open(temp_filename, "wb") as file:
+            for customer_id in sorted(self._offsets):
+                self.__file.seek(self._offsets[customer_id])
+                offsets[customer_id] = file.tell()
+                file.write(self.__file.readline())
+
+        self.__file.close()
+        replace_file(temp_filename, self.__filename)
+        self.__file = open(self.__filename, "a+b")
+        self._offsets = offsets
+        self._garbage = 0
+
+    def close(self) -> None:
+        self.__file.close()
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    def __repr__(self) -> str:
+        return f"User_File(filename={self.__filename}, contem {len(self._offsets)} clientes)"
+
+
+def customers_filename(filename: str) -> str:
+    """
+    Obtem o caminho do arquivo de clientes que acompanha uma database.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho da database
+
+    Returns
+    -------
+    str
+        Caminho do arquivo de clientes
+    """
+    return os.path.splitext(filename)[0] + ".customers.jsonl"
+
+
+def write_customers(
+    filename: str, customers: Mapping[int, Customer], pending: Pending_Files | None = None
+) -> None:
+    """
+    Persiste os clientes novos ou alterados no arquivo de clientes e salva seu índice.
+    Clientes de um Repository_Customers sobre o mesmo arquivo que não foram
+    carregados não podem ter sido alterados, então não são percorridos.
+    Qualquer outro mapeamento substitui o arquivo por completo, descartando os
+    clientes que não fazem parte dele.
+
+    Parameters
+    ----------
+    filename : str
+        Caminho do arquivo de clientes
+    customers : Mapping[int, Customer]
+        Clientes, indexados pelo id
+    pending : Pending_Files | None, optional
+        Caso fornecido, a sincronização e a substituição do índice são adiadas
+        até seu commit, by default None
+    """
+    source = None
+    if isinstance(customers, Repository_Customers) and isinstance(customers.source, User_File):
+        if os.path.abspath(customers.source.filename) == os.path.abspath(filename):
+            source = customers.source
+
+    if source is not None:
+        for customer in customers.loaded():
+            data = customer.to_dict()
+            if source.get_customer(customer.id) != data:
+                source.put(data)
+        source.save_index(pending)
+        return
+
+    # O novo arquivo é escrito ao lado do atual, sem restos de uma escrita interrompida
+    temp_filename = filename + ".new"
+    for stale in (temp_filename, temp_filename + ".idx"):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    user_file = User_File(temp_filename)
+    try:
+        for customer in customers.values():
+            user_file.put(customer.to_dict())
+        user_file.save_index()
+    finally:
+        user_file.close()
+
+    files = pending if pending is not None else Pending_Files()
+    files.add(temp_filename, filename)
+    files.add(temp_filename + ".idx", filename + ".idx")
+    if pending is None:
+        files.sync()
+        files.commit()
@@ -1,3 +1,4 @@
+from users.passwords import Password_Hasher
 from users.address import Address
 from users.abstract_user import Abstract_User
 from users.customer import Customer
@@ -1,12 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 import inspect
 
+from users.passwords import Password_Hasher
+import users.helpers as h
+
 if TYPE_CHECKING:
     from products import Product_Manager, Product
 
 
 class Abstract_User(ABC):
+    __slots__ = ("__id", "_name", "__password")
+
+    # Compartilhado por todos usuários, configurado a partir das constantes ao abrir o mercado
+    hasher: ClassVar[Password_Hasher] = Password_Hasher()
+    # Itens por página nas listagens
+    page_size: ClassVar[int] = 20
+
     def __init__(self, id: int, name: str, password: str) -> None:
         """
         Abstração de um usuário do sistema.
@@ -18,7 +28,7 @@ class Abstract_User(ABC):
         name : str
             Nome do usuário
         password : str
-            Senha de autenticação do usuário
+            Senha de autenticação do usuário, já no formato armazenado (hash)
         """
         self.__id = id
         self._name = name
@@ -45,7 +55,7 @@ class Abstract_User(ABC):
 
     def view_products(self, market: "Product_Manager") -> None:
         """
-        Printa todos produtos no mercado.
+        Printa os produtos no mercado, uma página por vez.
 
         Parameters
         ----------
@@ -53,16 +63,57 @@ class Abstract_User(ABC):
             Mercado
         """
         print("- - - Produtos - - -")
-        products = market.list_products()
-        if len(products) < 1:
-            print("Não há produtos no mercado!")
-        else:
-            for product in products:
+        h.browse(
+            lambda after, before: market.page_products(after, before, self.page_size),
+            lambda product: f"[{product.id}]: " + product.description(),
+            "Não há produtos no mercado!",
+        )
+
+    def search_products(self, market: "Product_Manager") -> None:
+        """
+        Busca produtos pelo nome por meio de um processo interativo.
+        A busca aceita o começo das palavras e pequenos erros de digitação.
+
+        Parameters
+        ----------
+        market : Product_Manager
+            Mercado
+        """
+        print("- - - Buscar Produtos - - -")
+        print("Digite o nome do produto:")
+        query = h.ask()
+        print()
+        self._print_search(market, query)
+
+    def _print_search(
+        self, market: "Product_Manager", query: str, only_available: bool = False
+    ) -> None:
+        """
+        Printa os resultados de uma busca.
+
+        Parameters
+        ----------
+        market : Product_Manager
+            Mercado
+        query : str
+            Busca
+        only_available : bool, optional
+            Se somente produtos disponíveis devem ser mostrados, by default False
+        """
+        results = market.search_products(query, only_available=only_available)
+        if len(results) < 1:
+            print("Nenhum produto encontrado!")
+        for product in results:
+            if only_available:
+                item = product.line_item(market.available(product.id))
+                print(f"[{product.id}]: " + item.description())
+            else:
                 print(f"[{product.id}]: " + product.description())
 
     def get_permissions(self) -> list[str]:
         """
-        Retorna todos métodos públicos da classe, com excessão desse método.
+        Retorna todos métodos públicos da classe, com excessão desse método
+        e dos métodos de verificação e alteração direta da senha.
 
         Returns
         -------
@@ -71,7 +122,8 @@ class Abstract_User(ABC):
         """
         methods = inspect.getmembers(self, predicate=inspect.ismethod)
         permissions = [name for name, method in methods if not name.startswith("_")]
-        permissions.remove("get_permissions")
+        for name in ("get_permissions", "check_password", "set_password"):
+            permissions.remove(name)
         return permissions
 
     def change_password(self) -> None:
@@ -80,25 +132,54 @@ class Abstract_User(ABC):
         """
         print("- - - Alteração de Senha - - -")
         print("Digite sua senha atual: ")
-        check = input(">> ")
+        check = h.ask()
 
-        if check != self.__password:
+        if not self.check_password(check):
             print("Senha incorreta, operação cancelada.")
         else:
             while True:
                 print("\nDigite sua nova senha: ")
-                password = input(">> ")
+                password = h.ask()
 
                 if len(password) <= 1:
                     print("Insira uma senha mais comprida!")
                 else:
                     print("Senha alterada com sucesso!")
-                    self.__password = password
+                    self.set_password(password)
                     break
 
+    def check_password(self, password: str) -> bool:
+        """
+        Verifica a senha do usuário.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+
+        Returns
+        -------
+        bool
+            Se a senha está correta
+        """
+        return self.hasher.verify(password, self.__password)
+
+    def set_password(self, password: str) -> None:
+        """
+        Altera a senha do usuário, armazenando somente seu hash.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+        """
+        if len(password) > 1:
+            self.__password = self.hasher.hash(password)
+
     def _select_product(self, products: "Product_Manager", message: str) -> int:
         """
         Seleciona um produto por meio de um processo interativo.
+        Um texto no lugar do Id busca os produtos pelo nome.
 
         Parameters
         ----------
@@ -112,13 +193,17 @@ class Abstract_User(ABC):
         """
         while True:
             print(message)
-            check = input(">> ")
+            check = h.ask()
             print()
 
             try:
                 selected = int(check)
             except ValueError:
-                print("Digite um número! Tente novamente.\n")
+                if check.strip():
+                    self._print_search(products, check)
+                    print()
+                else:
+                    print("Digite um número! Tente novamente.\n")
                 continue
 
             if not selected in products.products.keys():
@@ -142,3 +227,11 @@ class Abstract_User(ABC):
     @property
     def password(self) -> str:
         return self.__password
+
+    @password.setter
+    def password(self, password: str) -> None:
+        """
+        Substitui a senha armazenada, sem gerar um novo hash.
+        """
+        if len(password) > 1:
+            self.__password = password
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 
 class Address:
+    __slots__ = ("street", "city", "state", "zip_code", "house_number", "complement")
+
     def __init__(
         self,
         street: str,
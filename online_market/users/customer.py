@@ -3,7 +3,10 @@ from typing import TYPE_CHECKING, Type
 
 from users import Abstract_User
 import users.helpers as h
-from products import Product
+import orders.constants as o_constants
+from orders.pricing import Priced_Items
+from money import format_cents, parse_cents
+from products import Hold
 from users import Address
 
 if TYPE_CHECKING:
@@ -13,13 +16,15 @@ if TYPE_CHECKING:
 
 
 class Customer(Abstract_User):
+    __slots__ = ("_address", "_orders")
+
     def __init__(
         self,
         id: int,
         name: str,
         password: str,
         address: "Address",
-        orders: list["Order"] = [],
+        orders: list["Order"] | None = None,
     ) -> None:
         """
         Cliente.
@@ -34,12 +39,12 @@ class Customer(Abstract_User):
             Senha
         address : str
             Endereço
-        orders : list[Order], optional
-            Pedidos, by default []
+        orders : list[Order] | None, optional
+            Pedidos, by default None
         """
         super().__init__(id, name, password)
         self._address = address
-        self._orders = orders
+        self._orders = orders if orders is not None else []
 
     @staticmethod
     def from_dict(data: dict) -> Customer:
@@ -72,7 +77,7 @@ class Customer(Abstract_User):
 
     def view_products(self, market: "Product_Manager") -> None:
         """
-        Visualiza todos os produtos no mercado.
+        Visualiza os produtos disponíveis no mercado, uma página por vez.
 
         Parameters
         ----------
@@ -80,13 +85,108 @@ class Customer(Abstract_User):
             Mercado
         """
         print("- - - Produtos - - -")
-        products = market.list_products()
-        if len(products) < 1:
-            print("Não há produtos no mercado!")
-        else:
-            for product in products:
-                if product.quantity > 0:
-                    print(f"[{product.id}]: " + product.description())
+        h.browse(
+            lambda after, before: market.page_products(
+                after, before, self.page_size, only_available=True
+            ),
+            # Quantidades reservadas em outros carrinhos não estão disponíveis
+            lambda product: f"[{product.id}]: "
+            + product.line_item(market.available(product.id)).description(),
+            "Não há produtos no mercado!",
+        )
+
+    def browse_by_price(self, market: "Product_Manager") -> None:
+        """
+        Visualiza os produtos disponíveis em uma faixa de preço, ordenados pelo preço,
+        por meio de um processo interativo.
+
+        Parameters
+        ----------
+        market : Product_Manager
+            Mercado
+        """
+        print("- - - Produtos por Preço - - -")
+        min_price = self.__read_price("Preço mínimo (vazio para nenhum):")
+        max_price = self.__read_price("Preço máximo (vazio para nenhum):")
+
+        while True:
+            print("Como deseja ordenar os produtos?")
+            print("[1] Mais baratos primeiro")
+            print("[2] Mais caros primeiro")
+            check = h.ask()
+            print()
+            if check in ("1", "2"):
+                descending = check == "2"
+                break
+            print("Opção inválida! Tente novamente.\n")
+
+        after: tuple[int, int] | None = None
+        while True:
+            # Um produto a mais indica se existe uma próxima página
+            products = market.products_by_price(
+                min_price,
+                max_price,
+                descending,
+                self.page_size + 1,
+                after,
+                only_available=True,
+            )
+            if after is None and len(products) < 1:
+                print("Nenhum produto nesta faixa de preço!")
+                return
+
+            for product in products[: self.page_size]:
+                item = product.line_item(market.available(product.id))
+                print(f"[{product.id}]: " + item.description())
+            if len(products) <= self.page_size:
+                return
+
+            print()
+            print("[p] Próxima página")
+            print("[Enter] Continuar")
+            check = h.ask().strip().lower()
+            print()
+            if check != "p":
+                return
+            last = products[self.page_size - 1]
+            after = (last.price, last.id)
+
+    @staticmethod
+    def __read_price(message: str) -> int | None:
+        """
+        Lê um preço em reais por meio de um processo interativo.
+
+        Parameters
+        ----------
+        message : str
+            Mensagem a ser mostrada na tela
+
+        Returns
+        -------
+        int | None
+            Preço em centavos, None caso nenhum seja informado
+        """
+        while True:
+            print(message)
+            check = h.ask().strip()
+            print()
+            if not check:
+                return None
+            try:
+                price = parse_cents(check)
+            except ValueError:
+                print("Digite um número! Tente novamente.\n")
+                continue
+            if price < 0:
+                print("O preço não pode ser negativo!\n")
+            else:
+                return price
+
+    def _print_search(
+        self, market: "Product_Manager", query: str, only_available: bool = True
+    ) -> None:
+        # Clientes só veem os produtos disponíveis, como em view_products
+        super()._print_search(market, query, only_available)
 
     def place_order(self, market_owner: "Owner") -> None:
         """
@@ -97,7 +197,9 @@ class Customer(Abstract_User):
         market_owner : Owner
             Dono do mercado
         """
-        products: list[Product] = []
+        market = market_owner.products
+        # O subtotal e as linhas do carrinho são mantidos a cada alteração
+        cart = Priced_Items()
 
         while True:
             print("- - - Novo Pedido - - -")
@@ -106,7 +208,7 @@ class Customer(Abstract_User):
             print("[2] Remover produto")
             print("[3] Concluir")
             print("[4] Cancelar")
-            check = input(">> ")
+            check = h.ask()
             print()
 
             try:
@@ -117,50 +219,59 @@ class Customer(Abstract_User):
 
             match selected:
                 case 1:
-                    retrieved = self.__get_product_from_market(market_owner.products)
-                    if retrieved != None:
-                        assert isinstance(retrieved, Product)
-                        products.append(retrieved)
+                    reserved = self.__get_product_from_market(market)
+                    if reserved != None:
+                        assert isinstance(reserved, Hold)
+                        cart.add(reserved)
                         print("Operação realizada com sucesso!")
                 case 2:
-                    self.__remove_product_from_list(products)
+                    self.__remove_product_from_list(market, cart)
                 case 3:
-                    if len(products) < 1:
+                    if len(cart) < 1:
                         print("Não há produtos no pedido!")
                     else:
                         print("- - - Pedido - - -")
-                        preco_total = 0.0
-                        for product in products:
-                            print(
-                                f"> {product.quantity}x {product.name} = {product.get_total_price():.2f}R$"
-                            )
-                            preco_total += product.get_total_price()
-                        print(f"Preço total: {preco_total}")
+                        print(cart.text)
+                        print(f"Preço total: {format_cents(cart.total)}")
                         print("- - - - -\n")
 
                         if h.confirm("Confirmar pedido?") == True:
-                            market_owner.orders.place_order(self, products)
-                            print("Pedido realizado com sucesso!")
-                            return
+                            try:
+                                market_owner.orders.place_order(self, cart)
+                            except (ValueError, KeyError) as e:
+                                # As reservas vencidas ou de produtos removidos saem
+                                # do carrinho, as demais continuam
+                                print(f"Falha! {e.args[0]}")
+                                cart.retain(market.is_hold_active)
+                            else:
+                                print("Pedido realizado com sucesso!")
+                                return
                         else:
                             print("Voltando...")
                 case 4:
+                    for product in cart:
+                        market.release_hold(product)
                     print("Operação cancelada!")
                     return
                 case _:
                     print("Opção inválida! Tente novamente.")
             print()
 
-    def cancel_order(self) -> None:
+    def cancel_order(self, market_owner: "Owner") -> None:
         """
         Cancela um pedido por meio de um processo interativo.
+
+        Parameters
+        ----------
+        market_owner : Owner
+            Dono do mercado
         """
         print("- - - Cancelar Pedido - - -")
         self.view_orders()
 
         while True:
             print("\nQual pedido deve ser cancelado?")
-            check = input(">> ")
+            check = h.ask()
             try:
                 selected = int(check) - 1
             except ValueError:
@@ -171,22 +282,28 @@ class Customer(Abstract_User):
                 print("Seleção inválida! Tente novamente.")
             else:
                 print()
-                if self._orders[selected].cancel() == True:
+                order_id = self._orders[selected].id
+                if market_owner.orders.cancel_order(order_id) == True:
                     print("Pedido cancelado com sucesso!")
                 else:
                     print("Não foi possível cancelar o pedido!")
                 return
 
-    def confirm_arrival(self) -> None:
+    def confirm_arrival(self, market_owner: "Owner") -> None:
         """
         Confirma o recebimento de um pedido por meio de um processo interativo.
+
+        Parameters
+        ----------
+        market_owner : Owner
+            Dono do mercado
         """
         print("- - - Confirmar Recebimento - - -")
         self.view_orders()
 
         while True:
             print("\nQual pedido você recebeu?")
-            check = input(">> ")
+            check = h.ask()
             try:
                 selected = int(check) - 1
             except ValueError:
@@ -197,15 +314,18 @@ class Customer(Abstract_User):
                 print("Seleção inválida! Tente novamente.")
             else:
                 print()
-                if self._orders[selected].receive() == True:
+                order = self._orders[selected]
+                market_owner.orders.receive_order(order.id)
+                if order.status == o_constants.finished:
                     print("Pedido recebido com sucesso!")
                 else:
                     print("Falha! Este pedido não foi enviado!")
                 return
 
-    def __get_product_from_market(self, market: "Product_Manager") -> Product | None:
+    def __get_product_from_market(self, market: "Product_Manager") -> Hold | None:
         """
-        Obtem um produto do mercado por meio de um processo interativo.
+        Reserva um produto do mercado por meio de um processo interativo.
+        O produto só é deduzido do estoque quando o pedido é concluído.
 
         Parameters
         ----------
@@ -214,8 +334,8 @@ class Customer(Abstract_User):
 
         Returns
         -------
-        Product | None
-            Produto obtido
+        Hold | None
+            Reserva do produto
             None caso nenhum produto seja escolhido
         """
         self.view_products(market)
@@ -229,7 +349,7 @@ class Customer(Abstract_User):
         # Seleciona quantidade
         while True:
             print(f"Quantos {product.name} devem ser adicionados?")
-            ammount_str = input(">> ")
+            ammount_str = h.ask()
 
             try:
                 ammount = int(ammount_str)
@@ -242,17 +362,20 @@ class Customer(Abstract_User):
             elif ammount > product.quantity:
                 print(f"A quantidade deve ser menor que {product.quantity}")
             else:
-                product = market.retrieve_product(selected, ammount)
-                return product
+                return market.reserve_product(selected, ammount)
             print()
 
-    def __remove_product_from_list(self, products: list[Product]) -> None:
+    def __remove_product_from_list(
+        self, market: "Product_Manager", products: Priced_Items
+    ) -> None:
         """
-        Remove um produto de uma lista de compras.
+        Remove um produto de uma lista de compras, liberando sua reserva.
 
         Parameters
         ----------
-        products : list[Product]
+        market : Product_Manager
+            Mercado
+        products : Priced_Items
             Lista de compras
         """
         print("- - - Produtos - - -")
@@ -265,17 +388,17 @@ class Customer(Abstract_User):
 
         while True:
             print("\nQual produto deseja remover?")
-            check = input(">> ")
+            check = h.ask()
             try:
                 selected = int(check) - 1
             except ValueError:
                 print("Digite um número! Tente novamente.\n")
                 continue
 
-            if selected < 0 or selected > len(products):
+            if selected < 0 or selected >= len(products):
                 print("Seleção inválida! Tente novamente.")
             else:
-                products.pop(selected)
+                market.release_hold(products.remove(selected))
                 print("Produto removido com sucesso!")
                 return
 
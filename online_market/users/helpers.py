@@ -1,7 +1,35 @@
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from pagination import Page
+    from storage import Market_Lock
+
+T = TypeVar("T")
+
+# Trava do mercado liberada enquanto o usuário digita, configurada pelo open_market
+input_lock: "Market_Lock | None" = None
+
+
+def ask() -> str:
+    """
+    Lê uma linha digitada pelo usuário.
+    A trava do mercado é liberada durante a espera, então o mercado pode ser salvo
+    enquanto o usuário digita.
+
+    Returns
+    -------
+    str
+        Linha digitada
+    """
+    with input_lock.released() if input_lock is not None else nullcontext():
+        return input(">> ")
+
+
 def confirm(message: str) -> bool:
     while True:
         print(message + " [s/n]:")
-        yes_no = input(">> ")
+        yes_no = ask()
         if yes_no == "s":
             print()
             return True
@@ -10,3 +38,48 @@ def confirm(message: str) -> bool:
             return False
         else:
             print("Opção inválida.")
+
+
+def browse(
+    fetch: Callable[[int | None, int | None], "Page[T]"],
+    describe: Callable[[T], str],
+    empty: str,
+) -> None:
+    """
+    Mostra uma listagem página por página, navegando pelos cursores das páginas.
+
+    Parameters
+    ----------
+    fetch : Callable[[int | None, int | None], Page[T]]
+        Obtem uma página a partir dos cursores after e before
+    describe : Callable[[T], str]
+        Descreve um item
+    empty : str
+        Mensagem mostrada caso não existam itens
+    """
+    page = fetch(None, None)
+    if len(page.items) < 1:
+        print(empty)
+        return
+
+    while True:
+        for item in page.items:
+            print(describe(item))
+        if page.previous is None and page.next is None:
+            return
+
+        print()
+        if page.previous is not None:
+            print("[a] Página anterior")
+        if page.next is not None:
+            print("[p] Próxima página")
+        print("[Enter] Continuar")
+        check = ask().strip().lower()
+        print()
+
+        if check == "p" and page.next is not None:
+            page = fetch(page.next, None)
+        elif check == "a" and page.previous is not None:
+            page = fetch(None, page.previous)
+        else:
+            return
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from users import Abstract_User
-from products import Product_Manager, Product
+from products import Product_Manager, Product, import_csv, export_csv
 from orders import Order_Manager, Order
 import orders.constants as o_constants
+from analytics import Sales_Table
+from money import format_cents, parse_cents
 import users.helpers as h
 
 
 class Owner(Abstract_User):
+    __slots__ = ("__products", "__orders")
+
     def __init__(
         self,
         id: int,
@@ -36,15 +40,14 @@ class Owner(Abstract_User):
 
     def view_orders(self) -> None:
         """
-        Visualiza todos os pedidos.
+        Visualiza os pedidos, uma página por vez.
         """
         print("- - - Pedidos - - -")
-        orders = self.__orders.list_orders()
-        if len(orders) < 1:
-            print("Não existem pedidos no sistema!")
-        else:
-            for order in orders:
-                print(order.description())
+        h.browse(
+            lambda after, before: self.__orders.page_orders(after, before, self.page_size),
+            lambda order: order.description(),
+            "Não existem pedidos no sistema!",
+        )
 
     def add_product(self) -> None:
         """
@@ -55,8 +58,9 @@ class Owner(Abstract_User):
             print("Como deseja adicionar o novo produto?: ")
             print("[1] Cadastrar novo")
             print("[2] Reabastecer existente")
-            print("[3] Cancelar")
-            check = input(">> ")
+            print("[3] Importar catálogo (CSV)")
+            print("[4] Cancelar")
+            check = h.ask()
             print()
 
             try:
@@ -73,6 +77,9 @@ class Owner(Abstract_User):
                     self.__add_to_product()
                     return
                 case 3:
+                    self.__import_catalogue()
+                    return
+                case 4:
                     print("Operação cancelada!")
                     return
                 case _:
@@ -89,7 +96,7 @@ class Owner(Abstract_User):
             print("[1] Deletar um produto e seu Id")
             print("[2] Remover uma quantidade de um produto")
             print("[3] Cancelar")
-            check = input(">> ")
+            check = h.ask()
             print()
 
             try:
@@ -112,6 +119,57 @@ class Owner(Abstract_User):
                     print("Opção inválida! Tente novamente.")
             print()
 
+    def export_catalogue(self) -> None:
+        """
+        Exporta o catálogo de produtos para um arquivo CSV por meio de um processo interativo.
+        """
+        print("- - - Exportar Catálogo - - -")
+        print("Caminho do arquivo CSV: ")
+        filename = h.ask()
+
+        try:
+            exported = export_csv(self.__products, filename)
+        except OSError as e:
+            print(f"Não foi possível escrever o arquivo: {e}")
+        else:
+            print(f"{exported} produtos exportados com sucesso!")
+
+    def view_reports(self) -> None:
+        """
+        Visualiza os relatórios de vendas: receita por status, produto, cliente e mês.
+        Pedidos cancelados só são contados na receita por status.
+        """
+        print("- - - Relatórios - - -")
+        table = Sales_Table.from_orders(self.__orders.iter_orders())
+        if len(table) < 1:
+            print("Não existem pedidos no sistema!")
+            return
+
+        sold = table.sold()
+        print(f"Receita total: {format_cents(sold.total_revenue)}R$")
+        print(f"Unidades vendidas: {sold.units}")
+
+        print("\n> Pedidos por status:")
+        revenue = table.revenue_by_status()
+        for status, count in table.order_count_by_status().items():
+            print(f"  - {status}: {count} pedidos, {format_cents(revenue.get(status, 0))}R$")
+
+        print("\n> Produtos com maior receita:")
+        units = sold.units_by_product()
+        for product_id, name, total in sold.top_products():
+            print(f"  [{product_id}] {name}: {format_cents(total)}R$ ({units[product_id]} unidades)")
+
+        print("\n> Clientes com maior receita:")
+        orders = sold.order_count_by_customer()
+        for customer_id, name, total in sold.top_customers():
+            print(f"  [{customer_id}] {name}: {format_cents(total)}R$ ({orders[customer_id]} pedidos)")
+
+        by_month = sold.revenue_by_period("month")
+        if len(by_month) > 0:
+            print("\n> Receita por mês:")
+            for month, total in by_month.items():
+                print(f"  - {month}: {format_cents(total)}R$")
+
     def send_order(self) -> None:
         """
         Envia um pedido por meio de um processo interativo.
@@ -119,10 +177,7 @@ class Owner(Abstract_User):
         while True:
             print("- - - Enviar Pedido - - -")
 
-            not_sent: list[Order] = []
-            for order in self.__orders.list_orders():
-                if order.status == o_constants.placed:
-                    not_sent.append(order)
+            not_sent = self.__orders.orders_by_status(o_constants.placed)
 
             if len(not_sent) < 1:
                 print("Não há pedidos a serem enviados!")
@@ -134,7 +189,7 @@ class Owner(Abstract_User):
                 while True:
                     print("Qual pedido deseja enviar?")
 
-                    check = input(">> ")
+                    check = h.ask()
                     try:
                         selected = int(check) - 1
                     except ValueError:
@@ -151,7 +206,7 @@ class Owner(Abstract_User):
                 if h.confirm("\nConfirmar envio do pedido?") == False:
                     print("Operação cancelada!")
                 else:
-                    not_sent[selected].send()
+                    self.__orders.send_order(not_sent[selected].id)
                     print("Pedido enviado com sucesso!")
                 return
 
@@ -163,7 +218,7 @@ class Owner(Abstract_User):
         # Nome do produto
         while 1:
             print("Nome do produto: ")
-            name = input(">> ")
+            name = h.ask()
 
             if not all(char.isalpha() or char.isspace() for char in name):
                 print("O nome deve ser composto somente por letras e espaços!")
@@ -174,40 +229,31 @@ class Owner(Abstract_User):
         # Preço
         while 1:
             print("\nPreço do produto: ")
-            price_str = input(">> ")
+            price_str = h.ask()
 
             try:
-                price = float(price_str)
+                price = parse_cents(price_str)
             except ValueError:
                 print("Digite um número! Tente novamente.\n")
                 continue
 
-            if price <= 0.0:
+            if price <= 0:
                 print("O preço deve ser maior que 0!")
             else:
                 break
             print()
 
         # Id
-        sorted_ids = sorted(self.__products.products.keys())
-        if len(sorted_ids) == 0:
-            id = 0
-        elif sorted_ids[-1] < len(sorted_ids):
-            id = len(self.__products.list_products())
-        else:
-            for i, j in enumerate(sorted_ids):
-                if i < j:
-                    id = i
-                    break
+        id = self.__products.next_id()
 
         # Cria o Produto
         print("\n- - - Revisão - - -")
         print("Revise os dados do produto criado:")
-        print(f"\n> Id: {id}\n> Nome: {name}\n> Preço: {price}\n")
+        print(f"\n> Id: {id}\n> Nome: {name}\n> Preço: {format_cents(price)}\n")
 
         while True:
             print("Confirmar registro? [s/n]")
-            yes_no = input(">> ")
+            yes_no = h.ask()
             if yes_no == "s":
                 self.__products.register_product(id, name, price)
                 print("Cadastro realizado com sucesso!\n")
@@ -218,6 +264,30 @@ class Owner(Abstract_User):
             else:
                 print("Opção inválida.")
 
+    def __import_catalogue(self) -> None:
+        """
+        Importa um catálogo de produtos em CSV por meio de um processo interativo.
+        O arquivo deve conter as colunas id, name, price e quantity.
+        """
+        print("- - - Importar Catálogo - - -")
+        print("Caminho do arquivo CSV: ")
+        filename = h.ask()
+
+        try:
+            report = import_csv(self.__products, filename)
+        except (OSError, ValueError) as e:
+            print(f"Não foi possível importar o arquivo: {e}")
+            return
+
+        print(f"> Registrados: {report.registered}")
+        print(f"> Reabastecidos: {report.restocked}")
+        print(f"> Preços alterados: {report.repriced}")
+        print(f"> Recusados: {len(report.rejected)}")
+        for rejected in report.rejected[:10]:
+            print(f"  Linha {rejected.line}: {rejected.reason}")
+        if len(report.rejected) > 10:
+            print(f"  ... e mais {len(report.rejected) - 10} linhas")
+
     def __add_to_product(self) -> None:
         """
         Adiciona uma quantidade de produtos a um produto já existente
@@ -239,7 +309,7 @@ class Owner(Abstract_User):
         # Adiciona quantidade ao produto
         while True:
             print(f"Quantos {product.name} devem ser adicionados?")
-            ammount_str = input(">> ")
+            ammount_str = h.ask()
 
             try:
                 ammount = int(ammount_str)
@@ -271,20 +341,7 @@ class Owner(Abstract_User):
             return
 
         # Deleta o produto
-        for order in self.__orders.list_orders():
-            used_ids = set()
-            for product in order.products:
-                used_ids.add(product.id)
-
-        try:
-            if selected in used_ids:
-                can_remove = False
-            else:
-                can_remove = True
-        except UnboundLocalError:
-            can_remove = True
-
-        if can_remove:
+        if not self.__orders.is_product_referenced(selected):
             self.__products.delete_product(selected)
             print("Produto removido com sucesso!")
         else:
@@ -313,7 +370,7 @@ class Owner(Abstract_User):
         # Remove quantidade do produto
         while True:
             print(f"Quantos {product.name} devem ser removidos?")
-            ammount_str = input(">> ")
+            ammount_str = h.ask()
 
             try:
                 ammount = int(ammount_str)
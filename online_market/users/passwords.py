@@ -0,0 +1,327 @@
+from __future__ import annotations
+import asyncio
+import base64
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import hmac
+import os
+import threading
+
+
+# Prefixos das senhas armazenadas, senhas sem prefixo são texto puro (formato antigo)
+SCRYPT = "scrypt"
+PBKDF2 = "pbkdf2_sha256"
+
+
+def _encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _decode(data: str) -> bytes:
+    return base64.b64decode(data.encode("ascii"))
+
+
+class Password_Hasher:
+    def __init__(
+        self,
+        algorithm: str = SCRYPT,
+        scrypt_n: int = 2**14,
+        scrypt_r: int = 8,
+        scrypt_p: int = 1,
+        pbkdf2_iterations: int = 600_000,
+        workers: int = 4,
+        cache_size: int = 10_000,
+    ) -> None:
+        """
+        Gera e verifica hashes de senhas com hashlib.scrypt ou PBKDF2.
+
+        As senhas são armazenadas no formato "algoritmo$parâmetros$sal$hash",
+        senhas sem esse formato são tratadas como texto puro e podem ser
+        convertidas com needs_rehash e hash após um login bem sucedido.
+
+        Verificações bem sucedidas são guardadas em cache como um HMAC da senha,
+        com uma chave aleatória do processo, então logins repetidos não repetem o
+        hash completo. Todas as comparações são feitas em tempo constante.
+
+        Parameters
+        ----------
+        algorithm : str, optional
+            "scrypt" ou "pbkdf2_sha256", by default "scrypt"
+        scrypt_n : int, optional
+            Custo de CPU e memória do scrypt, by default 2**14
+        scrypt_r : int, optional
+            Tamanho do bloco do scrypt, by default 8
+        scrypt_p : int, optional
+            Paralelismo do scrypt, by default 1
+        pbkdf2_iterations : int, optional
+            Iterações do PBKDF2, by default 600_000
+        workers : int, optional
+            Threads usadas pelas verificações assíncronas, by default 4
+        cache_size : int, optional
+            Quantidade de verificações guardadas em cache, 0 desativa o cache, by default 10_000
+        """
+        if algorithm not in (SCRYPT, PBKDF2):
+            raise ValueError(f"Algoritmo desconhecido: {algorithm}")
+
+        self.algorithm = algorithm
+        self.scrypt_n = scrypt_n
+        self.scrypt_r = scrypt_r
+        self.scrypt_p = scrypt_p
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.workers = workers
+        self.cache_size = cache_size
+
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self.__cache_key = os.urandom(32)
+        self.__lock = threading.Lock()
+        self.__executor: ThreadPoolExecutor | None = None
+
+    # - - - Hash - - - #
+    def hash(self, password: str) -> str:
+        """
+        Gera o hash de uma senha com os parâmetros atuais e um sal aleatório.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+
+        Returns
+        -------
+        str
+            Senha armazenável
+        """
+        salt = os.urandom(16)
+        if self.algorithm == SCRYPT:
+            n, r, p = self.scrypt_n, self.scrypt_r, self.scrypt_p
+            digest = self.__scrypt(password, salt, n, r, p)
+            return f"{SCRYPT}${n}${r}${p}${_encode(salt)}${_encode(digest)}"
+        else:
+            iterations = self.pbkdf2_iterations
+            digest = self.__pbkdf2(password, salt, iterations)
+            return f"{PBKDF2}${iterations}${_encode(salt)}${_encode(digest)}"
+
+    @staticmethod
+    def __scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        # O scrypt precisa de aproximadamente 128 * r * (n + p + 2) bytes de memória
+        maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+        return hashlib.scrypt(
+            password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=32
+        )
+
+    @staticmethod
+    def __pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+    @staticmethod
+    def is_hashed(stored: str) -> bool:
+        """
+        Verifica se uma senha armazenada é um hash ou texto puro.
+
+        Parameters
+        ----------
+        stored : str
+            Senha armazenada
+
+        Returns
+        -------
+        bool
+            Se a senha está no formato de hash
+        """
+        return stored.startswith((SCRYPT + "$", PBKDF2 + "$"))
+
+    def needs_rehash(self, stored: str) -> bool:
+        """
+        Verifica se uma senha armazenada deve ser refeita com os parâmetros atuais,
+        seja por estar em texto puro ou por ter sido gerada com outro custo.
+
+        Parameters
+        ----------
+        stored : str
+            Senha armazenada
+
+        Returns
+        -------
+        bool
+            Se a senha deve ser refeita
+        """
+        if not self.is_hashed(stored):
+            return True
+
+        fields = stored.split("$")
+        if self.algorithm == SCRYPT:
+            return fields[0] != SCRYPT or fields[1:4] != [
+                str(self.scrypt_n),
+                str(self.scrypt_r),
+                str(self.scrypt_p),
+            ]
+        return fields[0] != PBKDF2 or fields[1] != str(self.pbkdf2_iterations)
+
+    # - - - Verificação - - - #
+    def verify(self, password: str, stored: str) -> bool:
+        """
+        Verifica uma senha contra a senha armazenada.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+        stored : str
+            Senha armazenada, hash ou texto puro
+
+        Returns
+        -------
+        bool
+            Se a senha está correta
+        """
+        cached = self.verify_cached(password, stored)
+        if cached is not None:
+            return cached
+
+        try:
+            correct = self.__verify(password, stored)
+        except (ValueError, IndexError):
+            # Hash corrompido
+            return False
+
+        if correct:
+            self.__remember(password, stored)
+        return correct
+
+    def __verify(self, password: str, stored: str) -> bool:
+        if not self.is_hashed(stored):
+            return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+
+        fields = stored.split("$")
+        if fields[0] == SCRYPT:
+            n, r, p = int(fields[1]), int(fields[2]), int(fields[3])
+            digest = self.__scrypt(password, _decode(fields[4]), n, r, p)
+            return hmac.compare_digest(digest, _decode(fields[5]))
+        else:
+            digest = self.__pbkdf2(password, _decode(fields[2]), int(fields[1]))
+            return hmac.compare_digest(digest, _decode(fields[3]))
+
+    def verify_cached(self, password: str, stored: str) -> bool | None:
+        """
+        Verifica uma senha somente pelo cache, sem calcular o hash.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+        stored : str
+            Senha armazenada
+
+        Returns
+        -------
+        bool | None
+            True caso a senha corresponda à verificação guardada,
+            None caso a senha armazenada não esteja no cache ou a senha seja diferente
+        """
+        with self.__lock:
+            expected = self._cache.get(stored)
+            if expected is not None:
+                self._cache.move_to_end(stored)
+
+        if expected is not None and hmac.compare_digest(expected, self.__mac(password)):
+            return True
+        return None
+
+    def __mac(self, password: str) -> bytes:
+        return hmac.digest(self.__cache_key, password.encode("utf-8"), "sha256")
+
+    def __remember(self, password: str, stored: str) -> None:
+        if self.cache_size <= 0:
+            return
+
+        mac = self.__mac(password)
+        with self.__lock:
+            self._cache[stored] = mac
+            self._cache.move_to_end(stored)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # - - - Execução em segundo plano - - - #
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Threads das verificações em segundo plano, criadas no primeiro uso.
+        O scrypt e o PBKDF2 liberam o GIL, então as threads calculam em paralelo.
+        """
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="password"
+                )
+            return self.__executor
+
+    def submit(self, password: str, stored: str) -> Future[bool]:
+        """
+        Verifica uma senha em segundo plano.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+        stored : str
+            Senha armazenada
+
+        Returns
+        -------
+        Future[bool]
+            Resultado da verificação
+        """
+        return self.executor.submit(self.verify, password, stored)
+
+    async def verify_async(self, password: str, stored: str) -> bool:
+        """
+        Verifica uma senha sem bloquear o loop de eventos.
+        Verificações encontradas no cache são respondidas imediatamente.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+        stored : str
+            Senha armazenada
+
+        Returns
+        -------
+        bool
+            Se a senha está correta
+        """
+        if self.verify_cached(password, stored):
+            return True
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.verify, password, stored)
+
+    async def hash_async(self, password: str) -> str:
+        """
+        Gera o hash de uma senha sem bloquear o loop de eventos.
+
+        Parameters
+        ----------
+        password : str
+            Senha em texto puro
+
+        Returns
+        -------
+        str
+            Senha armazenável
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.hash, password)
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+                self.__executor = None
+
+    def __repr__(self) -> str:
+        if self.algorithm == SCRYPT:
+            cost = f"n={self.scrypt_n}, r={self.scrypt_r}, p={self.scrypt_p}"
+        else:
+            cost = f"iterations={self.pbkdf2_iterations}"
+        return f"Password_Hasher({self.algorithm}, {cost}, contem {len(self._cache)} verificações em cache)"